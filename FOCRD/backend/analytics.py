@@ -0,0 +1,196 @@
+import json
+import time
+import logging
+
+import numpy as np
+
+from scoring import SCORING_VERSION, NUTRIENTS, TIERS, to_matrix, to_columns, score_columns, tier_columns
+
+logger = logging.getLogger(__name__)
+
+# 전체 기록 점수 재계산 + 통계(등급 분포, 영양성분 백분위) 사전 계산
+#   python analytics.py rescore [--force]   점수 공식이 바뀐 뒤 이전 버전 기록만 재계산
+#   python analytics.py stats [--force]     새 기록을 통계에 반영 (--force: 누적 집계를 처음부터 다시)
+
+STATS_KEY = "stats"
+# 누적 집계 (통계를 새 기록만으로 갱신하기 위한 값별 개수/합계)
+AGGREGATES_KEY = "stats_aggregates"
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def rescore(store, batch_size=1000, force=False):
+    """
+    기록을 batch_size 개씩 컬럼 배열로 읽어 벡터 연산으로 점수/등급 계산
+    배치마다 바로 기록 (중간에 멈춰도 score_version 으로 남은 것부터 이어서 진행)
+    반환: {"scanned": 읽은 건수, "changed": 점수/등급이 바뀐 건수}
+    """
+    scanned = changed = 0
+    stale = None if force else SCORING_VERSION
+    for batch in store.iter_parsed(batch_size, stale_version=stale):
+        ids = np.array([r[0] for r in batch], dtype=np.int64)
+        old_scores = np.array([r[1] if r[1] is not None else -1 for r in batch], dtype=np.int64)
+        old_tiers = np.array([r[2] or "" for r in batch])
+
+        scores = score_columns(to_columns([r[3] for r in batch]))
+        tiers = tier_columns(scores)
+
+        store.update_scores(zip(ids.tolist(), scores.tolist(), tiers.tolist()), SCORING_VERSION)
+        scanned += len(batch)
+        changed += int(np.count_nonzero((scores != old_scores) | (tiers != old_tiers)))
+
+    if scanned:
+        # 기존 기록의 점수/등급이 바뀜 → 누적 집계를 처음부터 다시
+        refresh_stats(store, full=True)
+    logger.info(f"점수 재계산 완료: {scanned}건 확인, {changed}건 변경 (버전 {SCORING_VERSION})")
+    return {"scanned": scanned, "changed": changed, "version": SCORING_VERSION}
+
+
+def _new_aggregates():
+    return {
+        "max_id": 0,
+        "scoring_version": SCORING_VERSION,
+        "tiers": {},
+        "scores": {},
+        "nutrients": {name: {"sum": 0.0, "values": {}} for name in NUTRIENTS},
+    }
+
+
+def _add_counts(counts, values):
+    # {값: 개수} 에 values 의 값별 개수를 더함
+    uniq, n = np.unique(values, return_counts=True)
+    for v, c in zip(uniq.tolist(), n.tolist()):
+        counts[v] = counts.get(v, 0) + c
+
+
+def update_aggregates(agg, batch):
+    """
+    누적 집계에 기록 한 배치 반영 (id 순 배치, 마지막 id 를 max_id 로)
+    - 등급별 개수, 점수/영양성분 값별 개수 + 합계 → 평균과 백분위를 원본 없이 정확히 계산
+      (라벨 값은 정수/소수 한 자리라 서로 다른 값의 수가 작음)
+    """
+    matrix = to_matrix([r[3] for r in batch])
+    scores = np.array([r[1] for r in batch if r[1] is not None], dtype=np.float64)
+    _add_counts(agg["tiers"], np.array([r[2] or "" for r in batch]))
+    _add_counts(agg["scores"], scores)
+    for i, name in enumerate(NUTRIENTS):
+        column = matrix[:, i]
+        column = column[~np.isnan(column)]
+        entry = agg["nutrients"][name]
+        entry["sum"] += float(column.sum())
+        _add_counts(entry["values"], column)
+    agg["max_id"] = batch[-1][0]
+
+
+def _percentiles(counts):
+    # {값: 개수} → PERCENTILES 값 (np.percentile 기본 선형 보간과 같은 결과) / 비어 있으면 None
+    if not counts:
+        return None
+    values = np.array(sorted(counts), dtype=np.float64)
+    cum = np.cumsum([counts[v] for v in sorted(counts)])
+    pos = np.array(PERCENTILES) / 100 * (cum[-1] - 1)
+    lo, hi = np.floor(pos), np.ceil(pos)
+    v_lo = values[np.searchsorted(cum, lo, side="right")]
+    v_hi = values[np.searchsorted(cum, hi, side="right")]
+    return v_lo + (v_hi - v_lo) * (pos - lo)
+
+
+def stats_from_aggregates(agg):
+    def clean(v):
+        return None if v is None or np.isnan(v) else round(float(v), 2)
+
+    nutrients = {}
+    for name in NUTRIENTS:
+        entry = agg["nutrients"][name]
+        count = sum(entry["values"].values())
+        pcts = _percentiles(entry["values"])
+        nutrients[name] = {
+            "count": count,
+            "mean": clean(entry["sum"] / count) if count else None,
+            **{f"p{p}": clean(pcts[j]) if pcts is not None else None for j, p in enumerate(PERCENTILES)},
+        }
+
+    scored = sum(agg["scores"].values())
+    score_pcts = _percentiles(agg["scores"])
+    tiers = agg["tiers"]
+    return {
+        "total": sum(tiers.values()),
+        "tiers": {name: tiers.get(name, 0) for name, _ in TIERS},
+        "unscored": tiers.get("", 0),
+        "score": {
+            "mean": clean(sum(v * c for v, c in agg["scores"].items()) / scored) if scored else None,
+            **{f"p{p}": clean(score_pcts[j]) if score_pcts is not None else None for j, p in enumerate(PERCENTILES)},
+        },
+        "nutrients": nutrients,
+    }
+
+
+def _load_aggregates(store):
+    # JSON 객체 키는 문자열 → 값별 개수는 [[값, 개수], ...] 로 저장
+    raw = store.get_meta(AGGREGATES_KEY)
+    if not raw:
+        return None
+    agg = json.loads(raw)
+    agg["scores"] = {v: c for v, c in agg["scores"]}
+    for entry in agg["nutrients"].values():
+        entry["values"] = {v: c for v, c in entry["values"]}
+    return agg
+
+
+def _save_aggregates(store, agg):
+    data = dict(agg, scores=sorted(agg["scores"].items()), nutrients={
+        name: {"sum": e["sum"], "values": sorted(e["values"].items())} for name, e in agg["nutrients"].items()
+    })
+    store.set_meta(AGGREGATES_KEY, json.dumps(data, ensure_ascii=False))
+
+
+def refresh_stats(store, full=False, batch_size=5000):
+    """
+    누적 집계에 지난 max_id 이후 기록만 더해 통계 갱신 (전체 기록을 다시 훑지 않음)
+    full=True 이거나 집계가 없거나 점수 버전이 다르면 처음부터 다시 (rescore 로 기존 기록 점수가 바뀐 경우)
+    """
+    agg = None if full else _load_aggregates(store)
+    if agg is None or agg.get("scoring_version") != SCORING_VERSION:
+        agg = _new_aggregates()
+    for batch in store.iter_parsed(batch_size, after_id=agg["max_id"]):
+        update_aggregates(agg, batch)
+    _save_aggregates(store, agg)
+
+    stats = stats_from_aggregates(agg)
+    stats.update(max_id=agg["max_id"], scoring_version=SCORING_VERSION, computed_at=time.time())
+    store.set_meta(STATS_KEY, json.dumps(stats, ensure_ascii=False))
+    return stats
+
+
+def get_stats(store, max_age=60):
+    """
+    저장된 통계 반환
+    새 기록이 생겼고 계산한 지 max_age 초가 지났을 때만 새 기록을 집계에 반영 (요청마다 훑지 않음)
+    """
+    raw = store.get_meta(STATS_KEY)
+    stats = json.loads(raw) if raw else None
+    if stats is None:
+        return refresh_stats(store)
+    if stats.get("max_id") != store.max_id() and time.time() - stats.get("computed_at", 0) >= max_age:
+        return refresh_stats(store)
+    return stats
+
+
+if __name__ == "__main__":
+    import os
+    import argparse
+
+    from record_store import RecordStore
+
+    parser = argparse.ArgumentParser(description="분석 기록 점수 재계산 / 통계 갱신")
+    parser.add_argument("command", choices=["rescore", "stats"])
+    parser.add_argument("--db", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "records.db"))
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--force", action="store_true", help="rescore: 버전과 상관없이 전체 재계산 / stats: 누적 집계 재구성")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    store = RecordStore(args.db)
+    if args.command == "rescore":
+        print(json.dumps(rescore(store, args.batch, args.force), ensure_ascii=False))
+    else:
+        print(json.dumps(refresh_stats(store, full=args.force), ensure_ascii=False, indent=2))
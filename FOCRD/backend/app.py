@@ -1,21 +1,64 @@
 import os
-import re
-import cv2
+import io
+import sys
 import json
+import time
 import logging
-import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, Response
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 
+from result_cache import ResultCache, make_cache_key
+from record_store import RecordStore
+from jobs import JobQueue, QueueFullError
+from image_pipeline import PREPROCESS_PARAMS, encode_image, preprocess_image
+from ocr_engines import ENGINE_MODES, RemoteOcrEngine, TesseractEngine, OcrEngineSelector
+from nutrition import parse_nutrition
+from scoring import SCORING_VERSION, calculate_score, get_tier
+from analytics import get_stats, refresh_stats
+from near_dup import HASH_METHODS, HashIndex, image_hash
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common.ocr_client import OcrSpaceClient, OcrError, CircuitOpenError
+from common.resources import warm_up
+from common import metrics
+from common.metrics import stage, profiling, profile_requested
+from common.uploads import UploadError, UPLOAD_MAX_BYTES, store_upload, load_upload, install_limits
+
 # =====================[ SETTINGS ]=====================
 OCR_API_KEY = os.getenv("OCR_SPACE_KEY", "K82626647288957")
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-UPLOAD_FOLDER = os.path.join(BASE_DIR, "uploads")
-PROCESSED_FOLDER = os.path.join(BASE_DIR, "processed")
-RECORD_FILE = os.path.join(BASE_DIR, "records.json")
+# 업로드/기록/캐시 위치 (벤치마크 등에서 임시 폴더로 바꿀 때 FOCRD_DATA_DIR)
+DATA_DIR = os.getenv("FOCRD_DATA_DIR", BASE_DIR)
+UPLOAD_FOLDER = os.path.join(DATA_DIR, "uploads")
+PROCESSED_FOLDER = os.path.join(DATA_DIR, "processed")
+RECORD_FILE = os.path.join(DATA_DIR, "records.json")
+RECORD_DB = os.path.join(DATA_DIR, "records.db")
+CACHE_FILE = os.path.join(DATA_DIR, "ocr_cache.json")
+CACHE_DB = os.path.join(DATA_DIR, "ocr_cache.db")
+CACHE_MAX_ENTRIES = int(os.getenv("OCR_CACHE_MAX_ENTRIES", "500"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "32"))
+STATS_MAX_AGE = int(os.getenv("STATS_MAX_AGE", "60"))
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "50"))
+# OCR 대기가 대부분이라 코어 수보다 넉넉하게 (전처리는 OpenCV 가 GIL 을 풀어 코어 수만큼 병렬)
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", str(max(4, 2 * (os.cpu_count() or 2)))))
+# 같은 라벨을 다시 찍은 사진: 지각 해시 해밍 거리가 이 값 이하면 저장된 결과 재사용 (요청별 ?near=0 으로 끔)
+# 기본은 꺼짐(-1): 표준 영양성분표 틀에 숫자만 다른 다른 제품도 해시가 거의 같아서
+#   OCR 없이 다른 제품 값을 돌려줄 수 있음 → 같은 사진을 반복해 올리는 환경에서만 켜고 작게 (재압축/크기/밝기 변화는 0~2)
+NEAR_DUP_DISTANCE = int(os.getenv("NEAR_DUP_DISTANCE", "-1"))
+NEAR_DUP_HASH = os.getenv("NEAR_DUP_HASH", "phash")  # phash | dhash
+if NEAR_DUP_HASH not in HASH_METHODS:
+    raise ValueError(f"NEAR_DUP_HASH 는 {HASH_METHODS} 중 하나여야 합니다: {NEAR_DUP_HASH}")
+
+OCR_LANG = "kor"
+OCR_ENGINE = os.getenv("OCR_ENGINE", "remote")  # remote | local | fallback | race (OCR_RACE_DELAY)
+
+# 디버그용: 전처리 결과를 processed/ 에 저장할지 여부
+SAVE_PROCESSED = os.getenv("SAVE_PROCESSED", "0") == "1"
 
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(PROCESSED_FOLDER, exist_ok=True)
@@ -23,11 +66,13 @@ os.makedirs(PROCESSED_FOLDER, exist_ok=True)
 app = Flask(__name__)
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
 app.config["JSON_AS_ASCII"] = False
+# 업로드 크기 제한 (UPLOAD_MAX_BYTES), 배치는 요청 하나에 파일 BATCH_MAX_ITEMS 개까지
+install_limits(app, route_limits={"analyze_batch": BATCH_MAX_ITEMS * UPLOAD_MAX_BYTES})
 
 CORS(app, resources={r"/*": {"origins": "*"}})
 
 # Logging
-log_path = os.path.join(BASE_DIR, "app.log")
+log_path = os.path.join(DATA_DIR, "app.log")
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s [%(levelname)s] %(message)s",
@@ -35,172 +80,43 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# OCR.Space 공용 클라이언트 (커넥션 풀 + 재시도 + 속도 제한 + 서킷 브레이커)
+ocr_client = OcrSpaceClient(
+    OCR_API_KEY,
+    timeout=20,
+    rate_per_minute=int(os.getenv("OCR_SPACE_RATE_PER_MIN", "60")),
+)
 
-# =====================[ IMAGE PREPROCESS ]=====================
-def preprocess_image(src, dst):
-    img = cv2.imread(src)
-
-    # ---- 1. 그레이스케일 ----
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-
-    # ---- 2. 노이즈 제거 ----
-    gray = cv2.bilateralFilter(gray, 5, 150, 150)
-
-    # ---- 3. 대비 증가(명암 강조) ----
-    clahe = cv2.createCLAHE(clipLimit=2.5, tileGridSize=(5, 5))
-    gray = clahe.apply(gray)
-
-    # ---- 4. 선명도 강화 ----
-    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 1))
-    sharp = cv2.filter2D(gray, -1, kernel)
-
-    # ---- 5. adaptive threshold ----
-    th1 = cv2.adaptiveThreshold(
-        sharp, 255,
-        cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-        cv2.THRESH_BINARY,
-        25, 10
-    )
-
-    # ---- 6. 확대 업샘플링 ----
-    th1 = cv2.resize(th1, None, fx=3, fy=3, interpolation=cv2.INTER_LINEAR)
-
-    # ---- 첫 번째 버전 저장 ----
-    cv2.imwrite(dst, th1)
-
-
-# =====================[ OCR SPACE API ]=====================
-def ocr_space(img_path, lang="kor"):
-    url = "https://api.ocr.space/parse/image"
-
-    try:
-        with open(img_path, "rb") as f:
-            resp = requests.post(
-                url,
-                files={"filename": f},
-                data={"apikey": OCR_API_KEY, "language": lang, "OCREngine": 2},
-                timeout=20
-            )
-
-        result = resp.json()
-        parsed = result.get("ParsedResults", [])
-        return parsed[0].get("ParsedText", "") if parsed else ""
-
-    except Exception as e:
-        logging.error(f"OCR API 오류: {str(e)}")
-        return ""
-
-
-# =====================[ NUTRITION PARSER ]=====================
-NUTRIENT_PATTERNS = {
-    "칼로리(kcal)": ["칼로리", "열량", "kcal", "kc"],
-    "나트륨(mg)": ["나트륨", "sodium", "소듐", "나트"],
-    "탄수화물(g)": ["탄수", "탄수화물", "carb"],
-    "당류(g)": ["당류", "당", "sugar"],
-    "지방(g)": ["지방", "fat"],
-    "트랜스지방(g)": ["트랜스", "trans"],
-    "포화지방(g)": ["포화", "saturated"],
-    "콜레스테롤(mg)": ["콜레스", "cholesterol"],
-    "단백질(g)": ["단백질", "protein", "prot"]
-}
-
-VAL_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(mg|g|kcal|%)", re.IGNORECASE)
-
-
-def normalize_text(s):
-    return (
-        s.replace(" ", "")
-        .replace("％", "%")
-        .replace("㎎", "mg")
-        .replace("그램", "g")
-        .replace("kca", "kcal")
-        .replace("kc", "kcal")
-        .strip()
-        .lower()
-    )
-
-
-def parse_nutrition(text):
-    lines = [normalize_text(l) for l in text.splitlines() if l.strip()]
-    data = {k: None for k in NUTRIENT_PATTERNS.keys()}
-
-    for idx, line in enumerate(lines):
-        for nutrient, keys in NUTRIENT_PATTERNS.items():
-            if any(k in line for k in keys):
-
-                targets = [line]
-                if idx + 1 < len(lines):
-                    targets.append(lines[idx + 1])
-
-                for t in targets:
-                    matches = VAL_RE.findall(t)
-                    for v, u in matches:
-                        if u.lower() in ["g", "mg", "kcal"]:
-                            data[nutrient] = float(v)
-                            break
-    return data
-
-
-# =====================[ SCORE + TIER ]=====================
-def calculate_score(parsed):
-    protein = parsed.get("단백질(g)", 0)
-    sugar = parsed.get("당류(g)", 0)
-    fat = parsed.get("지방(g)", 0)
-    sat_fat = parsed.get("포화지방(g)", 0)
-    calories = parsed.get("칼로리(kcal)", 0)
-    sodium = parsed.get("나트륨(mg)", 0)
-    cholesterol = parsed.get("콜레스테롤(mg)", 0)
-    trans = parsed.get("트랜스지방(g)", 0)
-
-    protein_score = min(protein, 20)
-    sugar_score = max(20 - sugar, 0)
-    fat_score = max(10 - fat * 0.5, 0)
-    sat_fat_score = max(10 - sat_fat, 0)
-    calorie_score = max(10 - ((calories - 100) / 40), 0) if calories > 100 else 10
-    sodium_score = max(10 - (sodium / 200), 0)
-    cholesterol_score = max(5 - (cholesterol / 60), 0)
-    trans_score = 5 if trans == 0 else 0
-
-    total = (
-        protein_score + sugar_score + fat_score + sat_fat_score +
-        calorie_score + sodium_score + cholesterol_score + trans_score
-    )
-
-    return int(total)
-
-
-def get_tier(score):
-    if score >= 85:
-        return "A"
-    elif score >= 65:
-        return "B"
-    else:
-        return "C"
+# OCR 엔진 선택 (요청별 ?engine= 또는 OCR_ENGINE 설정)
+ocr_engines = OcrEngineSelector(
+    remote=RemoteOcrEngine(ocr_client, lang=OCR_LANG),
+    local=TesseractEngine(lang=os.getenv("TESSERACT_LANG", "kor+eng")),
+    default_mode=OCR_ENGINE,
+)
 
 
 # =====================[ 기록 저장 ]=====================
 def save_record(record):
     try:
-        if not os.path.exists(RECORD_FILE):
-            with open(RECORD_FILE, "w", encoding="utf-8") as f:
-                json.dump([], f, indent=4, ensure_ascii=False)
-
-        with open(RECORD_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        data.append(record)
-
-        with open(RECORD_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
-
+        with stage("persist"):
+            return record_store.add(record)
     except Exception as e:
         logger.error(f"Record Save Error: {e}")
 
 
+def find_near_duplicate(img_hash):
+    # 색인에서 가장 가까운 기록 (NEAR_DUP_DISTANCE 이내) → 기록 dict + distance, 없으면 None
+    match = near_index.find(img_hash, NEAR_DUP_DISTANCE)
+    if match is None:
+        return None
+    record = record_store.get(match[0])
+    return dict(record, distance=match[1]) if record else None
+
+
 # =====================[ ROUTES ]=====================
 @app.route("/health")
 def health():
-    return jsonify({"ok": True})
+    return jsonify({"ok": True, "ocr": ocr_client.metrics.snapshot(), "ocr_circuit": ocr_client.breaker.state})
 
 
 @app.route("/api/upload", methods=["POST"])
@@ -209,30 +125,108 @@ def upload():
     if not f:
         return jsonify({"ok": False, "error": "No file"}), 400
 
-    filename = secure_filename(f.filename)
-    f.save(os.path.join(UPLOAD_FOLDER, filename))
-
-    return jsonify({"ok": True, "filename": filename})
-
+    # 내용 해시 이름으로 저장 → 응답의 filename 으로 분석 요청
+    try:
+        with stage("upload"):
+            upload = store_upload(f, UPLOAD_FOLDER)
+    except UploadError as e:
+        return jsonify({"ok": False, "error": str(e)}), e.status
+
+    # ?analyze=1 이면 업로드 바이트로 바로 분석 (디스크 재읽기 없음)
+    if request.args.get("analyze") == "1":
+        result, status_code = run_analysis(
+            upload.filename, upload, engine=request.args.get("engine"), near=request.args.get("near") != "0"
+        )
+        return jsonify(result), status_code
 
-@app.route("/api/analyze")
-def analyze():
-    filename = request.args.get("filename")
-    src = os.path.join(UPLOAD_FOLDER, filename)
-    processed = os.path.join(PROCESSED_FOLDER, filename + "_p.png")
+    return jsonify({
+        "ok": True,
+        "filename": upload.filename,
+        "original_filename": upload.original,
+        "duplicate": upload.duplicate
+    })
 
-    preprocess_image(src, processed)
 
-    text = ocr_space(processed)
-    parsed = parse_nutrition(text)
+def run_analysis(filename, upload=None, engine=None, near=True):
+    """
+    전처리 → OCR → 파싱 → 점수 → 기록 저장
+    upload 가 있으면 그 바이트/해시를 그대로 사용, 없으면 uploads/ 에서 한 번 읽음
+    engine: remote | local | fallback | race (없으면 OCR_ENGINE)
+    near: 결과 캐시에 없을 때 비슷한 이미지(지각 해시)의 기존 기록을 재사용할지 여부
+    반환: (응답 dict, HTTP 상태 코드)  — 동기 요청/작업 큐 공용
+    """
+    engine = engine or OCR_ENGINE
+    if engine not in ENGINE_MODES:
+        return {"ok": False, "error": f"지원하지 않는 OCR 엔진입니다: {engine}"}, 400
+
+    if upload is None:
+        try:
+            with stage("read"):
+                upload = load_upload(UPLOAD_FOLDER, filename)
+        except UploadError as e:
+            return {"ok": False, "error": str(e)}, e.status
+        if upload is None:
+            return {"ok": False, "error": "파일이 없습니다."}, 404
+
+    cache_key = make_cache_key(upload.digest, PREPROCESS_PARAMS, f"{OCR_LANG}:{engine}")
+    img_hash = near_record = None
+
+    # 같은 이미지 + 같은 설정이면 전처리/OCR 생략
+    with stage("cache"):
+        cached = result_cache.get(cache_key)
+    if cached is not None:
+        cache_status = "hit"
+        text = cached["text"]
+        parsed = cached["parsed"]
+        engine_used = cached.get("engine")
+    else:
+        try:
+            with stage("decode"):
+                img = upload.image()
+        except UploadError as e:
+            return {"ok": False, "error": str(e)}, e.status
+
+        # 다시 찍은 같은 라벨이면 전처리/OCR 생략
+        if NEAR_DUP_DISTANCE >= 0:
+            with stage("hash"):
+                img_hash = image_hash(img, NEAR_DUP_HASH)
+                near_record = find_near_duplicate(img_hash) if near else None
+
+    if near_record is not None:
+        cache_status = "near"
+        text = near_record["text"]
+        parsed = near_record["parsed"]
+        engine_used = None
+    elif cached is None:
+        cache_status = "miss"
+        processed = preprocess_image(img)
+        if SAVE_PROCESSED:
+            image_bytes, ext = encode_image(processed)
+            with open(os.path.join(PROCESSED_FOLDER, filename + "_p." + ext), "wb") as out:
+                out.write(image_bytes)
+
+        try:
+            text, parsed, engine_used = ocr_engines.run(processed, parse_nutrition, mode=engine)
+        except CircuitOpenError as e:
+            return {"ok": False, "error": str(e)}, 503
+        except OcrError as e:
+            logger.error(f"OCR 오류: {e}")
+            return {"ok": False, "error": "OCR 요청에 실패했습니다. 잠시 후 다시 시도해주세요."}, 502
+
+        # OCR 실패(빈 텍스트)는 캐시하지 않음
+        if text:
+            with stage("cache"):
+                result_cache.put(cache_key, text, parsed, engine=engine_used)
 
     # 하나라도 None이면 실패 처리
     if any(v is None for v in parsed.values()):
-        return jsonify({
+        return {
             "ok": False,
             "error": "영양성분 인식이 불완전합니다. 이미지를 다시 업로드해주세요.",
-            "parsed": parsed
-        }), 400
+            "parsed": parsed,
+            "engine": engine_used,
+            "cache": cache_status
+        }, 400
 
     score = calculate_score(parsed)
     tier = get_tier(score)
@@ -244,25 +238,276 @@ def analyze():
         "score": score,
         "tier": tier,
         "text": text,
-        "timestamp": datetime.now().isoformat()
+        "timestamp": datetime.now().isoformat(),
+        "score_version": SCORING_VERSION,
+        "image_hash": f"{NEAR_DUP_HASH}:{img_hash:016x}" if img_hash is not None else None
     }
-    save_record(record)
+    record_id = save_record(record)
+    if record_id and img_hash is not None:
+        near_index.add(img_hash, record_id)
 
-    return jsonify({
+    result = {
         "ok": True,
+        "id": record_id,
         "filename": filename,
         "parsed": parsed,
         "text": text,
         "score": score,
-        "tier": tier
+        "tier": tier,
+        "engine": engine_used,
+        "cache": cache_status
+    }
+    if near_record is not None:
+        result["near_duplicate"] = {"id": near_record["id"], "distance": near_record["distance"]}
+    return result, 200
+
+
+def run_analysis_job(filename, upload=None, engine=None, profile=False, near=True):
+    # 작업 큐용: 프로파일 요청이면 워커 스레드에서 단계별 시간을 모아 결과에 포함
+    if not profile:
+        return run_analysis(filename, upload, engine, near)
+    with profiling() as stages:
+        result, status_code = run_analysis(filename, upload, engine, near)
+    return dict(result, profile=stages), status_code
+
+
+# =====================[ SETUP ]=====================
+def init_services():
+    """
+    서버 준비: 캐시/기록 DB (JSON 이관), 유사 이미지 색인 재구성, 예열, 작업 큐 워커 시작
+    Tesseract 워커(forkserver/spawn)는 python app.py 로 실행하면 이 파일을 __mp_main__ 으로 다시 import
+    → 워커에서는 호출하지 않음 (워커는 common.tesseract_pool 함수만 실행)
+    """
+    global result_cache, record_store, near_index, job_queue
+
+    # OCR 결과 캐시 (기존 ocr_cache.json 은 최초 1회만 이관)
+    result_cache = ResultCache(CACHE_DB, max_entries=CACHE_MAX_ENTRIES)
+    result_cache.migrate_json(CACHE_FILE)
+
+    # 기록 저장소 (기존 records.json 은 최초 1회만 이관)
+    record_store = RecordStore(RECORD_DB)
+    record_store.migrate_json(RECORD_FILE)
+
+    # 유사 이미지 색인: 저장된 기록의 지각 해시로 재구성 (해시 방식이 다른 기록은 제외)
+    # 조각 수는 NEAR_DUP_DISTANCE 기준 → find 는 만들 때의 max_distance 보다 큰 반경을 잘라내므로 맞춰야 함
+    near_index = HashIndex(max_distance=max(NEAR_DUP_DISTANCE, 0))
+    for record_id, value in record_store.iter_hashes(NEAR_DUP_HASH + ":"):
+        near_index.add(int(value.split(":", 1)[1], 16), record_id)
+
+    # 전처리 파이프라인 예열 (첫 요청의 초기화/버퍼 할당 비용 제거, WARMUP=0 으로 끔)
+    warm_up()
+
+    job_queue = JobQueue(run_analysis_job, workers=JOB_WORKERS, max_queue=JOB_QUEUE_SIZE)
+
+
+if __name__ != "__mp_main__":
+    init_services()
+
+# 일괄 분석용 풀: 전처리(OpenCV 는 GIL 해제)는 코어 수만큼 병렬, OCR 호출은 클라이언트 속도 제한 안에서 동시 진행
+batch_pool = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix="batch")
+
+
+def _collect_gauges():
+    ocr = ocr_client.metrics.snapshot()
+    queue = job_queue.stats()
+    gauges = [
+        ("ocr_requests_total", {}, ocr["requests"]),
+        ("ocr_errors_total", {}, ocr["errors"]),
+        ("ocr_retries_total", {}, ocr["retries"]),
+        ("ocr_rejected_total", {}, ocr["rejected"]),
+        ("ocr_circuit_open", {}, int(ocr_client.breaker.state != "closed")),
+        ("job_queue_depth", {}, queue["queued"]),
+        ("near_dup_index_size", {}, len(near_index)),
+    ]
+    gauges += [("jobs", {"status": k}, v) for k, v in queue["jobs"].items()]
+    return gauges
+
+
+metrics.install(app)
+metrics.add_collector(_collect_gauges)
+
+
+@app.route("/api/analyze", methods=["GET"])
+def analyze():
+    result, status_code = run_analysis(
+        secure_filename(request.args.get("filename", "")),
+        engine=request.args.get("engine"),
+        near=request.args.get("near") != "0",
+    )
+    return jsonify(result), status_code
+
+
+@app.route("/api/analyze", methods=["POST"])
+def analyze_async():
+    body = request.get_json(silent=True) or {}
+    filename = secure_filename(body.get("filename") or request.args.get("filename", ""))
+    if not filename:
+        return jsonify({"ok": False, "error": "filename 이 필요합니다."}), 400
+
+    try:
+        job_id = job_queue.submit(
+            filename,
+            None,
+            body.get("engine") or request.args.get("engine"),
+            profile_requested(request),
+            body.get("near", request.args.get("near") != "0") is not False,
+        )
+    except QueueFullError:
+        return jsonify({"ok": False, "error": "분석 대기열이 가득 찼습니다. 잠시 후 다시 시도해주세요."}), 429
+
+    return jsonify({"ok": True, "job_id": job_id, "status_url": f"/api/jobs/{job_id}"}), 202
+
+
+@app.route("/api/analyze/batch", methods=["POST"])
+def analyze_batch():
+    """
+    여러 이미지를 한 번에 분석 → 끝나는 순서대로 NDJSON 한 줄씩 전송
+    - multipart files (여러 개) 그리고/또는 filenames (JSON 배열 / 폼 필드 반복, 이미 업로드한 파일)
+    - 항목별 실패는 그 줄의 ok/status 로 표시, 마지막 줄은 {"summary": ...}
+    """
+    body = request.get_json(silent=True) or {}
+    engine = body.get("engine") or request.args.get("engine")
+    near = body.get("near", request.args.get("near") != "0") is not False
+    files = [f for f in request.files.getlist("files") + request.files.getlist("file") if f.filename]
+    names = body.get("filenames") or request.form.getlist("filenames")
+    if not isinstance(names, list):
+        return jsonify({"ok": False, "error": "filenames 는 배열이어야 합니다."}), 400
+    if not files and not names:
+        return jsonify({"ok": False, "error": "files 또는 filenames 가 필요합니다."}), 400
+    if len(files) + len(names) > BATCH_MAX_ITEMS:
+        return jsonify({"ok": False, "error": f"한 번에 최대 {BATCH_MAX_ITEMS}개까지 분석할 수 있습니다."}), 400
+
+    # 요청 본문은 응답 스트림 시작 전에 모두 읽어 저장
+    start = time.perf_counter()
+    futures, failures = {}, []
+    for index, f in enumerate(files):
+        try:
+            upload = store_upload(f, UPLOAD_FOLDER)
+        except UploadError as e:
+            failures.append((index, f.filename, {"ok": False, "error": str(e)}, e.status))
+            continue
+        futures[batch_pool.submit(run_analysis, upload.filename, upload, engine, near)] = (index, f.filename)
+    for index, name in enumerate(names, start=len(files)):
+        futures[batch_pool.submit(run_analysis, secure_filename(str(name)), None, engine, near)] = (index, name)
+
+    def line(index, source, result, status_code):
+        item = {"index": index, "source": source, "status": status_code, **result}
+        return json.dumps(item, ensure_ascii=False) + "\n"
+
+    def stream():
+        ok = 0
+        for failure in failures:
+            yield line(*failure)
+        for future in as_completed(futures):
+            index, source = futures[future]
+            try:
+                result, status_code = future.result()
+            except Exception as e:
+                logger.error(f"일괄 분석 실패 ({source}): {e}")
+                result, status_code = {"ok": False, "error": str(e)}, 500
+            ok += bool(result.get("ok"))
+            yield line(index, source, result, status_code)
+
+        total = len(futures) + len(failures)
+        yield json.dumps({"summary": {
+            "total": total,
+            "ok": ok,
+            "failed": total - ok,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)
+        }}) + "\n"
+
+    return Response(stream(), mimetype="application/x-ndjson", headers={"Cache-Control": "no-cache"})
+
+
+@app.route("/api/jobs/<job_id>")
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"ok": False, "error": "작업을 찾을 수 없습니다."}), 404
+    return jsonify({"ok": True, "job": job})
+
+
+@app.route("/api/jobs/<job_id>/events")
+def job_events(job_id):
+    # SSE: 상태가 바뀔 때마다 전송, done/failed 이면 종료
+    def stream():
+        status = None
+        while True:
+            job = job_queue.wait(job_id, last_status=status)
+            if job is None:
+                yield f"event: error\ndata: {json.dumps({'error': 'not found'})}\n\n"
+                return
+            if job["status"] != status:
+                status = job["status"]
+                yield f"data: {json.dumps(job, ensure_ascii=False)}\n\n"
+            else:
+                yield ": keep-alive\n\n"
+            if status in ("done", "failed"):
+                return
+
+    return Response(stream(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@app.route("/api/history")
+def history():
+    try:
+        page = max(int(request.args.get("page", 1)), 1)
+        page_size = min(max(int(request.args.get("page_size", 20)), 1), 100)
+    except ValueError:
+        return jsonify({"ok": False, "error": "page/page_size 는 정수여야 합니다."}), 400
+
+    records, total = record_store.query(
+        filename=request.args.get("filename"),
+        tier=request.args.get("tier"),
+        since=request.args.get("since"),
+        until=request.args.get("until"),
+        page=page,
+        page_size=page_size,
+    )
+    return jsonify({
+        "ok": True,
+        "data": records,
+        "page": page,
+        "page_size": page_size,
+        "total": total
     })
 
 
+@app.route("/api/history/<int:record_id>")
+def history_detail(record_id):
+    record = record_store.get(record_id)
+    if record is None:
+        return jsonify({"ok": False, "error": "기록을 찾을 수 없습니다."}), 404
+    return jsonify({"ok": True, "data": record})
+
+
+@app.route("/api/stats")
+def stats():
+    # 미리 계산해 둔 등급 분포 / 영양성분 백분위 (새 기록이 있으면 STATS_MAX_AGE 초마다 갱신, ?refresh=1 로 즉시)
+    if request.args.get("refresh") == "1":
+        data = refresh_stats(record_store)
+    else:
+        data = get_stats(record_store, max_age=STATS_MAX_AGE)
+    return jsonify({"ok": True, "data": data})
+
+
 @app.route("/api/processed")
 def get_processed():
-    filename = request.args.get("filename")
+    filename = secure_filename(request.args.get("filename", ""))
     path = os.path.join(PROCESSED_FOLDER, filename + "_p.png")
-    return send_file(path)
+    if os.path.exists(path):
+        return send_file(path)
+
+    # 디버그 저장이 꺼져 있으면 원본에서 다시 만들어 바로 전송
+    try:
+        upload = load_upload(UPLOAD_FOLDER, filename)
+        if upload is None:
+            return jsonify({"ok": False, "error": "파일이 없습니다."}), 404
+        processed = preprocess_image(upload.image())
+    except UploadError as e:
+        return jsonify({"ok": False, "error": str(e)}), e.status
+    image_bytes, _ = encode_image(processed, fmt="png")
+    return send_file(io.BytesIO(image_bytes), mimetype="image/png")
 
 
 # =====================[ RUN ]=====================
@@ -0,0 +1,118 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+
+import cv2
+import numpy as np
+import requests
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common.ocr_stub_server import serve
+
+# 일괄 분석(/api/analyze/batch) vs 한 장씩 업로드 + 분석 (요청 2번/장) 처리량 비교
+#   python bench_batch.py --images 24 --ocr-latency 0.3 --rate 600 --rounds 2
+# 로컬 OCR 스텁 서버 + 임시 데이터 폴더(FOCRD_DATA_DIR)에서 실행 → 실제 기록/캐시는 건드리지 않음
+# 유사 이미지 재사용은 끔 (같은 틀의 라벨 이미지라 먼저 돈 쪽 기록으로 OCR 없이 답할 수 있음)
+# 라운드마다 serial/batch 순서를 번갈아 실행 + 이미지는 라운드/방식마다 새로 → 캐시/예열 이득이 한쪽에 몰리지 않음
+
+SAMPLE_TEXT = "칼로리 185kcal\n나트륨 200mg\n탄수화물 15g\n당류 7g\n지방 7g\n트랜스지방 0g\n포화지방 5g\n콜레스테롤 0mg\n단백질 15g"
+
+
+def make_images(n, seed):
+    # 캐시가 맞지 않도록 장마다 다른 내용의 라벨 비슷한 이미지
+    rng = np.random.default_rng(seed)
+    images = []
+    for i in range(n):
+        img = np.full((900, 1200, 3), 255, np.uint8)
+        for row in range(12):
+            y = 80 + row * 65
+            cv2.putText(img, f"Item {row} {rng.integers(0, 999)} mg", (60, y), cv2.FONT_HERSHEY_SIMPLEX,
+                        1.4, (0, 0, 0), 3)
+        noise = rng.integers(0, 30, img.shape, dtype=np.uint8)
+        img = cv2.subtract(img, noise)
+        ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        images.append((f"bench_{seed}_{i}.jpg", buf.tobytes()))
+    return images
+
+
+def run_serial(base, images):
+    session = requests.Session()
+    ok = 0
+    for name, data in images:
+        r = session.post(f"{base}/api/upload", files={"file": (name, data, "image/jpeg")})
+        filename = r.json()["filename"]
+        r = session.get(f"{base}/api/analyze", params={"filename": filename})
+        ok += bool(r.json().get("ok"))
+    return ok
+
+
+def run_batch(base, images):
+    files = [("files", (name, data, "image/jpeg")) for name, data in images]
+    ok, first_ms, start = 0, None, time.perf_counter()
+    with requests.post(f"{base}/api/analyze/batch", files=files, stream=True) as r:
+        for raw in r.iter_lines():
+            item = json.loads(raw)
+            if "summary" in item:
+                continue
+            if first_ms is None:
+                first_ms = (time.perf_counter() - start) * 1000
+            ok += bool(item.get("ok"))
+    return ok, first_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FOCRD 일괄 분석 처리량 벤치마크")
+    parser.add_argument("--images", type=int, default=24)
+    parser.add_argument("--ocr-latency", type=float, default=0.3, help="스텁 OCR 응답 지연(초)")
+    parser.add_argument("--rate", type=int, default=600, help="OCR 분당 요청 한도 (OCR_SPACE_RATE_PER_MIN)")
+    parser.add_argument("--workers", type=int, help="BATCH_WORKERS (기본: max(4, 코어 수 x 2))")
+    parser.add_argument("--rounds", type=int, default=2, help="serial/batch 순서를 번갈아 반복할 횟수")
+    args = parser.parse_args()
+
+    stub = serve(port=0, text=SAMPLE_TEXT, latency=args.ocr_latency)
+    os.environ["OCR_SPACE_URL"] = f"http://127.0.0.1:{stub.server_port}/parse/image"
+    os.environ["OCR_SPACE_RATE_PER_MIN"] = str(args.rate)
+    os.environ["FOCRD_DATA_DIR"] = tempfile.mkdtemp(prefix="focrd_bench_")
+    os.environ["NEAR_DUP_DISTANCE"] = "-1"
+    if args.workers:
+        os.environ["BATCH_WORKERS"] = str(args.workers)
+
+    from werkzeug.serving import make_server
+    import app as focrd
+
+    server = make_server("127.0.0.1", 0, focrd.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    serial_s = batch_s = 0.0
+    serial_ok = batch_ok = 0
+    first = []
+    for r in range(args.rounds):
+        order = ("serial", "batch") if r % 2 == 0 else ("batch", "serial")
+        for i, mode in enumerate(order):
+            images = make_images(args.images, seed=2 * r + i + 1)
+            start = time.perf_counter()
+            if mode == "serial":
+                serial_ok += run_serial(base, images)
+                serial_s += time.perf_counter() - start
+            else:
+                ok, first_ms = run_batch(base, images)
+                batch_s += time.perf_counter() - start
+                batch_ok += ok
+                first.append(first_ms)
+
+    n = args.images * args.rounds
+    print(f"이미지 {args.images}장 x {args.rounds}라운드, OCR 지연 {args.ocr_latency}s, "
+          f"분당 한도 {args.rate}, 워커 {focrd.BATCH_WORKERS}")
+    print(f"serial : {serial_s:6.2f}s  {n / serial_s:6.2f}장/s  성공 {serial_ok}/{n}")
+    print(f"batch  : {batch_s:6.2f}s  {n / batch_s:6.2f}장/s  성공 {batch_ok}/{n}  "
+          f"첫 결과 {np.mean(first):.0f}ms  ({serial_s / batch_s:.1f}x)")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import os
+import time
+import random
+import argparse
+
+import cv2
+import numpy as np
+
+from near_dup import HASH_METHODS, HashIndex, image_hash, hamming, popcount
+
+# 유사 이미지 검색 점검
+#   python bench_near_dup.py --image testpicture.jpeg --index-size 100000
+# 1) 같은 라벨을 다시 찍은 것처럼 변형한 이미지 vs 다른 라벨의 해시 거리 → NEAR_DUP_DISTANCE 정할 때 참고
+# 2) 다중 색인 해싱 검색 vs 전체 비교 시간
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def variants(img):
+    h, w = img.shape[:2]
+    out = {}
+    ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 60])
+    out["jpeg q60"] = cv2.imdecode(buf, cv2.IMREAD_COLOR)
+    out["resize 0.7"] = cv2.resize(img, (int(w * 0.7), int(h * 0.7)), interpolation=cv2.INTER_AREA)
+    out["brightness +25"] = cv2.add(img, np.full_like(img, 25))
+    out["contrast 0.8"] = cv2.convertScaleAbs(img, alpha=0.8, beta=10)
+    out["crop 3%"] = img[int(h * 0.03):h - int(h * 0.03), int(w * 0.03):w - int(w * 0.03)]
+    m = cv2.getRotationMatrix2D((w / 2, h / 2), 2, 1.0)
+    out["rotate 2deg"] = cv2.warpAffine(img, m, (w, h), borderMode=cv2.BORDER_REPLICATE)
+    out["blur 5"] = cv2.GaussianBlur(img, (5, 5), 0)
+    return out
+
+
+def other_labels(img, n, seed):
+    # 같은 배치의 다른 라벨 흉내: 원본을 섞어 붙이거나 뒤집어 배치가 비슷하지만 내용이 다른 이미지
+    rng = np.random.default_rng(seed)
+    h, w = img.shape[:2]
+    out = {}
+    out["flip"] = cv2.flip(img, 1)
+    out["upside down"] = cv2.flip(img, 0)
+    for i in range(n):
+        strips = np.array_split(img, 8, axis=0)
+        order = rng.permutation(len(strips))
+        out[f"shuffled {i}"] = np.vstack([strips[j] for j in order])
+    return out
+
+
+def bench_index(size, radius, queries, seed):
+    rnd = random.Random(seed)
+    hashes = [rnd.getrandbits(64) for _ in range(size)]
+    index = HashIndex(max_distance=radius)
+    start = time.perf_counter()
+    for i, h in enumerate(hashes):
+        index.add(h, i)
+    build_s = time.perf_counter() - start
+
+    # 색인에 있는 해시를 조금 흔든 질의 (절반) + 무관한 질의 (절반)
+    probes = []
+    for i in range(queries):
+        if i % 2 == 0:
+            h = hashes[rnd.randrange(size)]
+            for bit in rnd.sample(range(64), rnd.randint(0, radius)):
+                h ^= 1 << bit
+            probes.append(h)
+        else:
+            probes.append(rnd.getrandbits(64))
+
+    start = time.perf_counter()
+    found = [index.find(h, radius) for h in probes]
+    tree_us = (time.perf_counter() - start) * 1e6 / queries
+
+    arr = np.array(hashes, dtype=np.uint64)
+    start = time.perf_counter()
+    linear = []
+    for h in probes:
+        d = popcount(arr ^ np.uint64(h))
+        j = int(d.argmin())
+        linear.append(int(d[j]) if d[j] <= radius else None)
+    linear_us = (time.perf_counter() - start) * 1e6 / queries
+
+    agree = sum((f[1] if f else None) == l for f, l in zip(found, linear))
+    print(f"\n색인 {size}개 (구성 {build_s:.2f}s), 반경 {radius}, 질의 {queries}개")
+    print(f"다중 색인 : {tree_us:9.1f} µs/질의")
+    print(f"전체 비교 : {linear_us:9.1f} µs/질의 (numpy)")
+    print(f"최단 거리 일치: {agree}/{queries}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="지각 해시 유사 이미지 검색 점검")
+    parser.add_argument("--image", default=os.path.join(BASE_DIR, "testpicture.jpeg"))
+    parser.add_argument("--index-size", type=int, default=100000)
+    parser.add_argument("--radius", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    img = cv2.imread(args.image)
+    if img is None:
+        print(f"이미지를 읽을 수 없습니다: {args.image}")
+        return
+
+    same, other = variants(img), other_labels(img, 4, seed=0)
+    print(f"{'':16}" + "".join(f"{m:>8}" for m in HASH_METHODS))
+    base = {m: image_hash(img, m) for m in HASH_METHODS}
+    for group, items in (("같은 라벨", same), ("다른 이미지", other)):
+        print(f"[{group}]")
+        for name, v in items.items():
+            print(f"  {name:14}" + "".join(f"{hamming(base[m], image_hash(v, m)):8d}" for m in HASH_METHODS))
+
+    start = time.perf_counter()
+    for _ in range(200):
+        image_hash(img, "phash")
+    print(f"\nphash 계산: {(time.perf_counter() - start) * 1000 / 200:.2f} ms/장 ({img.shape[1]}x{img.shape[0]})")
+
+    bench_index(args.index_size, args.radius, args.queries, seed=0)
+
+
+if __name__ == "__main__":
+    main()
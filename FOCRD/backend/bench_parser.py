@@ -0,0 +1,178 @@
+import os
+import re
+import glob
+import json
+import time
+import sqlite3
+from contextlib import closing
+import argparse
+
+from nutrition import NUTRIENT_PATTERNS, parse_nutrition, scan_nutrition
+
+# 기존 중첩 루프 파서 vs 단일 스캔 파서 비교
+#   python bench_parser.py --corpus ocr_cache.db records.json ../../Ocr/input --repeat 2000
+# corpus: OCR 텍스트 .txt 파일/폴더, 결과 캐시(ocr_cache.db, 이관 전 ocr_cache.json), 기록(records.json)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CORPUS = [
+    os.path.join(BASE_DIR, "ocr_cache.db"),
+    os.path.join(BASE_DIR, "ocr_cache.json"),
+    os.path.join(BASE_DIR, "records.json"),
+    os.path.join(BASE_DIR, "..", "..", "Ocr", "input"),
+]
+
+# =====================[ REGRESSION ]=====================
+# (OCR 텍스트, 기대 결과 중 확인할 항목) — 벤치마크 전에 항상 확인
+REGRESSION_CASES = [
+    # "제공량당" 의 "당" 이 1회 제공량 값을 당류로 가져가면 안 됨
+    ("1회 제공량당 30g\n열량 120kcal\n당류 5g", {"칼로리(kcal)": 120.0, "당류(g)": 5.0}),
+    ("100g당 열량 200kcal\n당 12g", {"칼로리(kcal)": 200.0, "당류(g)": 12.0}),
+    # 짧은 "당" 으로 잡은 값은 뒤의 정확한 "당류" 값으로 교체
+    ("당 4g\n당류 6g", {"당류(g)": 6.0}),
+    # 단위 뒤에 띄어 쓴 "당" 은 키워드 (붙어 있을 때만 "100g당" 으로 봄)
+    ("나트륨 120mg 당 3g", {"나트륨(mg)": 120.0, "당류(g)": 3.0}),
+    ("탄수화물 20g 당 3g", {"탄수화물(g)": 20.0, "당류(g)": 3.0}),
+    # OCR.Space 는 CRLF → 빈 줄("\r\n\r\n")이 있어도 키워드와 다음 줄 값이 이어져야 함
+    ("나트륨\r\n\r\n120mg\r\n당류\r\n\r\n5g", {"나트륨(mg)": 120.0, "당류(g)": 5.0}),
+    ("포화지방 1.5g 트랜스지방 0g 지방 3g", {"포화지방(g)": 1.5, "트랜스지방(g)": 0.0, "지방(g)": 3.0}),
+]
+
+
+def check_regressions(parse):
+    failed = 0
+    for text, expected in REGRESSION_CASES:
+        got = parse(text)
+        wrong = {k: got.get(k) for k, v in expected.items() if got.get(k) != v}
+        if wrong:
+            failed += 1
+            print(f"회귀 실패: {text!r} → {wrong} (기대 {expected})")
+    print(f"회귀 사례 {len(REGRESSION_CASES) - failed}/{len(REGRESSION_CASES)} 통과")
+    return failed
+
+
+# =====================[ LEGACY ]=====================
+LEGACY_PATTERNS = {
+    "칼로리(kcal)": ["칼로리", "열량", "kcal", "kc"],
+    "나트륨(mg)": ["나트륨", "sodium", "소듐", "나트"],
+    "탄수화물(g)": ["탄수", "탄수화물", "carb"],
+    "당류(g)": ["당류", "당", "sugar"],
+    "지방(g)": ["지방", "fat"],
+    "트랜스지방(g)": ["트랜스", "trans"],
+    "포화지방(g)": ["포화", "saturated"],
+    "콜레스테롤(mg)": ["콜레스", "cholesterol"],
+    "단백질(g)": ["단백질", "protein", "prot"]
+}
+
+LEGACY_VAL_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(mg|g|kcal|%)", re.IGNORECASE)
+
+
+def legacy_normalize(s):
+    return (
+        s.replace(" ", "")
+        .replace("％", "%")
+        .replace("㎎", "mg")
+        .replace("그램", "g")
+        .replace("kca", "kcal")
+        .replace("kc", "kcal")
+        .strip()
+        .lower()
+    )
+
+
+def legacy_parse(text):
+    lines = [legacy_normalize(l) for l in text.splitlines() if l.strip()]
+    data = {k: None for k in LEGACY_PATTERNS.keys()}
+
+    for idx, line in enumerate(lines):
+        for nutrient, keys in LEGACY_PATTERNS.items():
+            if any(k in line for k in keys):
+
+                targets = [line]
+                if idx + 1 < len(lines):
+                    targets.append(lines[idx + 1])
+
+                for t in targets:
+                    matches = LEGACY_VAL_RE.findall(t)
+                    for v, u in matches:
+                        if u.lower() in ["g", "mg", "kcal"]:
+                            data[nutrient] = float(v)
+                            break
+    return data
+
+
+# =====================[ CORPUS ]=====================
+def load_corpus(paths):
+    texts = []
+    for path in paths:
+        if os.path.isdir(path):
+            files = sorted(glob.glob(os.path.join(path, "*.txt")))
+        elif os.path.isfile(path):
+            files = [path]
+        else:
+            continue
+        for file in files:
+            if file.endswith(".db"):
+                with closing(sqlite3.connect(file)) as conn:
+                    texts.extend(r[0] for r in conn.execute("SELECT text FROM cache WHERE text != ''"))
+                continue
+            with open(file, "r", encoding="utf-8") as f:
+                if not file.endswith(".json"):
+                    texts.append(f.read())
+                    continue
+                items = json.load(f)
+            # ocr_cache.json: [[key, {"text": ...}], ...] / records.json: [{"text": ...}, ...]
+            for item in items:
+                value = item[1] if isinstance(item, list) else item
+                if isinstance(value, dict) and value.get("text"):
+                    texts.append(value["text"])
+    return texts
+
+
+def bench(fn, texts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for t in texts:
+            fn(t)
+    return (time.perf_counter() - start) * 1e6 / (repeat * len(texts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="영양성분 파서 마이크로 벤치마크")
+    parser.add_argument("--corpus", nargs="*", default=DEFAULT_CORPUS)
+    parser.add_argument("--repeat", type=int, default=1000)
+    parser.add_argument("--show", action="store_true", help="결과가 다른 문서의 추출 내역 출력")
+    args = parser.parse_args()
+
+    # 파싱 함수의 계측 오버헤드를 빼고 순수 파싱만 비교
+    new_parse = parse_nutrition.__wrapped__
+    check_regressions(new_parse)
+
+    texts = load_corpus(args.corpus)
+    if not texts:
+        print("벤치마크할 OCR 텍스트가 없습니다.")
+        return
+
+    legacy_us = bench(legacy_parse, texts, args.repeat)
+    new_us = bench(new_parse, texts, args.repeat)
+
+    diffs = 0
+    for i, t in enumerate(texts):
+        old, new = legacy_parse(t), new_parse(t)
+        changed = [k for k in NUTRIENT_PATTERNS if old.get(k) != new.get(k)]
+        diffs += bool(changed)
+        if changed and args.show:
+            print(f"[{i}] 달라진 항목:")
+            for k in changed:
+                print(f"  {k}: {old.get(k)} → {new.get(k)}")
+            for item in scan_nutrition(t):
+                print("   ", item)
+
+    avg_len = sum(map(len, texts)) / len(texts)
+    print(f"문서 {len(texts)}개 (평균 {avg_len:.0f}자), 반복 {args.repeat}회")
+    print(f"legacy : {legacy_us:8.1f} µs/문서")
+    print(f"scan   : {new_us:8.1f} µs/문서  ({legacy_us / new_us:.1f}x)")
+    print(f"결과가 다른 문서: {diffs}/{len(texts)}")
+
+
+if __name__ == "__main__":
+    main()
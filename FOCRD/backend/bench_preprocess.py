@@ -0,0 +1,94 @@
+import os
+import sys
+import glob
+import time
+import argparse
+import difflib
+
+from image_pipeline import PREPROCESS_PARAMS, FIXED_3X_PARAMS, decode_image, encode_image, preprocess_image
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common.ocr_client import OcrSpaceClient, OcrError
+
+# 고정 3배 확대 vs 적응형 해상도 정규화 비교
+#   python bench_preprocess.py --images uploads --truth ../../Ocr/input/true.txt --ocr
+MODES = {"fixed3x": FIXED_3X_PARAMS, "adaptive": PREPROCESS_PARAMS}
+
+
+def accuracy(truth, text):
+    # 공백 제거 후 문자 단위 유사도 (0~100)
+    a = "".join(truth.split())
+    b = "".join(text.split())
+    return difflib.SequenceMatcher(None, a, b).ratio() * 100
+
+
+def load_truth(path, image_path):
+    if not path:
+        return None
+    if os.path.isdir(path):
+        path = os.path.join(path, os.path.splitext(os.path.basename(image_path))[0] + ".txt")
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", default=os.path.join(os.path.dirname(__file__), "uploads"))
+    parser.add_argument("--truth", help="정답 텍스트 파일 또는 <이미지이름>.txt 가 있는 폴더")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--ocr", action="store_true", help="OCR.Space 호출해서 정확도까지 측정")
+    args = parser.parse_args()
+
+    client = OcrSpaceClient(os.getenv("OCR_SPACE_KEY", "")) if args.ocr else None
+    paths = sorted(p for p in glob.glob(os.path.join(args.images, "*")) if os.path.isfile(p))
+
+    print(f"{'image':<28}{'mode':<10}{'in':>11}{'out':>13}{'ms':>9}{'KB':>9}{'acc%':>8}")
+    totals = {m: [0.0, 0, 0.0, 0] for m in MODES}
+    for path in paths:
+        with open(path, "rb") as f:
+            data = f.read()
+        try:
+            img = decode_image(data)
+        except ValueError:
+            continue
+        truth = load_truth(args.truth, path)
+
+        for mode, params in MODES.items():
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                out = preprocess_image(img, params)
+                body, ext = encode_image(out)
+            ms = (time.perf_counter() - start) * 1000 / args.repeat
+
+            acc = None
+            if client and truth is not None:
+                try:
+                    acc = accuracy(truth, client.recognize(body, filename=f"bench.{ext}"))
+                except OcrError as e:
+                    print(f"  OCR 실패 ({mode}): {e}")
+
+            t = totals[mode]
+            t[0] += ms
+            t[1] += 1
+            if acc is not None:
+                t[2] += acc
+                t[3] += 1
+
+            h, w = img.shape[:2]
+            oh, ow = out.shape[:2]
+            print(
+                f"{os.path.basename(path)[:27]:<28}{mode:<10}{f'{w}x{h}':>11}{f'{ow}x{oh}':>13}"
+                f"{ms:>9.1f}{len(body) / 1024:>9.1f}{'' if acc is None else f'{acc:.1f}':>8}"
+            )
+
+    print()
+    for mode, (ms, n, acc, n_acc) in totals.items():
+        if n:
+            acc_str = f", 평균 정확도 {acc / n_acc:.1f}%" if n_acc else ""
+            print(f"{mode}: 평균 {ms / n:.1f} ms{acc_str}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import os
+import sys
+import json
+import cv2
+import numpy as np
+from functools import lru_cache
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common.preprocess import (
+    Pipeline, Grayscale, LimitSize, Bilateral, Clahe, AdaptiveThreshold, Resize, TextHeightResize,
+)
+from common.resources import register_warmup
+
+# OCR 요청용 인코딩 형식 (png | jpg) + 품질
+OCR_IMAGE_FORMAT = os.getenv("OCR_IMAGE_FORMAT", "png").lower()
+OCR_JPEG_QUALITY = int(os.getenv("OCR_JPEG_QUALITY", "90"))
+OCR_PNG_COMPRESSION = int(os.getenv("OCR_PNG_COMPRESSION", "1"))
+
+# 전처리 파라미터 (캐시 키에도 포함됨 → 값을 바꾸면 기존 캐시는 자동 무효화)
+PREPROCESS_PARAMS = {
+    "bilateral": (5, 150, 150),
+    "clahe_clip": 2.5,
+    "clahe_tile": (5, 5),
+    "block_size": 25,
+    "c": 10,
+    # 해상도 정규화: adaptive = 글자 높이 추정 후 target_text_px 로 맞춤, fixed = scale 배 고정
+    "resize_mode": "adaptive",
+    "scale": 3,
+    "target_text_px": 32,
+    "scale_range": (0.5, 3.0),
+    "max_input_side": 2000,
+    "max_output_side": 4000,
+}
+
+# 기존 동작 (고정 3배 확대) — 벤치마크 비교용
+FIXED_3X_PARAMS = dict(PREPROCESS_PARAMS, resize_mode="fixed", scale=3)
+
+
+def decode_image(data):
+    # 업로드 바이트 → BGR ndarray (디스크 재읽기 없음)
+    img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError("이미지를 디코딩할 수 없습니다.")
+    return img
+
+
+def encode_image(img, fmt=None):
+    # 전처리 결과를 한 번만 인코딩해서 OCR 요청 본문으로 사용
+    fmt = fmt or OCR_IMAGE_FORMAT
+    if fmt in ("jpg", "jpeg"):
+        ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, OCR_JPEG_QUALITY])
+        ext = "jpg"
+    else:
+        ok, buf = cv2.imencode(".png", img, [cv2.IMWRITE_PNG_COMPRESSION, OCR_PNG_COMPRESSION])
+        ext = "png"
+    if not ok:
+        raise ValueError("이미지 인코딩 실패")
+    return buf.tobytes(), ext
+
+
+def build_pipeline(params):
+    # PREPROCESS_PARAMS → 공용 전처리 파이프라인 (1x1 선명화 필터는 항등 연산이라 제외)
+    fixed = params["resize_mode"] == "fixed"
+    stages = [Grayscale()]
+    if not fixed:
+        # 큰 입력은 비싼 필터 전에 먼저 축소
+        stages.append(LimitSize(params["max_input_side"]))
+    stages += [
+        Bilateral(*params["bilateral"]),
+        Clahe(params["clahe_clip"], params["clahe_tile"]),
+        AdaptiveThreshold(params["block_size"], params["c"]),
+    ]
+    if fixed:
+        stages.append(Resize(params["scale"]))
+    else:
+        stages.append(TextHeightResize(
+            params["target_text_px"], params["scale_range"], params["max_output_side"], params["scale"]
+        ))
+    return Pipeline(stages)
+
+
+@lru_cache(maxsize=16)
+def _pipeline_for(params_key):
+    return build_pipeline(json.loads(params_key))
+
+
+def preprocess_image(img, params=PREPROCESS_PARAMS):
+    return _pipeline_for(json.dumps(params, sort_keys=True)).run(img)
+
+
+def _warmup():
+    # 흰 바탕에 글자 비슷한 검은 막대 → 글자 높이 추정/리사이즈 경로까지 한 번 실행
+    img = np.full((600, 800, 3), 255, np.uint8)
+    for i in range(10):
+        cv2.rectangle(img, (40 + i * 60, 280), (70 + i * 60, 310), (0, 0, 0), -1)
+    encode_image(preprocess_image(img))
+
+
+register_warmup("focrd.preprocess", _warmup)
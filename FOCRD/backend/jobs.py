@@ -0,0 +1,121 @@
+import time
+import uuid
+import queue
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class JobQueue:
+    """
+    고정 크기 워커 스레드 풀 + 제한된 대기열
+    - submit() 은 즉시 job id 반환, 대기열이 가득 차면 QueueFullError
+    - 작업별 대기/실행 시간 기록
+    """
+
+    def __init__(self, handler, workers=4, max_queue=32, max_finished=1000):
+        self.handler = handler
+        self.max_finished = max_finished
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+
+        for i in range(workers):
+            t = threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+            t.start()
+
+    def submit(self, *args):
+        job_id = uuid.uuid4().hex
+        job = {
+            "id": job_id,
+            "status": "queued",
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "status_code": None,
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+        try:
+            self._queue.put_nowait((job_id, args))
+        except queue.Full:
+            with self._lock:
+                self._jobs.pop(job_id, None)
+            raise QueueFullError()
+        return job_id
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._snapshot(job) if job else None
+
+    def wait(self, job_id, last_status=None, timeout=15):
+        """
+        상태가 last_status 에서 바뀔 때까지 대기 (SSE 스트림용)
+        """
+        with self._changed:
+            self._changed.wait_for(
+                lambda: job_id not in self._jobs or self._jobs[job_id]["status"] != last_status,
+                timeout=timeout,
+            )
+            job = self._jobs.get(job_id)
+            return self._snapshot(job) if job else None
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return {"queued": self._queue.qsize(), "jobs": counts}
+
+    def _snapshot(self, job):
+        data = dict(job)
+        created, started, finished = job["created_at"], job["started_at"], job["finished_at"]
+        data["timing"] = {
+            "queue_ms": round((started - created) * 1000, 1) if started else None,
+            "run_ms": round((finished - started) * 1000, 1) if finished else None,
+            "total_ms": round((finished - created) * 1000, 1) if finished else None,
+        }
+        return data
+
+    def _update(self, job_id, **fields):
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields)
+            self._changed.notify_all()
+
+    def _prune(self):
+        # 끝난 작업은 오래된 것부터 max_finished 개만 유지
+        with self._lock:
+            finished = [k for k, j in self._jobs.items() if j["status"] in ("done", "failed")]
+            for k in finished[:max(len(finished) - self.max_finished, 0)]:
+                del self._jobs[k]
+
+    def _worker(self):
+        while True:
+            job_id, args = self._queue.get()
+            self._update(job_id, status="running", started_at=time.time())
+            try:
+                result, status_code = self.handler(*args)
+                self._update(
+                    job_id, status="done", result=result,
+                    status_code=status_code, finished_at=time.time()
+                )
+            except Exception as e:
+                logger.error(f"Job {job_id} 실패: {e}")
+                self._update(
+                    job_id, status="failed", result={"ok": False, "error": str(e)},
+                    status_code=500, finished_at=time.time()
+                )
+            finally:
+                self._queue.task_done()
+                self._prune()
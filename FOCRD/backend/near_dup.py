@@ -0,0 +1,111 @@
+import threading
+
+import cv2
+import numpy as np
+
+# 같은 라벨을 다시 찍은 사진 찾기 (바이트가 달라 SHA-256 캐시가 못 잡는 경우)
+# 지각 해시(pHash/dHash, 64비트) + 다중 색인 해싱으로 해밍 거리 검색
+
+HASH_METHODS = ("phash", "dhash")
+
+
+def phash(img):
+    # 32x32 흑백 → DCT 저주파 8x8 → 중앙값 기준 비트 (밝기/압축/약간의 크기 변화에 강함)
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+    small = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:8, :8].ravel()
+    # DC 성분(전체 밝기)은 중앙값 계산에서 제외
+    return _pack(low > np.median(low[1:]))
+
+
+def dhash(img):
+    # 9x8 흑백 → 가로로 이웃한 픽셀 밝기 비교 (pHash 보다 빠르고 조금 덜 견고)
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    return _pack((small[:, 1:] > small[:, :-1]).ravel())
+
+
+def _pack(bits):
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def image_hash(img, method="phash"):
+    if method == "dhash":
+        return dhash(img)
+    return phash(img)
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+def popcount(values):
+    # uint64 배열의 비트 수 (numpy 2.0 미만은 bitwise_count 가 없어 바이트 단위로 풀어서 셈)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    return np.unpackbits(values.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+class HashIndex:
+    """
+    64비트 해시 다중 색인 해싱 (multi-index hashing)
+    해시를 max_distance + 1 조각으로 나누면, 거리 max_distance 이내인 해시는 적어도 한 조각이 완전히 같음
+    → 조각별 dict 에서 정확히 일치하는 후보만 모아 한 번에 해밍 거리 계산
+      (반경이 커서 후보가 많으면 전체 비교로 전환)
+    - 해시는 uint64 배열에 연속 저장 (두 배씩 늘림), 조각 테이블은 {조각 값: [위치]}
+    - add(hash, value): 같은 해시가 있으면 value 만 최신으로 교체
+    - find(hash, max_distance): 가장 가까운 (value, 거리) 또는 None (같은 거리면 나중에 추가한 것)
+    """
+
+    def __init__(self, max_distance=4, bits=64):
+        self.max_distance = max_distance
+        bounds = np.linspace(0, bits, min(max(max_distance, 0) + 1, bits) + 1).astype(int)
+        self._chunks = [(int(lo), (1 << int(hi - lo)) - 1) for lo, hi in zip(bounds[:-1], bounds[1:])]
+        self._tables = [{} for _ in self._chunks]
+        self._hashes = np.empty(1024, dtype=np.uint64)
+        self._size = 0
+        self._values = []
+        self._positions = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    def add(self, h, value):
+        with self._lock:
+            pos = self._positions.get(h)
+            if pos is not None:
+                self._values[pos] = value
+                return
+            pos = self._size
+            if pos == len(self._hashes):
+                self._hashes = np.concatenate([self._hashes, np.empty_like(self._hashes)])
+            self._hashes[pos] = h
+            self._size += 1
+            self._values.append(value)
+            self._positions[h] = pos
+            for (shift, mask), table in zip(self._chunks, self._tables):
+                table.setdefault((h >> shift) & mask, []).append(pos)
+
+    def find(self, h, max_distance=None):
+        radius = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        with self._lock:
+            hits = [table.get((h >> shift) & mask) for (shift, mask), table in zip(self._chunks, self._tables)]
+            hits = [p for p in hits if p]
+            if not hits:
+                return None
+            if sum(map(len, hits)) * 32 > self._size:
+                # 반경이 커서 조각이 좁으면 후보가 너무 많음 → 리스트 변환보다 전체를 한 번에 비교하는 편이 빠름
+                candidates = None
+                dist = popcount(self._hashes[:self._size] ^ np.uint64(h))
+            else:
+                candidates = np.unique(np.concatenate([np.asarray(p, dtype=np.int64) for p in hits]))
+                dist = popcount(self._hashes[candidates] ^ np.uint64(h))
+            best_d = int(dist.min())
+            if best_d > radius:
+                return None
+            # 같은 거리면 나중에 추가한(위치가 큰) 것 → 후보는 위치 순이므로 마지막 일치
+            best = int(np.flatnonzero(dist == best_d)[-1])
+            if candidates is not None:
+                best = int(candidates[best])
+            return self._values[best], best_d
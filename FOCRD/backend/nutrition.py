@@ -0,0 +1,134 @@
+import os
+import re
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common.metrics import timed
+
+# 영양성분 → OCR 텍스트에서 찾을 키워드 (정규화 후 소문자 기준)
+# 복합어(트랜스지방/포화지방)는 따로 넣어서 "지방" 보다 먼저 잡히게 함
+NUTRIENT_PATTERNS = {
+    "칼로리(kcal)": ["칼로리", "열량", "kcal", "kc"],
+    "나트륨(mg)": ["나트륨", "sodium", "소듐", "나트"],
+    "탄수화물(g)": ["탄수", "탄수화물", "carb"],
+    "당류(g)": ["당류", "당", "sugar"],
+    "지방(g)": ["지방", "fat"],
+    "트랜스지방(g)": ["트랜스지방", "트랜스", "transfat", "trans"],
+    "포화지방(g)": ["포화지방", "포화", "saturatedfat", "saturated"],
+    "콜레스테롤(mg)": ["콜레스", "cholesterol"],
+    "단백질(g)": ["단백질", "protein", "prot"]
+}
+
+# 영양성분 이름의 괄호 단위 (kcal / mg / g) → 값 배정 시 단위가 맞는 항목 우선
+NUTRIENT_UNITS = {name: name[name.index("(") + 1:-1] for name in NUTRIENT_PATTERNS}
+CALORIES = "칼로리(kcal)"
+
+_KEYWORDS = {kw: name for name, kws in NUTRIENT_PATTERNS.items() for kw in kws}
+
+# 다른 단어 안에도 잘 나오는 한 글자 키워드 ("1회 제공량당", "100g당")
+# → 앞 글자가 (공백 없이 바로 붙은) 량/단위/숫자면 키워드로 보지 않고,
+#   여기서 잡은 값은 뒤에 정확한 키워드(당류/sugar)가 나오면 덮어씀
+WEAK_KEYWORDS = {"당"}
+_WEAK_AFTER = set("량회gl%0123456789")
+# 공백 제거 전에 약한 키워드 앞 공백을 구분 문자로 남김 ("120mg 당 3g" 의 "당" 은 "g" 에 붙은 게 아님)
+_WEAK_SEP = "\x1f"
+_SPACED_WEAK_RE = re.compile(r"[ \t]+(?=" + "|".join(map(re.escape, WEAK_KEYWORDS)) + ")")
+
+# 정규화: 공백 제거 + 줄바꿈 통일(CRLF/CR → LF) + 전각/한글 단위 통일 (kc, kca → kcal)
+_KCAL_RE = re.compile(r"kc(?:al?)?")
+
+# 한 번의 스캔으로 값 / 키워드 / 줄바꿈을 모두 잡는 토큰 정규식
+# 키워드는 긴 것부터 나열 → 같은 위치에서는 "트랜스지방" 이 "지방" 보다, "당류" 가 "당" 보다 우선
+_TOKEN_RE = re.compile(
+    r"(?P<value>\d+(?:\.\d+)?)(?P<unit>mg|g|kcal|%)"
+    r"|(?P<kw>" + "|".join(re.escape(k) for k in sorted(_KEYWORDS, key=len, reverse=True)) + r")"
+    r"|(?P<nl>\n+)"
+)
+
+
+def normalize_text(s):
+    s = s.lower().replace("\r", "\n").replace(" ", "").replace("\t", "").replace("％", "%").replace("㎎", "mg").replace("그램", "g")
+    return _KCAL_RE.sub("kcal", s) if "kc" in s else s
+
+
+def _pick(pending, unit, line):
+    # 같은 줄 키워드 우선, 그 안에서 단위가 맞는 항목 → kcal 이 아닌 값은 먼저 나온 항목
+    best, best_rank = None, 4
+    for p in pending:
+        name, kw_line, _ = p
+        expected = NUTRIENT_UNITS[name]
+        if expected == unit:
+            rank = 0
+        elif unit != "kcal" and expected != "kcal":
+            rank = 1
+        else:
+            continue
+        rank += 2 * (kw_line != line)
+        if rank < best_rank:
+            best, best_rank = p, rank
+    return best
+
+
+def scan_nutrition(text):
+    """
+    OCR 텍스트를 한 번만 훑어서 (영양성분, 값, 단위, 줄 번호) 목록 반환
+    - 키워드가 나오면 그 줄과 다음 줄까지 값을 기다림 (표 형태로 값이 다음 줄에 오는 경우)
+    - 값은 같은 줄 키워드 → 윗줄 키워드 순으로, 그 안에서 단위가 맞는 항목 → 먼저 나온 항목에 배정 (%는 무시)
+    - kcal 값은 키워드 없이도 칼로리로 인정, 항목마다 처음 배정된 값만 사용
+      (WEAK_KEYWORDS 로 배정된 값만 예외 → 정확한 키워드로 다시 배정되면 교체)
+    줄 번호는 빈 줄을 제외한 0부터의 번호
+    """
+    found = []
+    done = set()
+    weak = {}  # 약한 키워드로 배정된 영양성분 → found 위치
+    pending = []  # [(영양성분, 키워드가 나온 줄, 약한 키워드 여부)]
+    line = 0
+    norm = normalize_text(_SPACED_WEAK_RE.sub(_WEAK_SEP, text))
+    for m in _TOKEN_RE.finditer(norm):
+        kind = m.lastgroup
+        if kind == "nl":
+            line += 1
+            if pending and pending[0][1] < line - 1:
+                pending = [p for p in pending if p[1] >= line - 1]
+        elif kind == "kw":
+            kw = m.group("kw")
+            is_weak = kw in WEAK_KEYWORDS
+            if is_weak and m.start() and norm[m.start() - 1] in _WEAK_AFTER:
+                continue
+            name = _KEYWORDS[kw]
+            if not is_weak:
+                if name in weak:
+                    done.discard(name)
+                pending = [p for p in pending if p[0] != name or not p[2]]
+            if name not in done and all(p[0] != name or p[1] < line - 1 for p in pending):
+                pending.append((name, line, is_weak))
+        else:
+            unit = m.group("unit")
+            if unit == "%":
+                continue
+            pick = _pick(pending, unit, line) if pending else None
+            is_weak = False
+            if pick is not None:
+                pending.remove(pick)
+                name, _, is_weak = pick
+            elif unit == "kcal" and CALORIES not in done:
+                name = CALORIES
+            else:
+                continue
+            done.add(name)
+            item = (name, float(m.group("value")), unit, line)
+            if name in weak:
+                found[weak.pop(name)] = item
+            else:
+                found.append(item)
+            if is_weak:
+                weak[name] = len(found) - 1
+    return found
+
+
+@timed("parse")
+def parse_nutrition(text):
+    data = {k: None for k in NUTRIENT_PATTERNS}
+    for name, value, _, _ in scan_nutrition(text):
+        data[name] = value
+    return data
@@ -0,0 +1,166 @@
+import os
+import sys
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from image_pipeline import encode_image
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common.ocr_client import OcrError
+from common import tesseract_pool
+from common.metrics import stage
+
+logger = logging.getLogger(__name__)
+
+# remote: OCR.Space 만 / local: Tesseract 만
+# fallback: Tesseract 먼저, 영양성분이 비면 OCR.Space
+# race: Tesseract 먼저, OCR_RACE_DELAY 초 안에 안 끝나면 OCR.Space 도 시작해 먼저 나온 완전한 결과 반환
+#   제때 끝나면 fallback 과 같음 → 원격 호출(쿼터)은 로컬이 느리거나 영양성분이 빌 때만
+#   둘 다 시작한 뒤 로컬이 먼저 완전한 결과를 내도 이미 보낸 원격 요청은 취소되지 않음 (쿼터 1회 사용)
+ENGINE_MODES = ("remote", "local", "fallback", "race")
+
+RACE_DELAY = float(os.getenv("OCR_RACE_DELAY", "2"))
+_race_pool = ThreadPoolExecutor(max_workers=int(os.getenv("OCR_RACE_WORKERS", "4")))
+
+
+class RemoteOcrEngine:
+    name = "remote"
+
+    def __init__(self, client, lang="kor"):
+        self.client = client
+        self.lang = lang
+
+    def available(self):
+        return True
+
+    def recognize(self, img):
+        with stage("encode"):
+            image_bytes, ext = encode_image(img)
+        with stage("ocr.remote"):
+            return self.client.recognize(image_bytes, language=self.lang, filename=f"image.{ext}")
+
+
+class TesseractEngine:
+    name = "local"
+
+    def __init__(self, lang="kor+eng", psm=6):
+        self.lang = lang
+        self.psm = psm
+
+    def available(self):
+        return tesseract_pool.available()
+
+    def recognize(self, img):
+        if not self.available():
+            raise OcrError("tesserocr/pytesseract 가 설치되어 있지 않습니다.")
+        try:
+            # 언어 데이터를 미리 올려둔 워커 프로세스 풀 사용
+            with stage("ocr.local"):
+                return tesseract_pool.get_pool(self.lang, self.psm).recognize(img)
+        except Exception as e:
+            raise OcrError(f"Tesseract 오류: {e}")
+
+
+def is_complete(parsed):
+    return all(v is not None for v in parsed.values())
+
+
+class OcrEngineSelector:
+    """
+    모드에 따라 엔진 실행 → (text, parsed, 사용된 엔진) 반환
+    """
+
+    def __init__(self, remote, local, default_mode="remote"):
+        self.remote = remote
+        self.local = local
+        self.default_mode = default_mode
+
+    def run(self, img, parse, mode=None):
+        mode = mode or self.default_mode
+        if mode not in ENGINE_MODES:
+            raise ValueError(f"지원하지 않는 OCR 엔진: {mode}")
+
+        # 로컬 엔진이 없으면 remote 로 동작
+        if mode != "remote" and not self.local.available():
+            if mode == "local":
+                raise OcrError("로컬 OCR 엔진을 사용할 수 없습니다.")
+            mode = "remote"
+
+        if mode == "remote":
+            text = self.remote.recognize(img)
+            return text, parse(text), self.remote.name
+        if mode == "local":
+            text = self.local.recognize(img)
+            return text, parse(text), self.local.name
+        if mode == "race":
+            return self._race(img, parse)
+        return self._fallback(img, parse)
+
+    def _fallback(self, img, parse):
+        local_result = None
+        try:
+            text = self.local.recognize(img)
+            local_result = (text, parse(text), self.local.name)
+            if is_complete(local_result[1]):
+                return local_result
+        except OcrError as e:
+            logger.warning(f"로컬 OCR 실패 → 원격 사용: {e}")
+
+        return self._remote_or(local_result, img, parse)
+
+    def _local_result(self, future, parse):
+        # 끝난 로컬 요청 → (text, parsed, 엔진) / 실패면 None
+        try:
+            text = future.result()
+            return text, parse(text), self.local.name
+        except OcrError as e:
+            logger.warning(f"로컬 OCR 실패 → 원격 사용: {e}")
+            return None
+
+    def _race(self, img, parse):
+        # 로컬/원격 요청은 다른 스레드에서 실행되므로 기다린 시간만 이 요청의 단계로 기록
+        local_future = _race_pool.submit(self.local.recognize, img)
+        with stage("ocr.local_wait"):
+            wait([local_future], timeout=RACE_DELAY)
+
+        if not local_future.done():
+            # 로컬이 느림 → 원격도 시작하고 먼저 끝난 쪽부터 확인
+            remote_future = _race_pool.submit(self.remote.recognize, img)
+            with stage("ocr.race_wait"):
+                wait([local_future, remote_future], return_when=FIRST_COMPLETED)
+            remote_result = None
+            if not local_future.done() and remote_future.exception() is None:
+                text = remote_future.result()
+                remote_result = (text, parse(text), self.remote.name)
+                if is_complete(remote_result[1]):
+                    return remote_result
+            # 원격이 실패했거나 영양성분이 비었으면 로컬 결과를 기다림 (둘 다 불완전하면 원격 우선)
+            with stage("ocr.local_wait"):
+                wait([local_future])
+            local_result = self._local_result(local_future, parse)
+            if local_result and is_complete(local_result[1]):
+                return local_result
+            if remote_result is not None:
+                return remote_result
+            return self._remote_or(local_result, img, parse, future=remote_future)
+
+        local_result = self._local_result(local_future, parse)
+        if local_result and is_complete(local_result[1]):
+            return local_result
+        return self._remote_or(local_result, img, parse)
+
+    def _remote_or(self, local_result, img, parse, future=None):
+        # 원격 결과 사용, 원격도 실패하면 불완전하더라도 로컬 결과 반환
+        try:
+            if future:
+                # 원격 요청은 다른 스레드에서 실행되므로 기다린 시간만 이 요청의 단계로 기록
+                with stage("ocr.remote_wait"):
+                    text = future.result()
+            else:
+                text = self.remote.recognize(img)
+            return text, parse(text), self.remote.name
+        except OcrError:
+            if local_result is None:
+                raise
+            logger.warning("원격 OCR 실패 → 로컬 결과 사용")
+            return local_result
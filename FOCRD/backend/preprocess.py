@@ -1,12 +1,16 @@
-import cv2
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common.preprocess import Pipeline, Grayscale, NlMeans, AdaptiveThreshold, Resize, load_image
+
+# 강한 노이즈 제거(NL-means) 버전 전처리
+PIPELINE = Pipeline([
+    Grayscale(),
+    NlMeans(h=25, template=7, search=21),
+    AdaptiveThreshold(block_size=31, c=2),
+    Resize(scale=1.7),
+])
 
 def preprocess_image(image_path):
-    img = cv2.imread(image_path)
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    gray = cv2.fastNlMeansDenoising(gray, None, 25, 7, 21)
-    thresh = cv2.adaptiveThreshold(
-        gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-        cv2.THRESH_BINARY, 31, 2
-    )
-    resized = cv2.resize(thresh, None, fx=1.7, fy=1.7)
-    return resized
+    return PIPELINE.run(load_image(image_path))
@@ -0,0 +1,215 @@
+import os
+import json
+import sqlite3
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id        INTEGER PRIMARY KEY AUTOINCREMENT,
+    filename  TEXT,
+    timestamp TEXT,
+    tier      TEXT,
+    score     INTEGER,
+    parsed    TEXT,
+    text      TEXT,
+    score_version TEXT,
+    image_hash TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_records_filename ON records(filename);
+CREATE INDEX IF NOT EXISTS idx_records_timestamp ON records(timestamp);
+CREATE INDEX IF NOT EXISTS idx_records_tier ON records(tier);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+COLUMNS = ("id", "filename", "timestamp", "tier", "score", "parsed", "text")
+
+
+def _row_to_record(row):
+    record = dict(zip(COLUMNS, row))
+    record["parsed"] = json.loads(record["parsed"]) if record["parsed"] else {}
+    return record
+
+
+class RecordStore:
+    """
+    SQLite(WAL) 기반 분석 기록 저장소
+    - 저장은 INSERT 한 번 (전체 파일 재작성 없음)
+    - 여러 워커/스레드가 동시에 써도 SQLite 잠금으로 안전
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        # 이전 스키마 DB 에 컬럼 추가 (score_version: 재계산 대상 판별, image_hash: 유사 이미지 검색)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(records)")}
+        for column in ("score_version", "image_hash"):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE records ADD COLUMN {column} TEXT")
+        conn.commit()
+
+    def _conn(self):
+        # sqlite 연결은 스레드 간 공유 불가 → 스레드마다 하나씩
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def add(self, record):
+        conn = self._conn()
+        with conn:
+            cur = conn.execute(
+                "INSERT INTO records (filename, timestamp, tier, score, parsed, text, score_version, image_hash) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    record.get("filename"),
+                    record.get("timestamp"),
+                    record.get("tier"),
+                    record.get("score"),
+                    json.dumps(record.get("parsed", {}), ensure_ascii=False),
+                    record.get("text"),
+                    record.get("score_version"),
+                    record.get("image_hash"),
+                ),
+            )
+        return cur.lastrowid
+
+    def get(self, record_id):
+        row = self._conn().execute(
+            f"SELECT {', '.join(COLUMNS)} FROM records WHERE id = ?", (record_id,)
+        ).fetchone()
+        return _row_to_record(row) if row else None
+
+    def query(self, filename=None, tier=None, since=None, until=None, page=1, page_size=20):
+        """
+        조건 검색 + 페이지네이션 (LIMIT/OFFSET → 한 페이지만 메모리에 올림)
+        반환: (records, total)
+        """
+        where, args = [], []
+        if filename:
+            where.append("filename = ?")
+            args.append(filename)
+        if tier:
+            where.append("tier = ?")
+            args.append(tier)
+        if since:
+            where.append("timestamp >= ?")
+            args.append(since)
+        if until:
+            where.append("timestamp < ?")
+            args.append(until)
+        where_sql = f" WHERE {' AND '.join(where)}" if where else ""
+
+        conn = self._conn()
+        total = conn.execute(f"SELECT COUNT(*) FROM records{where_sql}", args).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM records{where_sql} "
+            "ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?",
+            args + [page_size, (page - 1) * page_size],
+        ).fetchall()
+        return [_row_to_record(r) for r in rows], total
+
+    def max_id(self):
+        return self._conn().execute("SELECT COALESCE(MAX(id), 0) FROM records").fetchone()[0]
+
+    def iter_parsed(self, batch_size=1000, stale_version=None, after_id=0):
+        """
+        (id, score, tier, parsed) 를 batch_size 개씩 id 순으로 반환 (키셋 페이지네이션)
+        stale_version 을 주면 그 버전으로 계산되지 않은 기록만, after_id 를 주면 그보다 뒤 기록만
+        """
+        last_id = after_id
+        conn = self._conn()
+        while True:
+            sql = "SELECT id, score, tier, parsed FROM records WHERE id > ?"
+            args = [last_id]
+            if stale_version is not None:
+                sql += " AND (score_version IS NULL OR score_version != ?)"
+                args.append(stale_version)
+            rows = conn.execute(sql + " ORDER BY id LIMIT ?", args + [batch_size]).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            yield [(r[0], r[1], r[2], json.loads(r[3]) if r[3] else {}) for r in rows]
+
+    def update_scores(self, rows, version):
+        # rows: [(id, score, tier)] → 한 트랜잭션으로 갱신
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "UPDATE records SET score = ?, tier = ?, score_version = ? WHERE id = ?",
+                [(score, tier, version, record_id) for record_id, score, tier in rows],
+            )
+
+    def iter_hashes(self, prefix):
+        # 유사 이미지 색인 재구성용: image_hash 가 prefix 로 시작하는 (id, image_hash) 를 id 순으로
+        rows = self._conn().execute(
+            "SELECT id, image_hash FROM records WHERE image_hash LIKE ? ORDER BY id", (prefix + "%",)
+        )
+        yield from rows
+
+    def get_meta(self, key):
+        row = self._conn().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        conn = self._conn()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def migrate_json(self, json_path):
+        """
+        기존 records.json → SQLite 1회 이관 (meta 테이블에 완료 표시)
+        """
+        conn = self._conn()
+        done = conn.execute("SELECT value FROM meta WHERE key = 'json_migrated'").fetchone()
+        if done or not os.path.exists(json_path):
+            return 0
+
+        with open(json_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        with conn:
+            # 다른 워커가 먼저 이관했으면 건너뜀 (INSERT OR IGNORE 로 선점)
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('json_migrated', ?)",
+                (json_path,),
+            )
+            if cur.rowcount == 0:
+                return 0
+            conn.executemany(
+                "INSERT INTO records (filename, timestamp, tier, score, parsed, text) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        r.get("filename"),
+                        r.get("timestamp"),
+                        r.get("tier"),
+                        r.get("score"),
+                        json.dumps(r.get("parsed", {}), ensure_ascii=False),
+                        r.get("text"),
+                    )
+                    for r in data
+                ],
+            )
+        logger.info(f"records.json 이관 완료: {len(data)}건")
+        return len(data)
+
+
+if __name__ == "__main__":
+    import sys
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    json_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(base_dir, "records.json")
+    store = RecordStore(os.path.join(base_dir, "records.db"))
+    print(f"이관된 기록: {store.migrate_json(json_path)}건")
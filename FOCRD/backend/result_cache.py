@@ -0,0 +1,126 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key    TEXT PRIMARY KEY,
+    text   TEXT,
+    parsed TEXT,
+    engine TEXT,
+    used   REAL
+);
+CREATE INDEX IF NOT EXISTS idx_cache_used ON cache(used);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def make_cache_key(digest, params, lang):
+    """
+    업로드 원본 바이트의 SHA-256(hex, 업로드 때 계산한 값) + 전처리 파라미터 + OCR 언어로 캐시 키 생성
+    (파라미터가 바뀌면 자동으로 다른 키가 되므로 오래된 결과를 재사용하지 않음)
+    """
+    params_str = json.dumps(params, sort_keys=True, ensure_ascii=False)
+    params_hash = hashlib.sha256(params_str.encode("utf-8")).hexdigest()[:16]
+    return f"{digest}:{params_hash}:{lang}"
+
+
+class ResultCache:
+    """
+    OCR 텍스트 + 파싱 결과를 저장하는 LRU 캐시 (SQLite(WAL) 영속화, RecordStore 와 같은 방식)
+    - 저장은 행 하나 INSERT/DELETE (전체 파일 재작성 없음)
+    - 여러 워커 프로세스가 같은 DB 를 공유 → 서로의 항목을 덮어쓰지 않음
+    - used: 마지막 사용 시각, max_entries 를 넘으면 오래 안 쓴 것부터 삭제
+    """
+
+    def __init__(self, db_path, max_entries=500):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        conn.commit()
+
+    def _conn(self):
+        # sqlite 연결은 스레드 간 공유 불가 → 스레드마다 하나씩
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def _evict(self, conn):
+        conn.execute(
+            "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def get(self, key):
+        conn = self._conn()
+        row = conn.execute("SELECT text, parsed, engine FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        with conn:
+            conn.execute("UPDATE cache SET used = ? WHERE key = ?", (time.time(), key))
+        return {"text": row[0], "parsed": json.loads(row[1]) if row[1] else {}, "engine": row[2]}
+
+    def put(self, key, text, parsed, engine=None):
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, text, parsed, engine, used) VALUES (?, ?, ?, ?, ?)",
+                (key, text, json.dumps(parsed, ensure_ascii=False), engine, time.time()),
+            )
+            self._evict(conn)
+
+    def migrate_json(self, json_path):
+        """
+        기존 ocr_cache.json → SQLite 1회 이관 (meta 테이블에 완료 표시)
+        파일 순서(오래된 것 → 최근) 대로 used 를 매겨 LRU 순서 유지, 이미 있는 키는 그대로
+        """
+        conn = self._conn()
+        done = conn.execute("SELECT value FROM meta WHERE key = 'json_migrated'").fetchone()
+        if done or not os.path.exists(json_path):
+            return 0
+
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                items = json.load(f)
+        except Exception as e:
+            logger.error(f"Cache Load Error: {e}")
+            items = []
+
+        with conn:
+            # 다른 워커가 먼저 이관했으면 건너뜀 (INSERT OR IGNORE 로 선점)
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('json_migrated', ?)",
+                (json_path,),
+            )
+            if cur.rowcount == 0:
+                return 0
+            conn.executemany(
+                "INSERT OR IGNORE INTO cache (key, text, parsed, engine, used) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (key, value.get("text"), json.dumps(value.get("parsed", {}), ensure_ascii=False),
+                     value.get("engine"), i)
+                    for i, (key, value) in enumerate(items)
+                ],
+            )
+            self._evict(conn)
+        logger.info(f"ocr_cache.json 이관 완료: {len(items)}건")
+        return len(items)
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
@@ -0,0 +1,84 @@
+import numpy as np
+
+from nutrition import NUTRIENT_PATTERNS
+
+# 점수 공식/등급 기준을 바꾸면 버전을 올림 → analytics.py rescore 가 이전 버전 기록만 다시 계산
+SCORING_VERSION = "1"
+
+NUTRIENTS = tuple(NUTRIENT_PATTERNS)
+
+TIERS = (("A", 85), ("B", 65), ("C", None))
+
+
+def calculate_score(parsed):
+    protein = parsed.get("단백질(g)", 0)
+    sugar = parsed.get("당류(g)", 0)
+    fat = parsed.get("지방(g)", 0)
+    sat_fat = parsed.get("포화지방(g)", 0)
+    calories = parsed.get("칼로리(kcal)", 0)
+    sodium = parsed.get("나트륨(mg)", 0)
+    cholesterol = parsed.get("콜레스테롤(mg)", 0)
+    trans = parsed.get("트랜스지방(g)", 0)
+
+    protein_score = min(protein, 20)
+    sugar_score = max(20 - sugar, 0)
+    fat_score = max(10 - fat * 0.5, 0)
+    sat_fat_score = max(10 - sat_fat, 0)
+    calorie_score = max(10 - ((calories - 100) / 40), 0) if calories > 100 else 10
+    sodium_score = max(10 - (sodium / 200), 0)
+    cholesterol_score = max(5 - (cholesterol / 60), 0)
+    trans_score = 5 if trans == 0 else 0
+
+    total = (
+        protein_score + sugar_score + fat_score + sat_fat_score +
+        calorie_score + sodium_score + cholesterol_score + trans_score
+    )
+
+    return int(total)
+
+
+def get_tier(score):
+    for tier, threshold in TIERS:
+        if threshold is None or score >= threshold:
+            return tier
+
+
+# =====================[ COLUMNAR ]=====================
+def to_matrix(parsed_list):
+    # parsed dict 목록 → (기록 수, 영양성분 수) float64 행렬 (값이 없으면 NaN)
+    return np.array(
+        [[p.get(k) for k in NUTRIENTS] for p in parsed_list], dtype=np.float64
+    ).reshape(len(parsed_list), len(NUTRIENTS))
+
+
+def to_columns(parsed_list):
+    # parsed dict 목록 → {영양성분: float64 배열}
+    matrix = to_matrix(parsed_list)
+    return {k: matrix[:, i] for i, k in enumerate(NUTRIENTS)}
+
+
+def score_columns(cols):
+    """
+    calculate_score 의 벡터 버전 (없는 값은 0 으로 계산) → int64 배열
+    """
+    col = lambda k: np.nan_to_num(cols[k], nan=0.0)
+    protein, sugar, fat = col("단백질(g)"), col("당류(g)"), col("지방(g)")
+    sat_fat, calories, sodium = col("포화지방(g)"), col("칼로리(kcal)"), col("나트륨(mg)")
+    cholesterol, trans = col("콜레스테롤(mg)"), col("트랜스지방(g)")
+
+    total = (
+        np.minimum(protein, 20)
+        + np.maximum(20 - sugar, 0)
+        + np.maximum(10 - fat * 0.5, 0)
+        + np.maximum(10 - sat_fat, 0)
+        + np.where(calories > 100, np.maximum(10 - (calories - 100) / 40, 0), 10)
+        + np.maximum(10 - sodium / 200, 0)
+        + np.maximum(5 - cholesterol / 60, 0)
+        + np.where(trans == 0, 5, 0)
+    )
+    return np.trunc(total).astype(np.int64)
+
+
+def tier_columns(scores):
+    conditions = [scores >= t for _, t in TIERS if t is not None]
+    return np.select(conditions, [name for name, t in TIERS if t is not None], default=TIERS[-1][0])
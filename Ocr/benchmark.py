@@ -0,0 +1,276 @@
+import os
+import csv
+import sys
+import json
+import time
+import glob
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from Levenshtein import distance
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# OCR 엔진별 속도 + 정확도 일괄 평가
+#   python benchmark.py --dataset input --jobs 4 --baseline output/benchmark_prev.json
+# dataset 폴더: 이미지/PDF 와 같은 이름의 정답 .txt 쌍 (예: label1.jpeg + label1.txt)
+#   기본 input/: testpicture.jpeg, Presentation.pdf (같은 라벨 사진을 넣은 PDF) → 정답은 둘 다 true.txt 와 같음
+# ocrspace 는 OCR_SPACE_KEY 가 있을 때만 실제 API 로 평가 (없으면 건너뜀 — 스텁 응답으로는 정확도를 잴 수 없음)
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff")
+
+# 기준 리포트 대비 허용 범위 (이보다 나빠지면 회귀로 판정)
+DEFAULT_TOLERANCE = {"cer": 0.02, "wer": 0.05, "latency_ratio": 1.2, "throughput_ratio": 0.8}
+
+
+# =====================[ METRICS ]=====================
+def cer(truth, hyp):
+    # 문자 오류율 (공백 정규화 후)
+    truth = " ".join(truth.split())
+    hyp = " ".join(hyp.split())
+    if not truth:
+        return 0.0 if not hyp else 1.0
+    return distance(truth, hyp) / len(truth)
+
+
+def wer(truth, hyp):
+    # 단어 오류율: 단어마다 문자 하나씩 배정해서 문자열 편집거리로 계산
+    t_words, h_words = truth.split(), hyp.split()
+    if not t_words:
+        return 0.0 if not h_words else 1.0
+    vocab = {}
+    to_str = lambda words: "".join(chr(0xE000 + vocab.setdefault(w, len(vocab))) for w in words)
+    return distance(to_str(t_words), to_str(h_words)) / len(t_words)
+
+
+class RssSampler:
+    """
+    엔진 하나를 도는 동안 현재 프로세스 + 살아 있는 모든 자식(OCR 워커 풀) RSS 합을 주기적으로 재서 최댓값 기록
+    (getrusage 는 끝난 자식만, 그것도 가장 큰 하나만 세고 값이 누적이라 엔진별로 나눌 수 없음)
+    psutil 이 없으면 peak_mb 는 None
+    """
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def sample(self):
+        proc = psutil.Process()
+        total = 0
+        for p in [proc] + proc.children(recursive=True):
+            try:
+                total += p.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        self.peak = max(self.peak, total)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.sample()
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        if psutil is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if psutil is not None:
+            self._stop.set()
+            self._thread.join()
+            self.sample()
+
+    @property
+    def peak_mb(self):
+        return round(self.peak / (1024 * 1024), 1) if psutil is not None else None
+
+
+def pct(values, p):
+    values = sorted(values)
+    return values[min(int(len(values) * p), len(values) - 1)] if values else None
+
+
+# =====================[ ENGINES ]=====================
+def make_engines(api_key):
+    # 엔진 모듈(fitz, pytesseract 등)은 평가할 때만 import
+    import tesseract_ocr
+    import ocrspace_ocr
+    import pymupdf_ocr
+
+    return {
+        "tesseract": (IMAGE_EXTS, tesseract_ocr.ocr_with_tesseract),
+        "ocrspace": (IMAGE_EXTS, lambda p: ocrspace_ocr.ocr_space_api_preprocessed(p, api_key)),
+        "pymupdf": ((".pdf",), pymupdf_ocr.extract_text_from_pdf),
+    }
+
+
+def find_cases(dataset):
+    cases = []
+    for path in sorted(glob.glob(os.path.join(dataset, "*"))):
+        stem, ext = os.path.splitext(path)
+        if ext.lower() == ".txt" or not os.path.exists(stem + ".txt"):
+            continue
+        with open(stem + ".txt", "r", encoding="utf-8") as f:
+            cases.append((path, f.read()))
+    return cases
+
+
+def run_case(fn, path, truth):
+    start = time.perf_counter()
+    try:
+        text, error = fn(path), None
+    except Exception as e:
+        text, error = "", str(e)
+    latency = time.perf_counter() - start
+    return {
+        "file": os.path.basename(path),
+        "latency_ms": round(latency * 1000, 1),
+        "cer": round(cer(truth, text), 4),
+        "wer": round(wer(truth, text), 4),
+        "error": error,
+    }
+
+
+def run_engine(name, exts, fn, cases, jobs):
+    targets = [(p, t) for p, t in cases if os.path.splitext(p)[1].lower() in exts]
+    if not targets:
+        return None
+
+    start = time.perf_counter()
+    with RssSampler() as rss, ThreadPoolExecutor(max_workers=jobs) as ex:
+        rows = list(ex.map(lambda c: run_case(fn, *c), targets))
+    wall = time.perf_counter() - start
+
+    ok = [r for r in rows if not r["error"]]
+    latencies = [r["latency_ms"] for r in ok]
+    summary = {
+        "cases": len(rows),
+        "errors": len(rows) - len(ok),
+        "wall_s": round(wall, 3),
+        "throughput_per_s": round(len(rows) / wall, 3) if wall else None,
+        "latency_ms": {"mean": round(sum(latencies) / len(latencies), 1) if latencies else None,
+                       "p50": pct(latencies, 0.5), "p95": pct(latencies, 0.95)},
+        "cer": round(sum(r["cer"] for r in ok) / len(ok), 4) if ok else None,
+        "wer": round(sum(r["wer"] for r in ok) / len(ok), 4) if ok else None,
+        "peak_rss_mb": rss.peak_mb,
+    }
+    return {"summary": summary, "cases": rows}
+
+
+# =====================[ REGRESSION CHECK ]=====================
+def check_thresholds(report, thresholds):
+    # thresholds: {"tesseract": {"max_cer": 0.3, "max_wer": 0.5, "max_p95_ms": 2000, "min_throughput": 1.0}}
+    failures = []
+    for engine, limits in thresholds.items():
+        s = report["engines"].get(engine, {}).get("summary")
+        if not s:
+            continue
+        checks = [
+            ("max_cer", s["cer"], lambda v, l: v <= l),
+            ("max_wer", s["wer"], lambda v, l: v <= l),
+            ("max_p95_ms", s["latency_ms"]["p95"], lambda v, l: v <= l),
+            ("min_throughput", s["throughput_per_s"], lambda v, l: v >= l),
+        ]
+        for key, value, ok in checks:
+            if key in limits and value is not None and not ok(value, limits[key]):
+                failures.append(f"{engine}: {key} 기준 {limits[key]} 위반 (실제 {value})")
+    return failures
+
+
+def compare_baseline(report, baseline, tol=DEFAULT_TOLERANCE):
+    failures = []
+    for engine, data in report["engines"].items():
+        base = baseline.get("engines", {}).get(engine)
+        if not data or not base:
+            continue
+        cur, prev = data["summary"], base["summary"]
+        for key in ("cer", "wer"):
+            if cur[key] is not None and prev[key] is not None and cur[key] > prev[key] + tol[key]:
+                failures.append(f"{engine}: {key} {prev[key]} → {cur[key]}")
+        cur_p95, prev_p95 = cur["latency_ms"]["p95"], prev["latency_ms"]["p95"]
+        if cur_p95 and prev_p95 and cur_p95 > prev_p95 * tol["latency_ratio"]:
+            failures.append(f"{engine}: p95 지연 {prev_p95}ms → {cur_p95}ms")
+        cur_tp, prev_tp = cur["throughput_per_s"], prev["throughput_per_s"]
+        if cur_tp and prev_tp and cur_tp < prev_tp * tol["throughput_ratio"]:
+            failures.append(f"{engine}: 처리량 {prev_tp}/s → {cur_tp}/s")
+    return failures
+
+
+def write_csv(report, path):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["engine", "file", "latency_ms", "cer", "wer", "error"])
+        for engine, data in report["engines"].items():
+            for r in data["cases"] if data else []:
+                writer.writerow([engine, r["file"], r["latency_ms"], r["cer"], r["wer"], r["error"] or ""])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR 엔진 일괄 평가 (지연/처리량/메모리/CER/WER)")
+    parser.add_argument("--dataset", default="input", help="이미지/PDF + 정답 .txt 쌍이 있는 폴더")
+    parser.add_argument("--engines", default="tesseract,ocrspace,pymupdf")
+    parser.add_argument("--jobs", type=int, default=4, help="동시에 처리할 케이스 수")
+    parser.add_argument("--report", default="output/benchmark.json")
+    parser.add_argument("--csv", default="output/benchmark.csv")
+    parser.add_argument("--thresholds", help="엔진별 절대 기준 JSON 파일")
+    parser.add_argument("--baseline", help="비교할 이전 리포트 JSON")
+    args = parser.parse_args()
+
+    api_key = os.getenv("OCR_SPACE_KEY")
+    engines = make_engines(api_key)
+    names = [n.strip() for n in args.engines.split(",") if n.strip()]
+    unknown = [n for n in names if n not in engines]
+    if unknown:
+        parser.error(f"알 수 없는 엔진: {', '.join(unknown)} (가능: {', '.join(engines)})")
+    if "ocrspace" in names and not api_key:
+        print("OCR_SPACE_KEY 가 없어 ocrspace 는 건너뜁니다")
+        names.remove("ocrspace")
+    if psutil is None:
+        print("psutil 이 없어 RSS 는 측정하지 않습니다 (pip install psutil)")
+    cases = find_cases(args.dataset)
+    if not cases:
+        print(f"평가할 케이스가 없습니다: {args.dataset}")
+        return 1
+
+    report = {
+        "dataset": args.dataset,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "ocrspace": "live" if api_key else "skipped",
+        "engines": {},
+    }
+    for name in names:
+        exts, fn = engines[name]
+        result = run_engine(name, exts, fn, cases, args.jobs)
+        report["engines"][name] = result
+        if result:
+            s = result["summary"]
+            print(f"{name:<10} {s['cases']}건 / 오류 {s['errors']} / {s['throughput_per_s']}건/s / "
+                  f"p95 {s['latency_ms']['p95']}ms / CER {s['cer']} / WER {s['wer']} / RSS {s['peak_rss_mb']}MB")
+
+    failures = []
+    if args.thresholds:
+        with open(args.thresholds, "r", encoding="utf-8") as f:
+            failures += check_thresholds(report, json.load(f))
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            failures += compare_baseline(report, json.load(f))
+    report["regressions"] = failures
+
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    write_csv(report, args.csv)
+    print(f"리포트 저장: {args.report}, {args.csv}")
+
+    for msg in failures:
+        print("회귀:", msg)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,68 +1,53 @@
 import cv2
-from PIL import Image
-import numpy as np
-import requests
 import os
+import sys
 
-def preprocess_image(img_path):
-    img = cv2.imread(img_path)
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    gray = cv2.medianBlur(gray, 3)
-    _, thresh = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY)
-    
-    scale = 2
-    thresh = cv2.resize(thresh, None, fx=scale, fy=scale, interpolation=cv2.INTER_LINEAR)
-    
-    return thresh
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.ocr_client import OcrSpaceClient, OcrError
+from common.preprocess import Pipeline, Grayscale, MedianBlur, Threshold, Resize, load_image
 
-def ocr_space_api_preprocessed(img_path, api_key, language="kor"):
+# 그레이스케일 → 미디언 블러 → 고정 임계값 이진화 → 2배 확대
+PIPELINE = Pipeline([Grayscale(), MedianBlur(3), Threshold(150), Resize(2)])
 
-    processed = preprocess_image(img_path)
-    processed_path = "temp_processed.png"
-    cv2.imwrite(processed_path, processed)
+def preprocess_image(img_path):
+    return PIPELINE.run(load_image(img_path))
 
-    url = "https://api.ocr.space/parse/image"
+_clients = {}
 
-    with open(processed_path, "rb") as f:
-        resp = requests.post(
-            url,
-            files={"filename": f},
-            data={
-                "apikey": api_key,            
-                "language": language,
-                "OCREngine": 2,              
-                "scale": True,                 
-                "detectOrientation": True
-            },
-            timeout=30
-        )
 
-    try:
-        result = resp.json()
-    except:
-        print("Json이 아님")
-        os.remove(processed_path)
-        return ""
+def get_client(api_key):
+    # api 키별로 클라이언트 하나만 만들어 커넥션 풀 재사용
+    if api_key not in _clients:
+        _clients[api_key] = OcrSpaceClient(api_key, timeout=30)
+    return _clients[api_key]
 
-    os.remove(processed_path) 
 
-    if result.get("IsErroredOnProcessing"):
-        print("OCR 처리 에러:", result.get("ErrorMessage") or result.get("ErrorDetails"))
-        return ""
+def ocr_space_api_preprocessed(img_path, api_key, language="kor"):
 
-    parsed = result.get("ParsedResults")
-    if not parsed:
-        print("OCR 결과 없음:", result)
-        return ""
+    processed = preprocess_image(img_path)
+    ok, buf = cv2.imencode(".png", processed)
+    if not ok:
+        raise OcrError("전처리 이미지 인코딩 실패")
 
-    return parsed[0].get("ParsedText", "").strip()
+    text = get_client(api_key).recognize(
+        buf.tobytes(),
+        language=language,
+        filename="processed.png",
+        scale=True,
+        detectOrientation=True,
+    )
+    return text.strip()
 
 
 if __name__ == "__main__":
     img_path = "input/testpicture.jpeg"  
     api_key = "본인의 api 키"      
 
-    text = ocr_space_api_preprocessed(img_path, api_key)
+    try:
+        text = ocr_space_api_preprocessed(img_path, api_key)
+    except OcrError as e:
+        print("OCR 처리 에러:", e)
+        text = ""
     print("OCR.Space 결과:\n", text)
 
     with open("output/ocrspace.txt", "w", encoding="utf-8") as f:
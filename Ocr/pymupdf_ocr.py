@@ -1,48 +1,237 @@
 import fitz  # PyMuPDF
 from PIL import Image
-import pytesseract
 import io
+import os
+import sys
+import json
+import time
+import argparse
+from collections import deque
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import partial
 import cv2
 import numpy as np
 
-# ✅ 이미지 전처리 함수
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.tesseract_pool import TESSERACT_TIMEOUT, TesseractPool, get_pool
+from common.preprocess import Pipeline, Grayscale, MedianBlur, Threshold, Resize
+
+# ✅ 이미지 전처리 (PIL 이미지는 RGB → 바로 그레이스케일)
+PIPELINE = Pipeline([Grayscale(cv2.COLOR_RGB2GRAY), MedianBlur(3), Threshold(150), Resize(1.5)])
+# 렌더링 페이지는 이미 그레이스케일 + DPI 로 해상도 확보 → 확대 없음
+PAGE_PIPELINE = Pipeline([MedianBlur(3), Threshold(150)])
+
 def preprocess_image_pil(pil_img):
-    img = np.array(pil_img)
-    img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    gray = cv2.medianBlur(gray, 3)
-    _, thresh = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY)
-    scale = 1.5
-    thresh = cv2.resize(thresh, None, fx=scale, fy=scale, interpolation=cv2.INTER_LINEAR)
-
-    return thresh
-
-def extract_text_from_pdf(pdf_path):
-   doc = fitz.open(pdf_path)
-   full_text = ""
-
-   for page_num in range(len(doc)):
-       page = doc.load_page(page_num)
-       text = page.get_text()
-       full_text += text
-
-       # 이미지 추출
-       image_list = page.get_images()
-       for img_index, img in enumerate(image_list):
-           xref = img[0]
-           base_image = doc.extract_image(xref)
-           image_bytes = base_image["image"]
-           img_pil = Image.open(io.BytesIO(image_bytes))
-
-           processed = preprocess_image_pil(img_pil)
-           pil_processed = Image.fromarray(processed)
-           img_text = pytesseract.image_to_string(pil_processed, lang='kor')
-           full_text += "\n[이미지 내 텍스트]\n" + img_text + "\n"
-
-   return full_text
-
-text = extract_text_from_pdf("input/Presentation.pdf")
-print(text)
-
-with open("output/pymupdf_tesseract.txt", "w", encoding="utf-8") as f:
-    f.write(text)
+    return PIPELINE.run(np.asarray(pil_img))
+
+# 디코딩/렌더링 이미지 최대 픽셀 수 (문서 크기와 무관하게 워커 메모리 상한 유지)
+MAX_IMAGE_PIXELS = 20_000_000
+
+def preprocess_image_bytes(image_bytes, max_pixels=MAX_IMAGE_PIXELS):
+    # 워커 프로세스에서 실행: 임베디드 이미지 바이트 → 디코딩 → 전처리
+    # open 은 헤더만 읽음 → 크기를 먼저 보고 상한을 넘으면 원본 크기로 풀지 않음
+    img_pil = Image.open(io.BytesIO(image_bytes))
+    w, h = img_pil.size
+    if w * h > max_pixels:
+        # JPEG 은 draft 로 축소 디코딩, 그 외(PNG/TIFF 등)는 축소 디코딩이 안 되므로 거부
+        r = (max_pixels / (w * h)) ** 0.5
+        if img_pil.draft("RGB", (int(w * r), int(h * r))) is None:
+            raise ValueError(f"이미지가 너무 큽니다: {w}x{h} {img_pil.format} (상한 {max_pixels} 픽셀)")
+        img_pil = img_pil.convert("RGB")
+        if img_pil.size[0] * img_pil.size[1] > max_pixels:
+            img_pil = img_pil.resize((int(w * r), int(h * r)))
+    return preprocess_image_pil(img_pil.convert("RGB"))
+
+def preprocess_rendered_page(page_image):
+    # 워커 프로세스에서 실행: 렌더링된 그레이스케일 페이지 → 이진화 (DPI 로 해상도 확보 → 확대 없음)
+    samples, width, height, stride = page_image
+    gray = np.frombuffer(samples, np.uint8).reshape(height, stride)[:, :width]
+    return PAGE_PIPELINE.run(gray)
+
+def render_dpi_for(page, dpi, max_pixels=MAX_IMAGE_PIXELS):
+    # 페이지가 커서 픽셀 수가 상한을 넘으면 DPI 를 낮춤
+    w_in, h_in = page.rect.width / 72, page.rect.height / 72
+    if w_in * h_in * dpi * dpi > max_pixels:
+        dpi = int((max_pixels / (w_in * h_in)) ** 0.5)
+    return dpi
+
+def iter_pages(pdf_path, workers=None, first_page=1, last_page=None, render_dpi=None, max_pixels=MAX_IMAGE_PIXELS,
+               timeout=TESSERACT_TIMEOUT):
+    """
+    페이지별 결과를 순서대로 yield 하는 제너레이터
+    - 이미지 OCR 은 프로세스 풀로 병렬 처리 (처리 중인 작업 수는 풀 크기 기준으로 제한)
+    - 여러 페이지에 반복되는 이미지(xref)는 한 번만 OCR
+    - render_dpi 를 주면 본문 텍스트가 없는 페이지는 통째로 렌더링 후 OCR
+    - 앞 페이지의 작업이 끝났거나 OCR 할 것이 없으면 바로 yield (텍스트만 있는 PDF 도 스트리밍)
+    yield: {"page", "text", "image_texts", "page_ocr_text", "rendered_dpi", "timings", "errors"}
+    errors: 너무 커서 건너뛴 이미지, Tesseract 오류/워커 중단, timeout 초 넘게 기다린 OCR 등 (해당 텍스트는 "")
+    timeout: 이미지/페이지 OCR 한 건을 기다리는 최대 시간 (None/0 이면 무제한)
+    """
+    pool = TesseractPool(lang='kor', size=workers) if workers else get_pool(lang='kor')
+    max_inflight = pool.size * 4
+    image_prep = partial(preprocess_image_bytes, max_pixels=max_pixels)
+    xref_futures = {}
+    pending = deque()
+    inflight = 0
+
+    def result_of(future, errors):
+        # 이미지 하나의 실패/지연이 페이지 스트림 전체를 멈추지 않도록 errors 에 남기고 빈 텍스트
+        try:
+            return future.result(timeout=timeout or None)
+        except FutureTimeoutError:
+            future.cancel()
+            errors.append(f"OCR 시간 초과 ({timeout}s)")
+        except ValueError as e:
+            errors.append(str(e))
+        except Exception as e:
+            # Tesseract 오류, 워커 비정상 종료(BrokenProcessPool) 등 → 다음 submit 때 풀은 다시 만들어짐
+            errors.append(f"OCR 실패: {type(e).__name__}: {e}")
+        return "", 0.0
+
+    def finish(item):
+        wait_start = time.perf_counter()
+        errors = []
+        image_results = [result_of(f, errors) for f in item["futures"]]
+        page_result = result_of(item["page_future"], errors) if item["page_future"] else None
+        ocr_wait = time.perf_counter() - wait_start
+
+        # 다른 페이지에서 이미 OCR 한 이미지(xref 재사용)는 시간에 포함하지 않음
+        ocr_sec = sum((t for (_, t), new in zip(image_results, item["new"]) if new), 0.0)
+        if page_result:
+            ocr_sec += page_result[1]
+        timings = item["timings"]
+        timings["ocr_ms"] = round(ocr_sec * 1000, 1)
+        timings["ocr_wait_ms"] = round(ocr_wait * 1000, 1)
+        return {
+            "page": item["page"],
+            "text": item["text"],
+            "image_texts": [text for text, _ in image_results],
+            "page_ocr_text": page_result[0] if page_result else None,
+            "rendered_dpi": item["rendered_dpi"],
+            "timings": timings,
+            "errors": errors,
+        }
+
+    def n_tasks(item):
+        return sum(item["new"]) + (1 if item["page_future"] else 0)
+
+    def ready(item):
+        # 작업이 없거나 모두 끝난 페이지 (all([]) = True)
+        futures = item["futures"] + ([item["page_future"]] if item["page_future"] else [])
+        return all(f.done() for f in futures)
+
+    try:
+        with fitz.open(pdf_path) as doc:
+            last = min(last_page or len(doc), len(doc))
+            for page_num in range(first_page - 1, last):
+                page = doc.load_page(page_num)
+
+                t0 = time.perf_counter()
+                text = page.get_text()
+                t1 = time.perf_counter()
+
+                futures, new = [], []
+                for img in page.get_images():
+                    xref = img[0]
+                    is_new = xref not in xref_futures
+                    if is_new:
+                        image_bytes = doc.extract_image(xref)["image"]
+                        xref_futures[xref] = pool.submit(image_bytes, preprocess=image_prep, timed=True)
+                    futures.append(xref_futures[xref])
+                    new.append(is_new)
+                t2 = time.perf_counter()
+
+                # 본문 텍스트가 없는 (스캔) 페이지 → 렌더링 후 OCR
+                page_future, dpi = None, None
+                if render_dpi and not text.strip():
+                    dpi = render_dpi_for(page, render_dpi, max_pixels)
+                    pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+                    page_image = (pix.samples, pix.width, pix.height, pix.stride)
+                    del pix
+                    page_future = pool.submit(page_image, preprocess=preprocess_rendered_page, timed=True)
+                t3 = time.perf_counter()
+
+                item = {
+                    "page": page_num + 1,
+                    "text": text,
+                    "futures": futures,
+                    "new": new,
+                    "page_future": page_future,
+                    "rendered_dpi": dpi,
+                    "timings": {
+                        "text_ms": round((t1 - t0) * 1000, 1),
+                        "extract_ms": round((t2 - t1) * 1000, 1),
+                        "render_ms": round((t3 - t2) * 1000, 1),
+                    },
+                }
+                pending.append(item)
+                inflight += n_tasks(item)
+
+                # 앞 페이지가 끝났으면 바로, 처리 중인 작업이 많으면 기다려서라도 앞 페이지부터 내보냄 (메모리 확보)
+                while pending and (inflight > max_inflight or ready(pending[0])):
+                    head = pending.popleft()
+                    inflight -= n_tasks(head)
+                    yield finish(head)
+
+            while pending:
+                yield finish(pending.popleft())
+    finally:
+        # 제너레이터를 중간에 닫아도 (break / close) 전용 풀은 정리
+        if workers:
+            pool.close()
+
+def format_page(result):
+    parts = [result["text"]]
+    for img_text in result["image_texts"]:
+        parts.append("\n[이미지 내 텍스트]\n" + img_text + "\n")
+    if result.get("page_ocr_text"):
+        parts.append("\n[페이지 OCR]\n" + result["page_ocr_text"] + "\n")
+    return "".join(parts)
+
+def extract_text_from_pdf(pdf_path, workers=None):
+    return "".join(format_page(r) for r in iter_pages(pdf_path, workers=workers))
+
+def parse_page_range(value):
+    # "3" → (3, 3), "2-10" → (2, 10), "5-" → (5, None)
+    if not value:
+        return 1, None
+    start, _, end = value.partition("-")
+    first = int(start) if start else 1
+    if not _:
+        return first, first
+    return first, int(end) if end else None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PDF 본문 + 이미지 OCR 텍스트 추출")
+    parser.add_argument("pdf", nargs="?", default="input/Presentation.pdf")
+    parser.add_argument("-o", "--output", default="output/pymupdf_tesseract.txt")
+    parser.add_argument("--workers", type=int, default=None, help="OCR 워커 프로세스 수")
+    parser.add_argument("--pages", default=None, help="페이지 범위 (예: 3, 2-10, 5-)")
+    parser.add_argument("--jsonl", default=None, help="페이지별 레코드를 JSONL 로 저장할 경로")
+    parser.add_argument("--render-dpi", type=int, default=None, help="본문 텍스트 없는 페이지를 이 DPI 로 렌더링 후 OCR")
+    parser.add_argument("--max-pixels", type=int, default=MAX_IMAGE_PIXELS, help="이미지/렌더링 최대 픽셀 수")
+    parser.add_argument("--timeout", type=float, default=TESSERACT_TIMEOUT, help="OCR 한 건 최대 대기 시간(초), 0 이면 무제한")
+    args = parser.parse_args()
+
+    first_page, last_page = parse_page_range(args.pages)
+    pages = iter_pages(args.pdf, args.workers, first_page, last_page, args.render_dpi, args.max_pixels, args.timeout)
+
+    def report_errors(result):
+        for err in result["errors"]:
+            print(f"page {result['page']}: 건너뜀 - {err}", file=sys.stderr)
+
+    # 페이지 결과가 나오는 대로 바로 파일에 기록
+    if args.jsonl:
+        with open(args.jsonl, "w", encoding="utf-8") as f:
+            for result in pages:
+                f.write(json.dumps(result, ensure_ascii=False) + "\n")
+                f.flush()
+                print(f"page {result['page']}: {result['timings']}")
+                report_errors(result)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            for result in pages:
+                page_text = format_page(result)
+                print(page_text)
+                f.write(page_text)
+                report_errors(result)
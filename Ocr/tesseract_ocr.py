@@ -1,27 +1,28 @@
-import cv2
-from PIL import Image
-import pytesseract
-import numpy as np
+import os
+import sys
 
-def preprocess_image(img_path):
-    # 이미지 읽기 (OpenCV는 BGR)
-    img = cv2.imread(img_path)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.tesseract_pool import get_pool
+from common.preprocess import Pipeline, Grayscale, MedianBlur, Threshold, Resize, load_image
 
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    gray = cv2.medianBlur(gray, 3)
-    _, thresh = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY)
-    scale = 1.5
-    thresh = cv2.resize(thresh, None, fx=scale, fy=scale, interpolation=cv2.INTER_LINEAR)
+# 그레이스케일 → 미디언 블러 → 고정 임계값 이진화 → 1.5배 확대
+PIPELINE = Pipeline([Grayscale(), MedianBlur(3), Threshold(150), Resize(1.5)])
 
-    return thresh
+def preprocess_image(img_path):
+    # 경로 / 바이트 / ndarray 모두 허용
+    return PIPELINE.run(load_image(img_path))
 
 def ocr_with_tesseract(img_path):
     processed = preprocess_image(img_path)
-    pil_img = Image.fromarray(processed)
-    text = pytesseract.image_to_string(pil_img, lang='kor', config='--psm 6')
+    text = get_pool(lang='kor', psm=6).recognize(processed)
 
     return text
 
+def ocr_many_with_tesseract(img_paths):
+    # 여러 장을 워커 풀에서 병렬 처리 (입력 순서 유지)
+    processed = PIPELINE.run_many([load_image(p) for p in img_paths])
+    return get_pool(lang='kor', psm=6).recognize_many(processed)
+
 if __name__ == "__main__":
     result = ocr_with_tesseract("input/testpicture.jpeg")
     print(result)
@@ -0,0 +1,178 @@
+import time
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+# 외부 의존성 없이 Prometheus 텍스트 형식으로 내보내는 경량 계측
+#   with stage("decode"): ...        → 단계별 히스토그램 + (요청 프로파일이 켜져 있으면) 누적 ms
+#   @timed("parse")                  → 함수 전체를 한 단계로 측정
+#   install(app)                     → /metrics 라우트 + 요청 지연 히스토그램 + X-Profile 헤더 처리
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+PROFILE_HEADER = "X-Profile"
+
+
+# =====================[ HISTOGRAM ]=====================
+class Histogram:
+    def __init__(self, name, help_text, label_names, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels → [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        for labels, series in items:
+            base = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(self.label_names, labels))
+            sep = "," if base else ""
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{base}{sep}le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{base}{sep}le="+Inf"}} {series[-1]}')
+            tag = f"{{{base}}}" if base else ""
+            lines.append(f"{self.name}_sum{tag} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{tag} {series[-1]}")
+        return lines
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+STAGE_SECONDS = Histogram("stage_duration_seconds", "Hot-path stage duration", ["stage"])
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request duration", ["method", "endpoint", "status"]
+)
+
+# 앱별 추가 게이지: fn() → [(이름, {라벨}, 값), ...]
+_collectors = []
+
+
+def add_collector(fn):
+    _collectors.append(fn)
+
+
+def render_metrics():
+    lines = STAGE_SECONDS.render() + REQUEST_SECONDS.render()
+    for fn in _collectors:
+        for name, labels, value in fn():
+            if value is None:
+                continue
+            label_str = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+            lines.append(f"{name}{{{label_str}}} {value}" if label_str else f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+# =====================[ STAGE TIMERS ]=====================
+_local = threading.local()
+
+
+def start_profile():
+    # 현재 스레드에서 단계별 소요 시간 누적 시작
+    _local.profile = {}
+
+
+def end_profile():
+    profile = getattr(_local, "profile", None)
+    _local.profile = None
+    return {k: round(v, 2) for k, v in profile.items()} if profile is not None else None
+
+
+@contextmanager
+def profiling():
+    start_profile()
+    stages = {}
+    try:
+        yield stages
+    finally:
+        stages.update(end_profile() or {})
+
+
+def record(name, seconds):
+    STAGE_SECONDS.observe(seconds, name)
+    profile = getattr(_local, "profile", None)
+    if profile is not None:
+        profile[name] = profile.get(name, 0.0) + seconds * 1000
+
+
+@contextmanager
+def stage(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def timed(name):
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# =====================[ FLASK ]=====================
+def profile_requested(req):
+    # X-Profile: 1 헤더 또는 ?profile=1
+    flag = req.headers.get(PROFILE_HEADER) or req.args.get("profile", "")
+    return flag.lower() in ("1", "true", "yes")
+
+
+def install(app):
+    """
+    Flask 앱에 계측 연결
+    - GET /metrics: Prometheus 텍스트 형식
+    - 모든 요청의 지연을 endpoint 별 히스토그램에 기록
+    - 프로파일 요청이면 JSON 응답(dict)에 "profile": {단계: ms, ..., "total_ms": ...} 추가
+    """
+    from flask import Response, g, request
+
+    @app.before_request
+    def _begin():
+        g._metrics_start = time.perf_counter()
+        if profile_requested(request):
+            start_profile()
+            g._metrics_profile = True
+
+    @app.after_request
+    def _finish(response):
+        elapsed = time.perf_counter() - g.pop("_metrics_start", time.perf_counter())
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        REQUEST_SECONDS.observe(elapsed, request.method, endpoint, str(response.status_code))
+
+        if g.pop("_metrics_profile", False):
+            stages = end_profile() or {}
+            data = response.get_json(silent=True) if response.is_json else None
+            if isinstance(data, dict):
+                data["profile"] = dict(stages, total_ms=round(elapsed * 1000, 2))
+                response.set_data(app.json.dumps(data))
+        return response
+
+    @app.teardown_request
+    def _cleanup(exc):
+        # 예외로 after_request 가 건너뛰어졌을 때 스레드에 프로파일이 남지 않도록
+        _local.profile = None
+
+    @app.route("/metrics")
+    def metrics():
+        return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+    return app
@@ -0,0 +1,248 @@
+import os
+import time
+import random
+import logging
+import threading
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+OCR_SPACE_URL = os.getenv("OCR_SPACE_URL", "https://api.ocr.space/parse/image")
+
+
+class OcrError(Exception):
+    pass
+
+
+class CircuitOpenError(OcrError):
+    pass
+
+
+# =====================[ RATE LIMIT ]=====================
+class TokenBucket:
+    """
+    클라이언트 측 요청 속도 제한 (API 요금제 한도에 맞춰 설정)
+    rate: 초당 토큰 충전량 (0 이하면 제한 없음), capacity: 순간 최대 요청 수
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        if self.rate <= 0:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+# =====================[ CIRCUIT BREAKER ]=====================
+class CircuitBreaker:
+    """
+    연속 실패가 threshold 이상이면 cooldown 동안 바로 실패 (open)
+    cooldown 후 한 번 시도해보고 성공하면 복구 (half-open → closed)
+    half-open 에서는 시험 요청 하나만 통과, 나머지는 결과가 나올 때까지 open 처럼 차단
+    (시험 요청이 성공/실패를 남기지 못하고 끝나면 cooldown 뒤 다음 요청이 다시 시험)
+    """
+
+    def __init__(self, threshold=5, cooldown=30):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at = None
+        self._probe_at = None
+        self._lock = threading.Lock()
+
+    def _state(self, now):
+        if self._opened_at is None:
+            return "closed"
+        if now - self._opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def check(self):
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(now)
+            if state == "closed":
+                return
+            if state == "half-open" and (self._probe_at is None or now - self._probe_at >= self.cooldown):
+                self._probe_at = now
+                return
+        raise CircuitOpenError("OCR 서버 장애로 요청을 일시 차단 중입니다.")
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_at = None
+            if self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
+
+
+# =====================[ METRICS ]=====================
+class OcrMetrics:
+    def __init__(self, window=500):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.rejected = 0
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, latency, ok):
+        with self._lock:
+            self.requests += 1
+            if not ok:
+                self.errors += 1
+            self._latencies.append(latency)
+
+    def incr(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self):
+        with self._lock:
+            lat = sorted(self._latencies)
+
+        def pct(p):
+            return round(lat[min(int(len(lat) * p), len(lat) - 1)] * 1000, 1) if lat else None
+
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "rejected": self.rejected,
+            "latency_ms": {"p50": pct(0.5), "p95": pct(0.95), "max": pct(1.0)},
+        }
+
+
+# =====================[ CLIENT ]=====================
+class OcrSpaceClient:
+    """
+    OCR.Space 공용 클라이언트
+    - keep-alive 커넥션 풀 (Session 재사용)
+    - 5xx / 타임아웃 / 연결 오류 시 지수 백오프 재시도
+    - 토큰 버킷 속도 제한 + 서킷 브레이커 + 지연/오류 지표
+    """
+
+    def __init__(
+        self,
+        api_key,
+        url=OCR_SPACE_URL,
+        timeout=20,
+        max_retries=3,
+        backoff=0.5,
+        rate_per_minute=60,
+        burst=5,
+        breaker_threshold=5,
+        breaker_cooldown=30,
+        pool_size=10,
+    ):
+        self.api_key = api_key
+        self.url = url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.limiter = TokenBucket(rate_per_minute / 60.0, burst)
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_cooldown)
+        self.metrics = OcrMetrics()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _post(self, image_bytes, filename, data):
+        start = time.perf_counter()
+        ok = False
+        try:
+            resp = self.session.post(
+                self.url,
+                files={"filename": (filename, image_bytes)},
+                data=data,
+                timeout=self.timeout,
+            )
+            ok = resp.status_code < 500
+            return resp
+        finally:
+            self.metrics.observe(time.perf_counter() - start, ok)
+
+    def recognize(self, image_bytes, language="kor", filename="image.png", **options):
+        """
+        이미지 바이트 → 인식된 텍스트
+        실패 시 OcrError (서킷 open 이면 CircuitOpenError)
+        """
+        try:
+            self.breaker.check()
+        except CircuitOpenError:
+            self.metrics.incr("rejected")
+            raise
+
+        data = {"apikey": self.api_key, "language": language, "OCREngine": 2}
+        data.update(options)
+
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt > 0:
+                self.metrics.incr("retries")
+                time.sleep(self.backoff * (2 ** (attempt - 1)) * (1 + random.random() * 0.2))
+
+            if not self.limiter.acquire(timeout=self.timeout):
+                self.metrics.incr("rejected")
+                raise OcrError("OCR 요청 속도 제한 대기 시간 초과")
+
+            try:
+                resp = self._post(image_bytes, filename, data)
+            except (requests.Timeout, requests.ConnectionError) as e:
+                last_error = e
+                logger.warning(f"OCR 요청 실패 (시도 {attempt + 1}): {e}")
+                continue
+
+            if resp.status_code >= 500:
+                last_error = OcrError(f"OCR 서버 오류: HTTP {resp.status_code}")
+                logger.warning(f"OCR 서버 오류 (시도 {attempt + 1}): HTTP {resp.status_code}")
+                continue
+
+            # 여기까지 왔으면 서버는 살아있음 → 4xx/파싱 오류는 재시도하지 않음
+            self.breaker.record_success()
+            try:
+                result = resp.json()
+            except ValueError:
+                raise OcrError(f"OCR 응답이 JSON이 아님: HTTP {resp.status_code}")
+
+            if result.get("IsErroredOnProcessing"):
+                raise OcrError(f"OCR 처리 에러: {result.get('ErrorMessage') or result.get('ErrorDetails')}")
+
+            parsed = result.get("ParsedResults") or []
+            return parsed[0].get("ParsedText", "") if parsed else ""
+
+        self.breaker.record_failure()
+        raise OcrError(f"OCR 요청 재시도 초과: {last_error}")
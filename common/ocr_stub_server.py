@@ -0,0 +1,72 @@
+# OCR.Space 흉내를 내는 로컬 스텁 서버 (클라이언트 재시도/서킷/속도 제한 확인용)
+#   python -m common.ocr_stub_server --port 8089 --fail-first 2 --latency 0.2
+#   OCR_SPACE_URL=http://127.0.0.1:8089/parse/image python app.py
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_handler(text="", latency=0.0, fail_first=0, status=200):
+    state = {"count": 0}
+    lock = threading.Lock()
+
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            self.rfile.read(length)
+
+            with lock:
+                state["count"] += 1
+                n = state["count"]
+
+            if latency:
+                time.sleep(latency)
+
+            code = 503 if n <= fail_first else status
+            body = json.dumps({
+                "ParsedResults": [{"ParsedText": text}] if code == 200 else [],
+                "IsErroredOnProcessing": code != 200,
+                "ErrorMessage": None if code == 200 else f"stub error {code}",
+            }, ensure_ascii=False).encode("utf-8")
+
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return StubHandler
+
+
+def serve(port=8089, **kwargs):
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(**kwargs))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--text-file", help="ParsedText 로 돌려줄 텍스트 파일")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--fail-first", type=int, default=0, help="처음 N개 요청은 503")
+    parser.add_argument("--status", type=int, default=200)
+    args = parser.parse_args()
+
+    text = ""
+    if args.text_file:
+        with open(args.text_file, "r", encoding="utf-8") as f:
+            text = f.read()
+
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", args.port),
+        make_handler(text=text, latency=args.latency, fail_first=args.fail_first, status=args.status),
+    )
+    print(f"OCR 스텁 서버: http://127.0.0.1:{args.port}/parse/image")
+    server.serve_forever()
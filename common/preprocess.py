@@ -0,0 +1,292 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from common.resources import get_kernel, get_clahe
+from common.metrics import record
+
+
+def load_image(src, flags=cv2.IMREAD_COLOR):
+    # 경로 / 바이트 / ndarray 모두 허용 → 호출 측에서 디스크를 다시 읽지 않아도 됨
+    if isinstance(src, np.ndarray):
+        return src
+    if isinstance(src, (bytes, bytearray, memoryview)):
+        img = cv2.imdecode(np.frombuffer(src, np.uint8), flags)
+    else:
+        img = cv2.imread(src, flags)
+    if img is None:
+        raise ValueError("이미지를 불러오지 못했습니다.")
+    return img
+
+
+# =====================[ STAGES ]=====================
+# 각 단계는 __call__(src, dst) → 결과 ndarray
+# dst 는 이전 호출 때 이 단계가 만든 버퍼 (크기가 맞으면 OpenCV 가 재할당 없이 그대로 씀)
+# kind: 계측용 단계 분류 (denoise / threshold / resize …)
+class Stage:
+    kind = "other"
+
+    def describe(self):
+        return {"stage": type(self).__name__, **vars(self)}
+
+
+class Grayscale(Stage):
+    kind = "color"
+
+    def __init__(self, code=cv2.COLOR_BGR2GRAY):
+        self.code = code
+
+    def __call__(self, src, dst=None):
+        if src.ndim == 2:
+            return src
+        return cv2.cvtColor(src, self.code, dst=dst)
+
+
+class Bilateral(Stage):
+    kind = "denoise"
+
+    def __init__(self, d=5, sigma_color=150, sigma_space=150):
+        self.d = d
+        self.sigma_color = sigma_color
+        self.sigma_space = sigma_space
+
+    def __call__(self, src, dst=None):
+        return cv2.bilateralFilter(src, self.d, self.sigma_color, self.sigma_space, dst=dst)
+
+
+class MedianBlur(Stage):
+    kind = "denoise"
+
+    def __init__(self, ksize=3):
+        self.ksize = ksize
+
+    def __call__(self, src, dst=None):
+        return cv2.medianBlur(src, self.ksize, dst=dst)
+
+
+class GaussianBlur(Stage):
+    kind = "denoise"
+
+    def __init__(self, ksize=5, sigma=0):
+        self.ksize = ksize
+        self.sigma = sigma
+
+    def __call__(self, src, dst=None):
+        return cv2.GaussianBlur(src, (self.ksize, self.ksize), self.sigma, dst=dst)
+
+
+class NlMeans(Stage):
+    kind = "denoise"
+
+    def __init__(self, h=25, template=7, search=21):
+        self.h = h
+        self.template = template
+        self.search = search
+
+    def __call__(self, src, dst=None):
+        return cv2.fastNlMeansDenoising(src, dst, self.h, self.template, self.search)
+
+
+class Clahe(Stage):
+    kind = "contrast"
+
+    def __init__(self, clip_limit=2.0, tile_grid=(8, 8)):
+        self.clip_limit = clip_limit
+        self.tile_grid = tuple(tile_grid)
+
+    def __call__(self, src, dst=None):
+        return get_clahe(self.clip_limit, self.tile_grid).apply(src, dst=dst)
+
+
+class EqualizeHist(Stage):
+    kind = "contrast"
+
+    def __call__(self, src, dst=None):
+        return cv2.equalizeHist(src, dst=dst)
+
+
+class Threshold(Stage):
+    kind = "threshold"
+
+    def __init__(self, thresh=150, maxval=255, type=cv2.THRESH_BINARY):
+        self.thresh = thresh
+        self.maxval = maxval
+        self.type = type
+
+    def __call__(self, src, dst=None):
+        return cv2.threshold(src, self.thresh, self.maxval, self.type, dst=dst)[1]
+
+
+class AdaptiveThreshold(Stage):
+    kind = "threshold"
+
+    def __init__(self, block_size=25, c=10, method=cv2.ADAPTIVE_THRESH_GAUSSIAN_C, type=cv2.THRESH_BINARY):
+        self.block_size = block_size
+        self.c = c
+        self.method = method
+        self.type = type
+
+    def __call__(self, src, dst=None):
+        return cv2.adaptiveThreshold(src, 255, self.method, self.type, self.block_size, self.c, dst=dst)
+
+
+class Morphology(Stage):
+    kind = "morphology"
+
+    def __init__(self, op=cv2.MORPH_CLOSE, ksize=(3, 3), shape=cv2.MORPH_RECT, iterations=1):
+        self.op = op
+        self.ksize = tuple(ksize)
+        self.shape = shape
+        self.iterations = iterations
+
+    def __call__(self, src, dst=None):
+        kernel = get_kernel(self.shape, self.ksize)
+        return cv2.morphologyEx(src, self.op, kernel, dst=dst, iterations=self.iterations)
+
+
+def _resize(src, scale, dst=None, upscale_interp=cv2.INTER_LINEAR, fit=False):
+    # fit=True: 긴 변 기준 목표 크기에 맞춤 (정수 크기 지정), False: fx/fy 배율 그대로
+    interp = upscale_interp if scale > 1 else cv2.INTER_AREA
+    if fit:
+        h, w = src.shape[:2]
+        size = (max(int(w * scale), 1), max(int(h * scale), 1))
+        return cv2.resize(src, size, dst=dst, interpolation=interp)
+    return cv2.resize(src, None, dst=dst, fx=scale, fy=scale, interpolation=interp)
+
+
+class Resize(Stage):
+    # 고정 배율
+    kind = "resize"
+
+    def __init__(self, scale=1.5, interpolation=cv2.INTER_LINEAR):
+        self.scale = scale
+        self.interpolation = interpolation
+
+    def __call__(self, src, dst=None):
+        return cv2.resize(src, None, dst=dst, fx=self.scale, fy=self.scale, interpolation=self.interpolation)
+
+
+class LimitSize(Stage):
+    # 긴 변이 max_side 보다 크면 축소 (비싼 필터 앞에 둠)
+    kind = "resize"
+
+    def __init__(self, max_side=2000):
+        self.max_side = max_side
+
+    def __call__(self, src, dst=None):
+        long_side = max(src.shape[:2])
+        if long_side <= self.max_side:
+            return src
+        return _resize(src, self.max_side / long_side, dst, fit=True)
+
+
+class UpscaleTo(Stage):
+    # 긴 변이 min_side 보다 작으면 min_side 까지 확대
+    kind = "resize"
+
+    def __init__(self, min_side=900, interpolation=cv2.INTER_CUBIC):
+        self.min_side = min_side
+        self.interpolation = interpolation
+
+    def __call__(self, src, dst=None):
+        long_side = max(src.shape[:2])
+        if long_side >= self.min_side:
+            return src
+        return _resize(src, self.min_side / long_side, dst, self.interpolation, fit=True)
+
+
+def estimate_text_height(binary):
+    """
+    이진 이미지(흰 바탕/검은 글자)에서 글자 높이(px) 추정
+    연결성분 높이의 중앙값 사용, 글자로 보기 어려운 성분은 제외
+    """
+    h, w = binary.shape[:2]
+    n, _, stats, _ = cv2.connectedComponentsWithStats(cv2.bitwise_not(binary), connectivity=8)
+    if n <= 1:
+        return None
+    heights = stats[1:, cv2.CC_STAT_HEIGHT]
+    widths = stats[1:, cv2.CC_STAT_WIDTH]
+    areas = stats[1:, cv2.CC_STAT_AREA]
+    keep = (heights >= 3) & (heights < h * 0.5) & (widths < w * 0.5) & (areas >= 6)
+    if not keep.any():
+        return None
+    return float(np.median(heights[keep]))
+
+
+class TextHeightResize(Stage):
+    # 글자 높이를 target_px 에 맞추는 배율로 확대/축소 (출력 최대 크기 제한 포함)
+    kind = "resize"
+
+    def __init__(self, target_px=32, scale_range=(0.5, 3.0), max_side=4000, fallback_scale=3):
+        self.target_px = target_px
+        self.scale_range = tuple(scale_range)
+        self.max_side = max_side
+        self.fallback_scale = fallback_scale
+
+    def choose_scale(self, binary):
+        text_h = estimate_text_height(binary)
+        if text_h is None:
+            scale = self.fallback_scale
+        else:
+            lo, hi = self.scale_range
+            scale = min(max(self.target_px / text_h, lo), hi)
+        return min(scale, self.max_side / max(binary.shape[:2]))
+
+    def __call__(self, src, dst=None):
+        scale = self.choose_scale(src)
+        if abs(scale - 1) <= 0.05:
+            return src
+        return _resize(src, scale, dst)
+
+
+# =====================[ PIPELINE ]=====================
+class Pipeline:
+    """
+    선언형 전처리 파이프라인
+    - 중간 결과 버퍼를 스레드별로 보관해 다음 호출 때 dst= 로 재사용
+    - 마지막 단계 결과만 새로 할당해서 반환 (호출 측이 안전하게 보관 가능)
+    - run_many(images): 여러 장을 스레드 풀로 처리 (OpenCV 는 GIL 을 풀어줌)
+    - 단계별 소요 시간은 stage.kind 이름으로 common.metrics 에 기록
+    """
+
+    def __init__(self, stages):
+        self.stages = list(stages)
+        self._local = threading.local()
+
+    def describe(self):
+        return [s.describe() for s in self.stages]
+
+    def _buffers(self):
+        bufs = getattr(self._local, "bufs", None)
+        if bufs is None:
+            bufs = self._local.bufs = [None] * len(self.stages)
+        return bufs
+
+    def run(self, img):
+        bufs = self._buffers()
+        out = img
+        last = len(self.stages) - 1
+        for i, stage in enumerate(self.stages):
+            src = out
+            dst = None if i == last or bufs[i] is src else bufs[i]
+            start = time.perf_counter()
+            out = stage(src, dst)
+            record(stage.kind, time.perf_counter() - start)
+            if i != last and out is not src:
+                bufs[i] = out
+        # 마지막 단계가 아무 것도 안 하고 중간 버퍼를 돌려준 경우 → 복사해서 반환
+        if any(out is b for b in bufs) or (out is img and self.stages):
+            out = out.copy()
+        return out
+
+    def run_many(self, images, workers=None):
+        images = list(images)
+        if len(images) <= 1:
+            return [self.run(img) for img in images]
+        workers = workers or min(len(images), os.cpu_count() or 2)
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            return list(ex.map(self.run, images))
@@ -0,0 +1,97 @@
+import os
+import time
+import logging
+import threading
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+# =====================[ REGISTRY ]=====================
+# 요청마다 새로 만들 필요 없는 객체(CLAHE, 커널, 폰트 …)를 프로세스당 한 번만 생성
+# thread_local=True: 스레드 안전하지 않은 객체 → 스레드마다 하나씩
+_shared = {}
+_shared_lock = threading.Lock()
+_local = threading.local()
+
+
+def get_resource(key, factory, thread_local=False):
+    if thread_local:
+        cache = getattr(_local, "cache", None)
+        if cache is None:
+            cache = _local.cache = {}
+        if key not in cache:
+            cache[key] = factory()
+        return cache[key]
+
+    value = _shared.get(key)
+    if value is None:
+        with _shared_lock:
+            value = _shared.get(key)
+            if value is None:
+                value = _shared[key] = factory()
+    return value
+
+
+def get_kernel(shape, ksize):
+    # 구조 요소는 읽기 전용으로 공유
+    def build():
+        kernel = cv2.getStructuringElement(shape, tuple(ksize))
+        kernel.setflags(write=False)
+        return kernel
+    return get_resource(("kernel", shape, tuple(ksize)), build)
+
+
+def get_clahe(clip_limit, tile_grid):
+    # CLAHE 객체는 내부 버퍼를 가져서 스레드마다 하나씩
+    return get_resource(
+        ("clahe", clip_limit, tuple(tile_grid)),
+        lambda: cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=tuple(tile_grid)),
+        thread_local=True,
+    )
+
+
+def get_font(path, size):
+    # FreeType 폰트 로딩은 느리고 객체가 스레드 안전하지 않음 → 스레드별 캐시, 실패 시 기본 폰트
+    from PIL import ImageFont
+
+    def build():
+        try:
+            return ImageFont.truetype(path, size)
+        except OSError:
+            pass
+        try:
+            return ImageFont.load_default(size)
+        except TypeError:
+            # Pillow 10.1 미만은 크기 지정 불가
+            return ImageFont.load_default()
+    return get_resource(("font", path, size), build, thread_local=True)
+
+
+# =====================[ WARM-UP ]=====================
+_warmups = []
+
+
+def register_warmup(name, fn):
+    # 앱 시작 시 더미 입력으로 한 번 실행할 함수 등록
+    _warmups.append((name, fn))
+
+
+def warm_up():
+    """
+    등록된 파이프라인을 더미 이미지로 한 번씩 실행 → 첫 요청의 초기화/할당 비용 제거
+    WARMUP=0 이면 건너뜀. 반환: {이름: 소요 ms}
+    """
+    timings = {}
+    if os.getenv("WARMUP", "1") == "0":
+        return timings
+    for name, fn in _warmups:
+        start = time.perf_counter()
+        try:
+            fn()
+        except Exception as e:
+            logger.warning(f"warm-up 실패 ({name}): {e}")
+            continue
+        timings[name] = round((time.perf_counter() - start) * 1000, 1)
+    logger.info(f"warm-up 완료: {timings}")
+    return timings
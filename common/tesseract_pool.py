@@ -0,0 +1,163 @@
+import os
+import time
+import atexit
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+from PIL import Image
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+try:
+    import pytesseract
+except ImportError:
+    pytesseract = None
+
+logger = logging.getLogger(__name__)
+
+TESSERACT_WORKERS = int(os.getenv("TESSERACT_WORKERS", str(os.cpu_count() or 2)))
+# recognize() 한 장 기다리는 최대 시간 (초, 0 이면 무제한)
+TESSERACT_TIMEOUT = float(os.getenv("TESSERACT_TIMEOUT", "60"))
+# 워커 시작 방식: 멀티스레드인 Flask 앱에서 fork 하면 잠긴 락/스레드 상태가 복사됨 → forkserver (없으면 spawn)
+TESSERACT_START_METHOD = os.getenv(
+    "TESSERACT_START_METHOD",
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn",
+)
+
+# =====================[ WORKER (자식 프로세스) ]=====================
+# 프로세스마다 한 번만 엔진 생성 → traineddata 도 한 번만 로드
+_api = None
+_lang = None
+_psm = None
+
+
+def _init_worker(lang, psm):
+    global _api, _lang, _psm
+    _lang, _psm = lang, psm
+    if tesserocr is not None:
+        _api = tesserocr.PyTessBaseAPI(lang=lang, psm=psm)
+
+
+def _recognize(img, preprocess=None):
+    # preprocess: 워커 안에서 먼저 적용할 함수 (디코딩/전처리까지 병렬화할 때 사용)
+    if preprocess is not None:
+        img = preprocess(img)
+    if isinstance(img, np.ndarray):
+        img = Image.fromarray(img)
+    try:
+        if _api is not None:
+            _api.SetImage(img)
+            return _api.GetUTF8Text()
+        # tesserocr 가 없으면 pytesseract (호출마다 프로세스 생성) 로 대체
+        return pytesseract.image_to_string(img, lang=_lang, config=f"--psm {_psm}")
+    except Exception as e:
+        # pytesseract 예외 일부는 pickle 이 안 돼서 풀이 깨짐 → 단순 예외로 변환
+        raise RuntimeError(f"{type(e).__name__}: {e}")
+
+
+def _recognize_timed(img, preprocess=None):
+    # (텍스트, 워커 안에서 걸린 시간(초)) 반환
+    start = time.perf_counter()
+    text = _recognize(img, preprocess)
+    return text, time.perf_counter() - start
+
+
+def available():
+    return tesserocr is not None or pytesseract is not None
+
+
+# =====================[ POOL ]=====================
+class TesseractPool:
+    """
+    언어 데이터를 미리 올려둔 장기 실행 OCR 워커 프로세스 풀
+    - recognize(img): 한 장
+    - recognize_many(images): 여러 장 병렬 처리, 입력 순서대로 결과 반환
+    - submit(img): Future 반환 (스트리밍 처리용)
+    워커가 죽어서(OOM 등) 풀이 깨지면 그때 처리 중이던 작업만 실패하고, 다음 제출 때 풀을 새로 만듦
+    """
+
+    def __init__(self, lang="kor", psm=3, size=TESSERACT_WORKERS):
+        if not available():
+            raise RuntimeError("tesserocr 또는 pytesseract 가 필요합니다.")
+        if tesserocr is None:
+            logger.warning("tesserocr 가 없어 pytesseract 사용 → 호출마다 tesseract 프로세스를 새로 띄움")
+        self.lang = lang
+        self.psm = psm
+        self.size = size
+        self._lock = threading.Lock()
+        self._executor = self._new_executor()
+
+    def _new_executor(self):
+        return ProcessPoolExecutor(
+            max_workers=self.size,
+            mp_context=multiprocessing.get_context(TESSERACT_START_METHOD),
+            initializer=_init_worker,
+            initargs=(self.lang, self.psm),
+        )
+
+    def _submit(self, fn, *args):
+        executor = self._executor
+        try:
+            return executor.submit(fn, *args)
+        except BrokenProcessPool:
+            with self._lock:
+                # 다른 스레드가 이미 새로 만들었으면 그대로 사용
+                if self._executor is executor:
+                    logger.warning(f"Tesseract 워커 풀이 깨져서 다시 만듭니다 ({self.lang}, psm {self.psm})")
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    self._executor = self._new_executor()
+                executor = self._executor
+            return executor.submit(fn, *args)
+
+    def recognize(self, img, timeout=TESSERACT_TIMEOUT):
+        # timeout 초가 지나면 TimeoutError (이미 시작한 워커 작업은 끝까지 실행됨)
+        future = self._submit(_recognize, img)
+        try:
+            return future.result(timeout=timeout or None)
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+
+    def recognize_many(self, images, preprocess=None, timeout=TESSERACT_TIMEOUT):
+        # timeout: 전체가 아니라 한 장당 기준
+        futures = [self._submit(_recognize, img, preprocess) for img in images]
+        deadline = time.monotonic() + timeout * len(futures) if timeout else None
+        try:
+            return [f.result(timeout=max(0.0, deadline - time.monotonic()) if deadline else None) for f in futures]
+        except FutureTimeoutError:
+            for f in futures:
+                f.cancel()
+            raise
+
+    def submit(self, img, preprocess=None, timed=False):
+        fn = _recognize_timed if timed else _recognize
+        return self._submit(fn, img, preprocess)
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(lang="kor", psm=3, size=TESSERACT_WORKERS):
+    # (언어, psm) 조합별로 프로세스 풀 하나만 공유
+    with _pools_lock:
+        key = (lang, psm)
+        if key not in _pools:
+            _pools[key] = TesseractPool(lang=lang, psm=psm, size=size)
+        return _pools[key]
+
+
+@atexit.register
+def _shutdown_pools():
+    for pool in _pools.values():
+        pool.close()
@@ -0,0 +1,198 @@
+import io
+import os
+import hashlib
+import tempfile
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# 업로드 공용 처리
+# - 청크 단위로 읽으면서 SHA-256 계산 + 크기 제한 (초과 즉시 중단)
+# - 헤더만 읽어 픽셀 수 확인 → 디코딩 전에 압축 폭탄 차단
+# - 내용 해시 이름으로 저장 (같은 파일은 한 번만 저장, 같은 이름 동시 업로드도 충돌 없음)
+# - 디코딩한 ndarray 를 그대로 분석 함수에 전달
+# - 영상 등 큰 파일은 store_file: 메모리에 올리지 않고 디스크로 바로 씀
+
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(16 * 1024 * 1024)))
+UPLOAD_MAX_PIXELS = int(os.getenv("UPLOAD_MAX_PIXELS", "40000000"))
+CHUNK_SIZE = 64 * 1024
+
+# PIL 형식 이름 → 저장 확장자
+_FORMAT_EXTS = {"JPEG": ".jpg", "PNG": ".png", "BMP": ".bmp", "WEBP": ".webp", "TIFF": ".tif", "GIF": ".gif"}
+
+
+class UploadError(ValueError):
+    status = 400
+
+
+class UploadTooLarge(UploadError):
+    status = 413
+
+
+class Upload:
+    """
+    저장된 업로드 1건
+    filename: 저장 이름 (<해시>.<확장자>), original: 클라이언트가 보낸 이름
+    image(): 최초 호출 때만 디코딩하고 이후엔 같은 ndarray 반환 (store_file 로 저장한 건 data 가 None)
+    """
+
+    def __init__(self, digest, filename, path, data, original=None, duplicate=False):
+        self.digest = digest
+        self.filename = filename
+        self.path = path
+        self.data = data
+        self.original = original
+        self.duplicate = duplicate
+        self._image = None
+
+    def image(self):
+        if self._image is None:
+            self._image = decode(self.data)
+        return self._image
+
+
+def read_stream(stream, max_bytes=UPLOAD_MAX_BYTES):
+    # 청크 단위로 읽으며 해시 계산, 제한을 넘으면 나머지는 읽지 않고 중단
+    sha = hashlib.sha256()
+    buf = bytearray()
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        if len(buf) + len(chunk) > max_bytes:
+            raise UploadTooLarge(f"파일이 너무 큽니다. (최대 {max_bytes // (1024 * 1024)}MB)")
+        sha.update(chunk)
+        buf += chunk
+    if not buf:
+        raise UploadError("빈 파일입니다.")
+    return bytes(buf), sha.hexdigest()
+
+
+def probe(data, max_pixels=UPLOAD_MAX_PIXELS):
+    # 헤더만 읽어서 (형식, 가로, 세로) 확인 — 픽셀 데이터는 디코딩하지 않음
+    try:
+        with Image.open(io.BytesIO(data)) as im:
+            fmt, (w, h) = im.format, im.size
+    except Image.DecompressionBombError:
+        raise UploadTooLarge("이미지 해상도가 너무 큽니다.")
+    except Exception:
+        raise UploadError("이미지 파일이 아닙니다.")
+    if w * h > max_pixels:
+        raise UploadTooLarge(f"이미지 해상도가 너무 큽니다. ({w}x{h}, 최대 {max_pixels} 픽셀)")
+    return fmt, w, h
+
+
+def decode(data, flags=cv2.IMREAD_COLOR, max_pixels=UPLOAD_MAX_PIXELS):
+    probe(data, max_pixels)
+    img = cv2.imdecode(np.frombuffer(data, np.uint8), flags)
+    if img is None:
+        raise UploadError("이미지를 디코딩할 수 없습니다.")
+    return img
+
+
+def _write_once(path, data):
+    # 같은 해시 파일이 이미 있으면 그대로 사용, 없으면 임시 파일에 쓰고 교체 (동시 업로드에도 안전)
+    if os.path.exists(path):
+        return True
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return False
+
+
+def store_upload(file, folder, max_bytes=UPLOAD_MAX_BYTES, max_pixels=UPLOAD_MAX_PIXELS):
+    """
+    werkzeug FileStorage → 검증 후 <sha256 앞 32자>.<확장자> 로 저장 → Upload
+    실패 시 UploadError (status: 400 / 413)
+    """
+    data, digest = read_stream(file.stream, max_bytes)
+    fmt = probe(data, max_pixels)[0]
+    ext = _FORMAT_EXTS.get(fmt) or os.path.splitext(file.filename or "")[1].lower() or ".img"
+    filename = digest[:32] + ext
+    path = os.path.join(folder, filename)
+    duplicate = _write_once(path, data)
+    return Upload(digest, filename, path, data, original=file.filename, duplicate=duplicate)
+
+
+def store_file(file, folder, max_bytes=UPLOAD_MAX_BYTES):
+    """
+    werkzeug FileStorage → 청크 단위로 임시 파일에 쓰며 해시 계산 → <sha256 앞 32자>.<원본 확장자> → Upload
+    영상 등 큰 파일용: 메모리에 올리지 않고 이미지 검사/디코딩도 없음 (data 는 None)
+    실패 시 UploadError (status: 400 / 413)
+    """
+    sha = hashlib.sha256()
+    size = 0
+    fd, tmp = tempfile.mkstemp(dir=folder, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = file.stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"파일이 너무 큽니다. (최대 {max_bytes // (1024 * 1024)}MB)")
+                sha.update(chunk)
+                out.write(chunk)
+        if not size:
+            raise UploadError("빈 파일입니다.")
+        digest = sha.hexdigest()
+        filename = digest[:32] + (os.path.splitext(file.filename or "")[1].lower() or ".bin")
+        path = os.path.join(folder, filename)
+        # 같은 해시 파일이 이미 있으면 그대로 사용
+        duplicate = os.path.exists(path)
+        if duplicate:
+            os.unlink(tmp)
+        else:
+            os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return Upload(digest, filename, path, None, original=file.filename, duplicate=duplicate)
+
+
+def load_upload(folder, filename, max_bytes=UPLOAD_MAX_BYTES):
+    # 저장된 업로드 다시 읽기 (없으면 None)
+    path = os.path.join(folder, filename or "")
+    if not filename or not os.path.isfile(path):
+        return None
+    with open(path, "rb") as f:
+        data, digest = read_stream(f, max_bytes)
+    return Upload(digest, filename, path, data)
+
+
+def install_limits(app, max_bytes=UPLOAD_MAX_BYTES, route_limits=None):
+    """
+    요청 본문 자체를 제한 (multipart 헤더 여유분 포함), 초과 시 JSON 413
+    route_limits: {endpoint: 본문 최대 바이트} — 여러 파일을 한 번에 받는 라우트용
+    (파일 하나당 상한은 store_upload 가 그대로 적용)
+    """
+    from flask import jsonify, request
+
+    app.config["MAX_CONTENT_LENGTH"] = max_bytes + 64 * 1024
+    limits = {endpoint: limit + 64 * 1024 for endpoint, limit in (route_limits or {}).items()}
+
+    if limits:
+        class LimitedRequest(app.request_class):
+            # 본문은 라우트 매칭 후 처음 읽을 때 파싱 → 그때 endpoint 별 상한 적용
+            @property
+            def max_content_length(self):
+                if self.url_rule is not None and self.endpoint in limits:
+                    return limits[self.endpoint]
+                return super().max_content_length
+
+        app.request_class = LimitedRequest
+
+    @app.errorhandler(413)
+    def too_large(e):
+        limit = (request.max_content_length or app.config["MAX_CONTENT_LENGTH"]) - 64 * 1024
+        return jsonify({"ok": False, "error": f"파일이 너무 큽니다. (최대 {limit // (1024 * 1024)}MB)"}), 413
+
+    return app
@@ -0,0 +1,95 @@
+import os
+import sys
+import math
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common.resources import get_font, get_resource
+
+# 결과 이미지 표시: BGR 배열에 직접 그리고 JPEG 한 번만 인코딩 (RGB 변환/PIL 복사/PIL 저장 없음)
+# 위상 이름은 고정 어휘 → 글자 모양을 크기별로 한 번만 렌더링해 두고 알파 합성
+
+FONT_PATH = "/usr/share/fonts/truetype/nanum/NanumGothic.ttf"
+RESULT_QUALITY = int(os.getenv("MOON_RESULT_QUALITY", "85"))
+PREVIEW_MAX_SIDE = int(os.getenv("MOON_PREVIEW_MAX_SIDE", "1280"))
+
+# 글자 크기를 이 단위로 맞춤 → 사진 폭마다 새 글리프를 만들지 않음
+FONT_SIZE_STEP = 8
+
+
+def label_size(width):
+    return max(24, int(width * 0.045)) // FONT_SIZE_STEP * FONT_SIZE_STEP
+
+
+def glyph(text, size, font_path=FONT_PATH):
+    """
+    text 를 흰 글씨 알파 마스크(uint8, 높이 = 폰트 ascent + descent)로 렌더링 → 크기별로 한 번만, 읽기 전용 공유
+    높이가 같아서 여러 조각을 옆으로 붙이면 기준선이 맞음
+    """
+    def render():
+        font = get_font(font_path, size)
+        try:
+            ascent, descent = font.getmetrics()
+        except AttributeError:
+            ascent, descent = font.getbbox("Ag")[3], 0
+        width = max(1, math.ceil(font.getlength(text)))
+        canvas = Image.new("L", (width, ascent + descent), 0)
+        ImageDraw.Draw(canvas).text((0, 0), text, font=font, fill=255)
+        mask = np.asarray(canvas).copy()
+        mask.setflags(write=False)
+        return mask
+    return get_resource(("moon.glyph", font_path, size, text), render)
+
+
+def label_parts(phase, shape_ratio):
+    # "상현달 (48.0%)" → ["상현달", " ", "(", "4", "8", ".", "0", "%", ")"]  (위상 이름 + 글자 단위 숫자)
+    return [phase, *f" ({shape_ratio * 100:.1f}%)"]
+
+
+def draw_label(img, parts, org, size, color=(255, 255, 255)):
+    """
+    img(BGR) 의 org 위치에 글리프들을 이어 붙여 그대로 합성 (라벨 영역만 계산, 전체 복사 없음)
+    반환: 그린 영역 (x0, y0, x1, y1)
+    """
+    mask = np.hstack([glyph(p, size) for p in parts])
+    x, y = org
+    h = min(mask.shape[0], img.shape[0] - y)
+    w = min(mask.shape[1], img.shape[1] - x)
+    if h <= 0 or w <= 0:
+        return x, y, x, y
+    alpha = mask[:h, :w, None].astype(np.uint16)
+    roi = img[y:y + h, x:x + w]
+    roi[:] = (roi * (255 - alpha) + np.array(color, np.uint16) * alpha + 127) // 255
+    return x, y, x + w, y + h
+
+
+def shrink(img, max_side):
+    # 미리보기용: 정수 배율 INTER_AREA 축소 → (축소본, factor)
+    h, w = img.shape[:2]
+    factor = -(-max(h, w) // max_side) if max_side else 1
+    if factor <= 1:
+        return img, 1
+    return cv2.resize(img, (max(1, w // factor), max(1, h // factor)), interpolation=cv2.INTER_AREA), factor
+
+
+def encode_jpeg(img, quality=RESULT_QUALITY):
+    ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("결과 이미지 인코딩에 실패했습니다.")
+    return buf.tobytes()
+
+
+def render_result(img, contour, phase, shape_ratio, preview=False, quality=RESULT_QUALITY):
+    """
+    윤곽 + 위상 라벨을 그려 JPEG 바이트로 (img 를 직접 수정, preview 면 축소본에 그림)
+    반환: (jpeg bytes, 그린 이미지, 라벨 영역)
+    """
+    if preview:
+        img, factor = shrink(img, PREVIEW_MAX_SIDE)
+        contour = contour // factor
+    cv2.drawContours(img, [contour], -1, (0, 210, 255), max(2, img.shape[1] // 400))
+    box = draw_label(img, label_parts(phase, shape_ratio), (25, 25), label_size(img.shape[1]))
+    return encode_jpeg(img, quality), img, box
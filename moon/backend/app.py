@@ -1,15 +1,35 @@
 import os
+import sys
+import time
 import cv2
 import numpy as np
-import pytesseract
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory
 from flask_cors import CORS
-from PIL import Image, ImageDraw, ImageFont
 import re
-import math
+import hashlib
+import threading
+from collections import OrderedDict
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common.tesseract_pool import get_pool
+from common.resources import register_warmup, warm_up
+from common.preprocess import load_image
+from common.uploads import UploadError, store_upload, store_file, install_limits
+from common import metrics
+from common.metrics import stage, record
+
+from measure import PHASES, measure_moon
+from annotate import PREVIEW_MAX_SIDE, glyph, label_parts, label_size, render_result
+from timelapse import iter_frames, track, summarize, csv_lines
+
+# 타임랩스 영상 한 개 / 요청 본문 전체(영상 또는 연속 사진) 상한 — 사진 한 장은 UPLOAD_MAX_BYTES 그대로
+TIMELAPSE_VIDEO_MAX_BYTES = int(os.getenv("MOON_VIDEO_MAX_BYTES", str(512 * 1024 * 1024)))
+TIMELAPSE_MAX_BYTES = int(os.getenv("MOON_TIMELAPSE_MAX_BYTES", str(1024 * 1024 * 1024)))
 
 app = Flask(__name__)
 CORS(app)
+metrics.install(app)
+install_limits(app, route_limits={"analyze_timelapse": TIMELAPSE_MAX_BYTES})
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 UPLOAD_FOLDER = os.path.join(BASE_DIR, "uploads")
@@ -17,95 +37,114 @@ RESULT_FOLDER = os.path.join(BASE_DIR, "results")
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(RESULT_FOLDER, exist_ok=True)
 
+# 결과 이미지에 쓴 라벨을 다시 읽는 OCR: 요청에 ocr=1 일 때만, 라벨 영역만 잘라 백그라운드로
+# 결과는 업로드 해시별로 보관 → GET /ocr/<해시> 로 조회
+OCR_CACHE_SIZE = int(os.getenv("MOON_OCR_CACHE_SIZE", "256"))
+_ocr_results = OrderedDict()
+_ocr_lock = threading.Lock()
+
+# 타임랩스 한 요청에서 측정할 최대 프레임 수 (step 으로 건너뛴 뒤 기준)
+TIMELAPSE_MAX_FRAMES = int(os.getenv("MOON_TIMELAPSE_MAX_FRAMES", "2000"))
+
 
-def analyze_moon(image_path):
-    img = cv2.imread(image_path)
-    if img is None:
-        raise ValueError("이미지를 불러오지 못했습니다.")
-
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    gray = cv2.GaussianBlur(gray, (5, 5), 0)
-
-    # ✅ 달 세그멘테이션 (이진화)
-    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-    contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    if not contours:
-        raise ValueError("달 윤곽을 찾지 못했습니다.")
-    moon_contour = max(contours, key=cv2.contourArea)
-
-    # ✅ 밝기 (참고용)
-    mask = np.zeros_like(gray)
-    cv2.drawContours(mask, [moon_contour], -1, 255, -1)
-    moon_brightness = cv2.mean(gray, mask=mask)[0]
-    bright_ratio = round((moon_brightness / 255) * 100, 2)
-
-    # ✅ 좌우 비율 계산
-    x, y, w, h = cv2.boundingRect(moon_contour)
-    moon_crop = mask[y:y+h, x:x+w]
-    total_area = np.count_nonzero(moon_crop)
-    left_area = np.count_nonzero(moon_crop[:, :w//2])
-    right_area = np.count_nonzero(moon_crop[:, w//2:])
-    left_ratio = left_area / total_area
-    right_ratio = right_area / total_area
-
-    # ✅ 방향 판별
-    if right_ratio > left_ratio:
-        direction = "오른쪽이 밝음 → 초승/상현"
-        side = "right"
-    else:
-        direction = "왼쪽이 밝음 → 하현/그믐"
-        side = "left"
-
-    # ✅ 형태 분석 (채워진 비율)
-    (cx, cy), radius = cv2.minEnclosingCircle(moon_contour)
-    circle_area = math.pi * (radius ** 2)
-    moon_area = cv2.contourArea(moon_contour)
-    fill_ratio = round(moon_area / circle_area, 2)
-
-    # ✅ 둥근 정도
-    x, y, w_box, h_box = cv2.boundingRect(moon_contour)
-    aspect_ratio = w_box / h_box if h_box != 0 else 1
-    roundness = 1 - abs(1 - aspect_ratio)
-    roundness = max(0, min(roundness, 1))
-
-    # ✅ 최적 조합 공식
-    shape_ratio = round(fill_ratio * 0.7 + roundness * 0.3, 2)
-
-    # ✅ 위상 분류
-    if shape_ratio < 0.1:
-        phase = "암달"
-    elif shape_ratio < 0.3:
-        phase = "초승달" if side == "right" else "그믐달"
-    elif shape_ratio < 0.7:
-        phase = "상현달" if side == "right" else "하현달"
-    elif shape_ratio < 0.95:
-        phase = "상현과 보름 사이" if side == "right" else "보름과 하현 사이"
-    else:
-        phase = "보름달"
-
-    # ✅ 이미지에 텍스트 표시
-    pil_img = Image.fromarray(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
-    draw = ImageDraw.Draw(pil_img)
-    font_size = max(24, int(img.shape[1] * 0.045))
+def _ocr_done(key, future):
     try:
-        font = ImageFont.truetype("/usr/share/fonts/truetype/nanum/NanumGothic.ttf", font_size)
-    except:
-        font = ImageFont.load_default()
-    draw.text((25, 25), f"{phase} ({shape_ratio * 100:.1f}%)", font=font, fill=(255, 255, 255))
+        raw, seconds = future.result()
+        record("ocr.local", seconds)
+        update = {"status": "done", "text": re.sub(r"[^가-힣\s]", "", raw).strip()}
+    except Exception as e:
+        update = {"status": "failed", "error": str(e)}
+    with _ocr_lock:
+        if key in _ocr_results:
+            _ocr_results[key].update(update)
 
-    # ✅ 결과 이미지 저장
-    result_filename = f"result_{os.path.basename(image_path)}"
-    result_path = os.path.join(RESULT_FOLDER, result_filename)
-    pil_img.save(result_path)
 
-    # ✅ OCR
+def request_label_ocr(key, crop):
+    """
+    라벨 영역 OCR 을 Tesseract 워커 풀에 넘기고 바로 반환 (이미지 해시별 한 번, 실패한 것만 재시도)
+    반환: 현재 상태 {"status": pending|done|failed, "text": ...}
+    """
+    with _ocr_lock:
+        entry = _ocr_results.get(key)
+        if entry is not None and entry["status"] != "failed":
+            _ocr_results.move_to_end(key)
+            return dict(entry)
+        entry = _ocr_results[key] = {"status": "pending", "text": ""}
+        while len(_ocr_results) > OCR_CACHE_SIZE:
+            _ocr_results.popitem(last=False)
     try:
-        ocr_raw = pytesseract.image_to_string(pil_img, lang="kor+eng")
-        ocr_text = re.sub(r"[^가-힣\s]", "", ocr_raw).strip()
-    except:
-        ocr_text = ""
+        # 한 줄짜리 라벨 → psm 7 (단일 텍스트 줄)
+        future = get_pool(lang="kor+eng", psm=7).submit(crop, timed=True)
+    except Exception as e:
+        with _ocr_lock:
+            entry.update(status="failed", error=str(e))
+            return dict(entry)
+    future.add_done_callback(lambda f: _ocr_done(key, f))
+    return dict(entry)
+
+
+def get_label_ocr(key):
+    with _ocr_lock:
+        entry = _ocr_results.get(key)
+        return dict(entry) if entry is not None else None
+
+
+def analyze_moon(image, name=None, ocr_key=None, preview=False):
+    """
+    image: 경로 또는 디코딩된 BGR ndarray (배열이면 그 위에 바로 그림), name: 결과 파일 이름에 쓸 원본 이름
+    (배열인데 name 이 없으면 픽셀 내용 해시 앞 32자)
+    ocr_key: 주면 결과 이미지의 라벨 영역 OCR 을 백그라운드로 요청 (이미지 해시)
+    preview: 원본 대신 긴 변 MOON_PREVIEW_MAX_SIDE 축소본으로 결과 이미지 저장
+    반환: (bright_ratio, shape_ratio, direction, phase, ocr 상태 또는 None, result_filename)
+    """
+    with stage("decode"):
+        img = load_image(image)
+        # 그리기 전에 결과 파일 이름 결정 (배열은 그 위에 그리므로 해시는 먼저)
+        if name is None and not isinstance(image, str):
+            name = hashlib.sha256(np.ascontiguousarray(img)).hexdigest()[:32]
+        stem = os.path.splitext(name or os.path.basename(image))[0]
+
+    with stage("measure"):
+        bright_ratio, shape_ratio, direction, phase, contour = measure_moon(img)
+
+    # ✅ 윤곽 + 라벨 표시 → JPEG 한 번 인코딩
+    with stage("annotate"):
+        data, drawn, (x0, y0, x1, y1) = render_result(img, contour, phase, shape_ratio, preview=preview)
+
+    # ✅ 결과 이미지 저장
+    result_filename = f"result_{stem}{'_preview' if preview else ''}.jpg"
+    with stage("persist"):
+        with open(os.path.join(RESULT_FOLDER, result_filename), "wb") as f:
+            f.write(data)
+
+    # ✅ OCR (선택): 라벨을 쓴 영역만 여백을 두고 잘라서
+    ocr = None
+    if ocr_key is not None:
+        pad = max(8, (y1 - y0) // 4)
+        crop = drawn[max(0, y0 - pad):y1 + pad, max(0, x0 - pad):x1 + pad]
+        ocr = request_label_ocr(ocr_key, cv2.cvtColor(crop, cv2.COLOR_BGR2RGB))
+
+    return bright_ratio, shape_ratio, direction, phase, ocr, result_filename
+
 
-    return bright_ratio, shape_ratio, direction, phase, ocr_text, result_filename
+def _warmup():
+    # 어두운 배경 + 밝은 원 → 세그멘테이션 경로 한 번 실행
+    # 위상 이름/숫자 글리프는 자주 쓰는 폭(미리보기, 3000/4000px 휴대폰 사진)에 맞춰 미리 렌더링
+    img = np.zeros((480, 640, 3), np.uint8)
+    cv2.circle(img, (320, 240), 150, (230, 230, 230), -1)
+    measure_moon(img)
+    for width in (img.shape[1], PREVIEW_MAX_SIDE, 3000, 4000):
+        size = label_size(width)
+        for phase in PHASES:
+            glyph(phase, size)
+        for part in label_parts("", 0.0) + list("123456789"):
+            glyph(part, size)
+
+
+register_warmup("moon.measure", _warmup)
+# python app.py 로 실행하면 Tesseract 워커(forkserver/spawn)가 이 파일을 __mp_main__ 으로 다시 import → 워커에서는 예열 생략
+if __name__ != "__mp_main__":
+    warm_up()
 
 
 @app.route("/analyze", methods=["POST"])
@@ -117,22 +156,98 @@ def analyze():
     if file.filename == "":
         return jsonify({"error": "파일 이름이 비어있습니다."}), 400
 
-    save_path = os.path.join(UPLOAD_FOLDER, file.filename)
-    file.save(save_path)
+    # 내용 해시 이름으로 저장 (같은 이름 동시 업로드도 덮어쓰지 않음) + 디코딩한 배열을 바로 분석
+    try:
+        with stage("upload"):
+            upload = store_upload(file, UPLOAD_FOLDER)
+            img = upload.image()
+    except UploadError as e:
+        return jsonify({"error": str(e)}), e.status
 
+    # ocr=1 이면 라벨 OCR 을 백그라운드로 시작 (응답은 측정이 끝나는 대로), preview=1 이면 축소 결과 이미지
+    ocr_key = upload.digest if request.values.get("ocr") == "1" else None
+    preview = request.values.get("preview") == "1"
     try:
-        bright_ratio, shape_ratio, direction, phase, ocr_text, result_filename = analyze_moon(save_path)
-        return jsonify({
-            "bright_ratio": bright_ratio,
-            "shape_ratio": shape_ratio,
-            "direction": direction,
-            "phase": phase,
-            "ocr_text": ocr_text,
-            "result_image": f"results/{result_filename}"
-        })
+        bright_ratio, shape_ratio, direction, phase, ocr, result_filename = analyze_moon(
+            img, upload.filename, ocr_key, preview
+        )
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+    data = {
+        "bright_ratio": bright_ratio,
+        "shape_ratio": shape_ratio,
+        "direction": direction,
+        "phase": phase,
+        "ocr_text": ocr["text"] if ocr else "",
+        "result_image": f"results/{result_filename}"
+    }
+    if ocr is not None:
+        data["ocr"] = dict(ocr, url=f"/ocr/{ocr_key}")
+    return jsonify(data)
+
+
+@app.route("/analyze/timelapse", methods=["POST"])
+def analyze_timelapse():
+    """
+    타임랩스 영상(file) 또는 연속 사진(files, 원본 이름 순) → 프레임별 위상 시계열
+    step / fps / max_frames / roi=0 / format=json|csv (csv 는 측정하는 대로 한 줄씩 전송)
+    """
+    video = request.files.get("file")
+    images = [f for f in request.files.getlist("files") if f.filename]
+    if not images and (video is None or video.filename == ""):
+        return jsonify({"error": "파일이 없습니다."}), 400
+    try:
+        step = max(1, int(request.values.get("step", 1)))
+        fps = float(request.values["fps"]) if request.values.get("fps") else None
+        max_frames = min(int(request.values.get("max_frames", TIMELAPSE_MAX_FRAMES)), TIMELAPSE_MAX_FRAMES)
+    except ValueError:
+        return jsonify({"error": "step/fps/max_frames 는 숫자여야 합니다."}), 400
+
+    try:
+        with stage("upload"):
+            if images:
+                # 경로만 남김 (사진 바이트는 저장 후 바로 해제)
+                uploads = ((f.filename, store_upload(f, UPLOAD_FOLDER).path) for f in images)
+                source = [path for _, path in sorted(uploads)]
+            else:
+                # 영상은 메모리에 올리지 않고 디스크로 바로
+                source = store_file(video, UPLOAD_FOLDER, max_bytes=TIMELAPSE_VIDEO_MAX_BYTES).path
+    except UploadError as e:
+        return jsonify({"error": str(e)}), e.status
+
+    # 첫 프레임을 먼저 읽어 열 수 없는 파일은 스트림 시작 전에 400
+    frames = iter_frames(source, step, fps, max_frames)
+    try:
+        first = next(frames, None)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if first is None:
+        return jsonify({"error": "프레임이 없습니다."}), 400
+
+    def all_frames():
+        yield first
+        yield from frames
+
+    start = time.perf_counter()
+    rows = track(all_frames(), use_roi=request.values.get("roi") != "0")
+    if request.values.get("format") == "csv":
+        return Response(csv_lines(rows), mimetype="text/csv", headers={"Cache-Control": "no-cache"})
+
+    try:
+        rows = list(rows)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"frames": rows, "summary": summarize(rows, time.perf_counter() - start)})
+
+
+@app.route("/ocr/<key>")
+def ocr_result(key):
+    entry = get_label_ocr(key)
+    if entry is None:
+        return jsonify({"error": "OCR 요청 기록이 없습니다."}), 404
+    return jsonify(entry)
+
 
 @app.route("/results/<path:filename>")
 def serve_result_image(filename):
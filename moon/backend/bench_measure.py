@@ -0,0 +1,102 @@
+import os
+import glob
+import time
+import argparse
+
+import cv2
+import numpy as np
+
+from measure import ANALYSIS_MAX_SIDE, measure_moon
+
+# 달 측정: 원본 해상도 vs 축소본(MOON_ANALYSIS_MAX_SIDE) 지연 시간 / 위상 판정 일치율
+#   python bench_measure.py --size 4000x3000 --max-side 1024
+# 표본: uploads/ 사진 (작은 사진은 --size 로 확대) + 위상별 합성 달 사진
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def synth_moon(size, lit, side, rng, center=None, radius=None):
+    # lit: 빛나는 비율 0~1 (0.5 = 반달), side: "right" | "left", center/radius 없으면 무작위
+    w, h = size
+    img = np.zeros((h, w), np.uint8)
+    r = radius or int(min(w, h) * rng.uniform(0.2, 0.35))
+    cx, cy = center or (int(w / 2 + rng.uniform(-0.1, 0.1) * w), int(h / 2 + rng.uniform(-0.1, 0.1) * h))
+
+    # 밝은 반원 + 명암 경계 타원 (초승/그믐은 빼고, 볼록달은 더함)
+    start = -90 if side == "right" else 90
+    cv2.ellipse(img, (cx, cy), (r, r), 0, start, start + 180, 210, -1)
+    minor = int(abs(1 - 2 * lit) * r)
+    cv2.ellipse(img, (cx, cy), (minor, r), 0, 0, 360, 210 if lit > 0.5 else 0, -1)
+
+    # 표면 얼룩 + 하늘 잡음 + 렌즈 흐림
+    blotch = cv2.resize(rng.integers(0, 60, (12, 12), dtype=np.uint8), (w, h), interpolation=cv2.INTER_CUBIC)
+    img = cv2.subtract(img, cv2.bitwise_and(blotch, blotch, mask=(img > 0).astype(np.uint8)))
+    img = cv2.add(img, rng.integers(0, 25, img.shape, dtype=np.uint8))
+    img = cv2.GaussianBlur(img, (0, 0), max(1.0, min(w, h) / 800))
+    return cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+
+
+def load_samples(size, count, seed):
+    w, h = size
+    samples = []
+    for path in sorted(glob.glob(os.path.join(BASE_DIR, "uploads", "*"))):
+        img = cv2.imread(path)
+        if img is None:
+            continue
+        if max(img.shape[:2]) < max(w, h) // 2:
+            img = cv2.resize(img, (w, int(w * img.shape[0] / img.shape[1])), interpolation=cv2.INTER_CUBIC)
+        samples.append((os.path.basename(path), img))
+
+    rng = np.random.default_rng(seed)
+    for lit in np.linspace(0.04, 0.98, count):
+        for side in ("right", "left"):
+            samples.append((f"synth {lit:.2f} {side}", synth_moon(size, lit, side, rng)))
+    return samples
+
+
+def timed(fn, repeat):
+    result = fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return result, (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="달 측정 축소본 벤치마크")
+    parser.add_argument("--size", default="4000x3000", help="합성 사진/확대 크기 WxH")
+    parser.add_argument("--max-side", type=int, default=ANALYSIS_MAX_SIDE or 1024)
+    parser.add_argument("--phases", type=int, default=12, help="합성 위상 개수 (방향별)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--show", action="store_true", help="표본별 결과 출력")
+    args = parser.parse_args()
+
+    size = tuple(int(v) for v in args.size.lower().split("x"))
+    samples = load_samples(size, args.phases, seed=0)
+
+    full_ms = proxy_ms = 0.0
+    agree = 0
+    shape_diffs, bright_diffs = [], []
+    for name, img in samples:
+        full, t_full = timed(lambda: measure_moon(img, max_side=0), args.repeat)
+        proxy, t_proxy = timed(lambda: measure_moon(img, max_side=args.max_side), args.repeat)
+        full_ms += t_full
+        proxy_ms += t_proxy
+        agree += full[3] == proxy[3]
+        shape_diffs.append(abs(full[1] - proxy[1]))
+        bright_diffs.append(abs(full[0] - proxy[0]))
+        if args.show or full[3] != proxy[3]:
+            mark = "" if full[3] == proxy[3] else "  ← 불일치"
+            print(f"{name:24} {img.shape[1]}x{img.shape[0]}  {t_full:7.1f}ms {full[3]}({full[1]})"
+                  f"  →  {t_proxy:6.1f}ms {proxy[3]}({proxy[1]}){mark}")
+
+    n = len(samples)
+    print(f"표본 {n}개, 축소 기준 긴 변 {args.max_side}px")
+    print(f"원본   : {full_ms / n:8.1f} ms/장")
+    print(f"축소본 : {proxy_ms / n:8.1f} ms/장  ({full_ms / proxy_ms:.1f}x)")
+    print(f"위상 일치: {agree}/{n}, shape_ratio 차이 최대 {max(shape_diffs):.2f} (평균 {np.mean(shape_diffs):.3f}), "
+          f"bright_ratio 차이 최대 {max(bright_diffs):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import os
+import time
+import argparse
+import tempfile
+
+import cv2
+import numpy as np
+
+from bench_measure import synth_moon
+from timelapse import TIMELAPSE_WORKERS, iter_frames, track
+
+# 타임랩스 추적 처리량 (프레임/초): 디코딩만 / 전체 프레임 측정 / ROI 재사용, 워커 1 vs N
+#   python bench_timelapse.py --size 1920x1080 --frames 120 --workers 4
+# 합성 영상: 달이 화면을 천천히 가로지르며 초승 → 보름 → 그믐으로 변함 (MJPG .avi 임시 파일)
+
+
+def make_clip(path, size, frames, seed):
+    rng = np.random.default_rng(seed)
+    w, h = size
+    r = int(min(w, h) * 0.12)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 24, size)
+    for i in range(frames):
+        t = i / max(1, frames - 1)
+        lit = 1 - abs(1 - 2 * t) * 0.96
+        side = "right" if t < 0.5 else "left"
+        center = (int(w * (0.2 + 0.6 * t)), int(h * (0.6 - 0.2 * np.sin(np.pi * t))))
+        writer.write(synth_moon(size, lit, side, rng, center=center, radius=r))
+    writer.release()
+
+
+def run(path, workers, use_roi):
+    start = time.perf_counter()
+    rows = list(track(iter_frames(path), workers, use_roi))
+    return rows, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="타임랩스 달 추적 처리량 벤치마크")
+    parser.add_argument("--size", default="1920x1080")
+    parser.add_argument("--frames", type=int, default=120)
+    parser.add_argument("--workers", type=int, default=max(2, TIMELAPSE_WORKERS))
+    parser.add_argument("--clip", help="합성 영상 대신 사용할 영상 파일")
+    args = parser.parse_args()
+
+    size = tuple(int(v) for v in args.size.lower().split("x"))
+    path = args.clip
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="moon_bench_"), "clip.avi")
+        make_clip(path, size, args.frames, seed=0)
+
+    start = time.perf_counter()
+    n = sum(1 for _ in iter_frames(path))
+    decode_s = time.perf_counter() - start
+    print(f"프레임 {n}개 ({args.size}), 디코딩만 {n / decode_s:6.1f} fps")
+
+    baseline = None
+    for workers in (1, args.workers):
+        for use_roi in (False, True):
+            rows, elapsed = run(path, workers, use_roi)
+            if baseline is None:
+                baseline = rows
+            agree = sum(a.get("phase") == b.get("phase") for a, b in zip(rows, baseline))
+            diff = max(abs((a.get("shape_ratio") or 0) - (b.get("shape_ratio") or 0)) for a, b in zip(rows, baseline))
+            roi_frames = sum(1 for r in rows if r.get("roi"))
+            print(f"워커 {workers:2d}  ROI {'on ' if use_roi else 'off'}  {n / elapsed:6.1f} fps  "
+                  f"ROI 사용 {roi_frames:4d}/{n}  위상 일치 {agree}/{n}  shape_ratio 차이 최대 {diff:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import os
+import math
+
+import cv2
+import numpy as np
+
+# 달 세그멘테이션 + 위상 측정 (사진 한 장 /analyze, 타임랩스 프레임 공용)
+
+# measure_moon 이 돌려주는 위상 이름 (고정 어휘 → 결과 라벨 글리프 미리 렌더링)
+PHASES = ("암달", "초승달", "그믐달", "상현달", "하현달", "상현과 보름 사이", "보름과 하현 사이", "보름달")
+
+# 세그멘테이션/형태 측정은 긴 변이 이 크기 이하인 축소본에서 (0 이면 원본 그대로)
+# fill_ratio/roundness/좌우 비율은 크기와 무관 → 12MP 사진도 측정 비용이 일정
+ANALYSIS_MAX_SIDE = int(os.getenv("MOON_ANALYSIS_MAX_SIDE", "1024"))
+
+
+def proxy_factor(shape, max_side=ANALYSIS_MAX_SIDE):
+    # (h, w) 이미지의 축소 배율 (정수, 1 이면 축소 없음)
+    return max(1, -(-max(shape[:2]) // max_side)) if max_side else 1
+
+
+def analysis_proxy(img, max_side=ANALYSIS_MAX_SIDE):
+    """
+    측정용 흑백 축소본 → (gray, factor), 원본 좌표 = 축소본 좌표 * factor
+    흑백 변환 후 정수 배율 INTER_AREA (OpenCV 빠른 경로, 컬러/임의 배율 축소보다 3~6배 빠름)
+    """
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    h, w = gray.shape
+    factor = proxy_factor(gray.shape, max_side)
+    if factor <= 1:
+        return gray, 1
+    return cv2.resize(gray, (max(1, w // factor), max(1, h // factor)), interpolation=cv2.INTER_AREA), factor
+
+
+def measure_moon(img, max_side=ANALYSIS_MAX_SIDE):
+    """
+    달 세그멘테이션 + 밝기/형태/방향 측정 (긴 변 max_side 이하 축소본에서)
+    반환: (bright_ratio, shape_ratio, direction, phase, contour) — contour 는 원본 해상도 좌표
+    """
+    gray, factor = analysis_proxy(img, max_side)
+    gray = cv2.GaussianBlur(gray, (5, 5), 0)
+
+    # ✅ 달 세그멘테이션 (이진화)
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        raise ValueError("달 윤곽을 찾지 못했습니다.")
+    moon_contour = max(contours, key=cv2.contourArea)
+
+    # ✅ 밝기 (참고용)
+    mask = np.zeros_like(gray)
+    cv2.drawContours(mask, [moon_contour], -1, 255, -1)
+    moon_brightness = cv2.mean(gray, mask=mask)[0]
+    bright_ratio = round((moon_brightness / 255) * 100, 2)
+
+    # ✅ 좌우 비율 계산
+    x, y, w, h = cv2.boundingRect(moon_contour)
+    moon_crop = mask[y:y+h, x:x+w]
+    total_area = np.count_nonzero(moon_crop)
+    left_area = np.count_nonzero(moon_crop[:, :w//2])
+    right_area = np.count_nonzero(moon_crop[:, w//2:])
+    left_ratio = left_area / total_area
+    right_ratio = right_area / total_area
+
+    # ✅ 방향 판별
+    if right_ratio > left_ratio:
+        direction = "오른쪽이 밝음 → 초승/상현"
+        side = "right"
+    else:
+        direction = "왼쪽이 밝음 → 하현/그믐"
+        side = "left"
+
+    # ✅ 형태 분석 (채워진 비율)
+    (cx, cy), radius = cv2.minEnclosingCircle(moon_contour)
+    circle_area = math.pi * (radius ** 2)
+    moon_area = cv2.contourArea(moon_contour)
+    fill_ratio = round(moon_area / circle_area, 2)
+
+    # ✅ 둥근 정도
+    x, y, w_box, h_box = cv2.boundingRect(moon_contour)
+    aspect_ratio = w_box / h_box if h_box != 0 else 1
+    roundness = 1 - abs(1 - aspect_ratio)
+    roundness = max(0, min(roundness, 1))
+
+    # ✅ 최적 조합 공식
+    shape_ratio = round(fill_ratio * 0.7 + roundness * 0.3, 2)
+
+    # ✅ 위상 분류
+    if shape_ratio < 0.1:
+        phase = "암달"
+    elif shape_ratio < 0.3:
+        phase = "초승달" if side == "right" else "그믐달"
+    elif shape_ratio < 0.7:
+        phase = "상현달" if side == "right" else "하현달"
+    elif shape_ratio < 0.95:
+        phase = "상현과 보름 사이" if side == "right" else "보름과 하현 사이"
+    else:
+        phase = "보름달"
+
+    # 표시용 윤곽만 원본 해상도로 되돌림
+    if factor != 1:
+        moon_contour = moon_contour * factor + factor // 2
+
+    return bright_ratio, shape_ratio, direction, phase, moon_contour
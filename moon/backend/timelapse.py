@@ -0,0 +1,200 @@
+import os
+import io
+import sys
+import csv
+import glob
+import json
+import time
+import argparse
+import threading
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+from measure import measure_moon, proxy_factor
+
+# 타임랩스 영상 / 연속 사진의 프레임별 달 위상 추적
+#   python timelapse.py clip.mp4 --format csv --out series.csv
+#   python timelapse.py frames/ --fps 0.1 --format json
+# - 프레임은 읽는 대로 워커 풀에 넘기고 (동시 처리 수 제한 → 메모리 일정), 결과는 프레임 순서대로
+# - 직전에 끝난 프레임의 윤곽 주변(ROI)만 측정 → 달이 ROI 가장자리에 걸리거나 못 찾으면 전체 프레임으로
+
+TIMELAPSE_WORKERS = int(os.getenv("MOON_TIMELAPSE_WORKERS", str(os.cpu_count() or 2)))
+# ROI 여유: 직전 윤곽 크기 대비 사방으로 이 비율만큼 넓힘
+ROI_MARGIN = float(os.getenv("MOON_ROI_MARGIN", "0.5"))
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp")
+FIELDS = ("frame", "time", "phase", "shape_ratio", "bright_ratio", "direction", "roi", "error")
+
+
+def iter_frames(source, step=1, fps=None, max_frames=None):
+    """
+    source: 영상 경로 / 이미지 폴더 / 이미지 경로 목록 (목록은 주어진 순서, 폴더는 이름 순)
+    (프레임 번호, 시각(초), BGR 프레임) 을 순서대로 — step 마다 하나, 건너뛰는 프레임은 grab 만
+    fps: 시각 계산용 (영상은 없으면 파일 정보, 연속 사진은 없으면 1)
+    """
+    if isinstance(source, (list, tuple)) or os.path.isdir(source):
+        paths = source if isinstance(source, (list, tuple)) else sorted(
+            p for p in glob.glob(os.path.join(source, "*")) if p.lower().endswith(IMAGE_EXTS)
+        )
+        for n, index in enumerate(range(0, len(paths), step)):
+            if max_frames is not None and n >= max_frames:
+                return
+            frame = cv2.imread(paths[index])
+            if frame is None:
+                raise ValueError(f"이미지를 읽을 수 없습니다: {os.path.basename(paths[index])}")
+            yield index, round(index / (fps or 1), 3), frame
+        return
+
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        raise ValueError("영상을 열 수 없습니다.")
+    rate = fps or cap.get(cv2.CAP_PROP_FPS) or 1
+    index = emitted = 0
+    try:
+        while max_frames is None or emitted < max_frames:
+            if index % step:
+                if not cap.grab():
+                    break
+                index += 1
+                continue
+            ok, frame = cap.read()
+            if not ok:
+                break
+            yield index, round(index / rate, 3), frame
+            index += 1
+            emitted += 1
+    finally:
+        cap.release()
+
+
+def roi_box(contour, shape, margin=ROI_MARGIN):
+    # 윤곽 외접 사각형을 사방으로 margin 배 넓힌 (x0, y0, x1, y1), 프레임 안으로 자름
+    x, y, w, h = cv2.boundingRect(contour)
+    pad = int(max(w, h) * margin) + 2
+    return max(0, x - pad), max(0, y - pad), min(shape[1], x + w + pad), min(shape[0], y + h + pad)
+
+
+def _inside(contour, box, shape):
+    # ROI 경계(프레임 경계 제외)에 닿지 않았는지 → 닿았으면 달이 ROI 밖으로 이어짐
+    # 판정은 실제로 측정한 축소본 좌표로 (원본 좌표는 factor//2 만큼 밀려 왼쪽/위 경계에 닿아도 0 이 아님)
+    x0, y0, x1, y1 = box
+    factor = proxy_factor((y1 - y0, x1 - x0))
+    x, y, w, h = cv2.boundingRect((contour - factor // 2) // factor)
+    return ((x > 0 or x0 == 0) and (y > 0 or y0 == 0)
+            and (x + w < (x1 - x0) // factor or x1 == shape[1])
+            and (y + h < (y1 - y0) // factor or y1 == shape[0]))
+
+
+def measure_frame(frame, roi=None):
+    """
+    한 프레임 측정 → (row dict, 원본 좌표 윤곽 또는 None)
+    roi 가 있으면 그 영역만 먼저 측정하고, 실패하거나 달이 잘리면 전체 프레임으로
+    """
+    if roi is not None:
+        x0, y0, x1, y1 = roi
+        try:
+            bright_ratio, shape_ratio, direction, phase, contour = measure_moon(frame[y0:y1, x0:x1])
+            if _inside(contour, roi, frame.shape):
+                row = {"phase": phase, "shape_ratio": shape_ratio, "bright_ratio": bright_ratio,
+                       "direction": direction, "roi": True}
+                return row, contour + (x0, y0)
+        except ValueError:
+            pass
+    try:
+        bright_ratio, shape_ratio, direction, phase, contour = measure_moon(frame)
+    except ValueError as e:
+        return {"roi": False, "error": str(e)}, None
+    return {"phase": phase, "shape_ratio": shape_ratio, "bright_ratio": bright_ratio,
+            "direction": direction, "roi": False}, contour
+
+
+def track(frames, workers=TIMELAPSE_WORKERS, use_roi=True):
+    """
+    iter_frames 결과를 워커 풀에서 측정 → 프레임 순서대로 row dict 를 하나씩 반환
+    동시에 처리 중인 프레임은 workers * 2 개까지 (디코딩이 앞서 나가 메모리를 쌓지 않음)
+    ROI 는 제출 시점까지 끝난 프레임 중 가장 최근 것의 윤곽 기준
+    """
+    latest = {"frame": -1, "contour": None}
+    lock = threading.Lock()
+
+    def run(index, t, frame, roi):
+        row, contour = measure_frame(frame, roi)
+        if contour is not None:
+            with lock:
+                if index > latest["frame"]:
+                    latest.update(frame=index, contour=contour)
+        return dict(row, frame=index, time=t)
+
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="timelapse") as pool:
+        for index, t, frame in frames:
+            with lock:
+                contour = latest["contour"]
+            roi = roi_box(contour, frame.shape) if use_roi and contour is not None else None
+            pending.append(pool.submit(run, index, t, frame, roi))
+            while pending and (len(pending) >= workers * 2 or pending[0].done()):
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def summarize(rows, elapsed):
+    measured = [r for r in rows if not r.get("error")]
+    return {
+        "frames": len(rows),
+        "measured": len(measured),
+        "roi_frames": sum(1 for r in rows if r.get("roi")),
+        "phases": dict(Counter(r["phase"] for r in measured)),
+        "elapsed_s": round(elapsed, 3),
+        "fps": round(len(rows) / elapsed, 2) if elapsed else None,
+    }
+
+
+def csv_lines(rows):
+    # row 를 CSV 한 줄씩 (헤더 먼저) → 스트리밍 응답/파일 쓰기 공용
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="타임랩스 달 위상 추적")
+    parser.add_argument("source", help="영상 파일 또는 이미지 폴더")
+    parser.add_argument("--format", choices=["csv", "json"], default="csv")
+    parser.add_argument("--out", help="결과 파일 (없으면 표준 출력)")
+    parser.add_argument("--step", type=int, default=1, help="N 프레임마다 하나씩")
+    parser.add_argument("--fps", type=float, help="시각 계산용 초당 프레임 (연속 사진은 기본 1)")
+    parser.add_argument("--max-frames", type=int)
+    parser.add_argument("--workers", type=int, default=TIMELAPSE_WORKERS)
+    parser.add_argument("--no-roi", action="store_true", help="매 프레임 전체 영역 측정")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    frames = iter_frames(args.source, max(1, args.step), args.fps, args.max_frames)
+    rows = track(frames, args.workers, use_roi=not args.no_roi)
+
+    out = open(args.out, "w", encoding="utf-8", newline="") if args.out else None
+    try:
+        if args.format == "csv":
+            for line in csv_lines(rows):
+                (out or sys.stdout).write(line)
+        else:
+            rows = list(rows)
+            data = {"frames": rows, "summary": summarize(rows, time.perf_counter() - start)}
+            json.dump(data, out or sys.stdout, ensure_ascii=False, indent=2)
+    finally:
+        if out:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
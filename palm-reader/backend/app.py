@@ -3,10 +3,23 @@ from flask_cors import CORS
 import cv2
 import numpy as np
 import os
-import math
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common.preprocess import load_image
+from common.resources import get_clahe, get_kernel, register_warmup, warm_up
+from common.uploads import UploadError, store_upload, install_limits
+from common import metrics
+from common.metrics import stage
+from presets import get_preset, odd, working_image
+from utils.preprocess import preprocess_image
+from utils.detect_lines import extract_palm_lines
+from utils.analysis import measure_length, measure_curvature, generate_fortune_from_features
 
 app = Flask(__name__)
 CORS(app)
+metrics.install(app)
+install_limits(app)
 
 UPLOAD_FOLDER = "uploads"
 RESULT_FOLDER = "results"
@@ -16,66 +29,169 @@ os.makedirs(RESULT_FOLDER, exist_ok=True)
 # ==========================================
 # 손금(긴 주요 선 여러 개) 검출
 # ==========================================
-def extract_major_lines(img_path):
-    img = cv2.imread(img_path)
-    orig = img.copy()
+# 기준 해상도(손 크기 REFERENCE_HAND_SIDE) 파라미터 → 작업 해상도에서는 scale 배
+BLUR_SIZE = 7
+BLACKHAT_SIZE = 15
+THRESH_BLOCK = 41
+# 7x7 닫힘 7회 = 43x43 한 번 (사각형 커널 팽창/침식은 연속 적용 = 커널 크기 합, 결과 동일)
+CLOSE_SIZE = 43
+HOUGH_THRESHOLD = 80
+HOUGH_MIN_LENGTH = 150
+HOUGH_MAX_GAP = 50
+
+
+def edge_map(img, scale=1.0):
+    # 1~5단계: 손금을 강조한 이진 영상의 Canny 엣지 (커널/블록 크기는 scale 배)
+    # img: BGR 또는 이미 밝기 채널만 뽑은 gray (작업 해상도 축소본)
 
     # 1️⃣ YCbCr 변환 + CLAHE 대비 강화
-    ycbcr = cv2.cvtColor(img, cv2.COLOR_BGR2YCrCb)
-    Y, Cr, Cb = cv2.split(ycbcr)
-    clahe = cv2.createCLAHE(clipLimit=3.5, tileGridSize=(8,8))
-    y_eq = clahe.apply(Y)
+    with stage("contrast"):
+        if img.ndim == 3:
+            Y = cv2.extractChannel(cv2.cvtColor(img, cv2.COLOR_BGR2YCrCb), 0)
+        else:
+            Y = img
+        y_eq = get_clahe(3.5, (8, 8)).apply(Y)
 
     # 2️⃣ 블러 + Black-hat (어두운 손금 강조)
-    blur = cv2.GaussianBlur(y_eq, (7, 7), 0)
-    kernel_bh = cv2.getStructuringElement(cv2.MORPH_RECT, (15, 15))
-    blackhat = cv2.morphologyEx(blur, cv2.MORPH_BLACKHAT, kernel_bh)
+    with stage("denoise"):
+        k = odd(BLUR_SIZE, scale, 3)
+        blur = cv2.GaussianBlur(y_eq, (k, k), 0)
+        k = odd(BLACKHAT_SIZE, scale, 3)
+        kernel_bh = get_kernel(cv2.MORPH_RECT, (k, k))
+        blackhat = cv2.morphologyEx(blur, cv2.MORPH_BLACKHAT, kernel_bh)
 
     # 3️⃣ Adaptive Threshold (손금 반전)
-    thresh = cv2.adaptiveThreshold(
-        blackhat, 255,
-        cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV,
-        41, 7
-    )
+    with stage("threshold"):
+        thresh = cv2.adaptiveThreshold(
+            blackhat, 255,
+            cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV,
+            odd(THRESH_BLOCK, scale, 3), 7
+        )
 
     # 4️⃣ Morphological Closing (끊긴 선 연결)
-    kernel_close = cv2.getStructuringElement(cv2.MORPH_RECT, (7, 7))
-    morph = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel_close, iterations=7)
+    with stage("morphology"):
+        k = odd(CLOSE_SIZE, scale, 3)
+        kernel_close = get_kernel(cv2.MORPH_RECT, (k, k))
+        morph = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel_close)
 
     # 5️⃣ Canny 엣지 검출
-    edges = cv2.Canny(morph, 40, 120)
+    with stage("lines"):
+        return cv2.Canny(morph, 40, 120)
+
+
+def filter_major_lines(lines, height, min_angle=20, max_angle=80, min_y_ratio=0.3):
+    """
+    HoughLinesP 결과 전체를 배열 연산으로 한 번에 거름 → (M, 4) int32 [x1, y1, x2, y2]
+    - 세로 + 약간 기울어진 선 (생명선, 두뇌선, 감정선 등): min_angle < |각도| < max_angle
+    - 두 끝점 모두 손목 쪽 (위에서 min_y_ratio 아래)
+    OpenCV 버전에 따라 (N, 1, 4) / (N, 4) 로 나오므로 (N, 4) 로 맞춤
+    """
+    if lines is None:
+        return np.empty((0, 4), np.int32)
+    segs = lines.reshape(-1, 4)
+    angle = np.abs(np.degrees(np.arctan2(segs[:, 3] - segs[:, 1], segs[:, 2] - segs[:, 0])))
+    min_y = height * min_y_ratio
+    keep = (angle > min_angle) & (angle < max_angle) & (segs[:, 1] > min_y) & (segs[:, 3] > min_y)
+    return segs[keep].astype(np.int32)
+
+
+def draw_segments(mask, segs, color=255, thickness=2):
+    # 선분 전체를 polylines 한 번으로 (각 선분 = 점 2개짜리 열린 폴리라인, cv2.line 과 같은 픽셀)
+    if len(segs):
+        cv2.polylines(mask, segs.reshape(-1, 2, 2), False, color, thickness)
+    return mask
+
+
+def major_line_mask(img, preset=None):
+    """
+    img(BGR) 의 주요 손금 마스크 (원본 크기 uint8)
+    preset 의 작업 해상도에서 검출하고 선분만 원본 좌표로 되돌려 원본 크기로 그림
+    """
+    _, params = get_preset(preset)
+    with stage("scale"):
+        work, factor, scale = working_image(img, params["hand_side"])
+
+    edges = edge_map(work, scale)
 
     # 6️⃣ 확률적 허프 변환 (직선 검출)
-    lines = cv2.HoughLinesP(
-        edges,
-        rho=1,
-        theta=np.pi/180,
-        threshold=80,
-        minLineLength=150,
-        maxLineGap=50
-    )
-
-    mask = np.zeros_like(Y)
-
-    # 7️⃣ 검출된 선 모두 그리기 (조건 만족 시)
-    if lines is not None:
-        for line in lines:
-            x1, y1, x2, y2 = line[0]
-            angle = math.degrees(math.atan2(y2 - y1, x2 - x1))
-
-            # 세로 + 약간 기울어진 선 (생명선, 두뇌선, 감정선 등)
-            if 20 < abs(angle) < 80:
-                if y1 > img.shape[0] * 0.3 and y2 > img.shape[0] * 0.3:  # 손목 이상
-                    cv2.line(mask, (x1, y1), (x2, y2), 255, 2)
-
-    # 8️⃣ 스무딩 + 컬러 오버레이
-    mask = cv2.GaussianBlur(mask, (5, 5), 0)
-    color_mask = cv2.applyColorMap(mask, cv2.COLORMAP_HOT)
-    overlay = cv2.addWeighted(orig, 0.85, color_mask, 0.8, 0)
+    with stage("lines"):
+        lines = cv2.HoughLinesP(
+            edges,
+            rho=1,
+            theta=np.pi/180,
+            threshold=max(10, round(HOUGH_THRESHOLD * scale)),
+            minLineLength=HOUGH_MIN_LENGTH * scale,
+            maxLineGap=HOUGH_MAX_GAP * scale
+        )
+
+    # 7️⃣ 조건을 만족하는 선 모두 그리기
+    with stage("draw"):
+        segs = filter_major_lines(lines, work.shape[0])
+        if factor > 1:
+            segs = segs * factor + factor // 2
+        return draw_segments(np.zeros(img.shape[:2], np.uint8), segs)
+
+
+def extract_major_lines(image, preset=None):
+    # image: 경로 또는 디코딩된 BGR ndarray
+    with stage("decode"):
+        img = load_image(image)
+    orig = img.copy()
+
+    mask = major_line_mask(img, preset)
+
+    with stage("draw"):
+        # 8️⃣ 스무딩 + 컬러 오버레이
+        mask = cv2.GaussianBlur(mask, (5, 5), 0)
+        color_mask = cv2.applyColorMap(mask, cv2.COLORMAP_HOT)
+        overlay = cv2.addWeighted(orig, 0.85, color_mask, 0.8, 0)
 
     return overlay
 
 
+# ==========================================
+# 스켈레톤 기반 손금 (?mode=skeleton): 선 4개 폴리라인 + 길이/곡률 + 운세 문장
+# ==========================================
+MODES = ("lines", "skeleton")
+LINE_COLORS = {"life": (0, 0, 255), "head": (0, 200, 255), "heart": (255, 0, 200), "fate": (0, 255, 0)}
+
+
+def analyze_skeleton(image):
+    """
+    반환: (결과 이미지, {이름: {length, curvature, points}}, 운세 문장)
+    길이/곡률은 전처리 해상도 기준, points 는 원본 사진 좌표 [[x, y], ...] (선을 따라 순서대로)
+    """
+    with stage("decode"):
+        img = load_image(image)
+    binary = preprocess_image(img)
+
+    with stage("skeleton"):
+        _, lines = extract_palm_lines(binary)
+
+    with stage("analysis"):
+        features = {
+            name: {"length": round(measure_length(pts), 1), "curvature": round(measure_curvature(pts), 4)}
+            for name, pts in lines.items()
+        }
+        fortune = generate_fortune_from_features(features)
+
+    # 작은 사진은 전처리에서 키워지므로 좌표를 원본 크기로 되돌림
+    with stage("draw"):
+        ratio = np.array([img.shape[1] / binary.shape[1], img.shape[0] / binary.shape[0]])
+        overlay = img.copy()
+        thickness = max(2, img.shape[1] // 300)
+        for name, pts in lines.items():
+            xy = np.round(pts * ratio).astype(np.int32)
+            cv2.polylines(overlay, [xy.reshape(-1, 1, 2)], False, LINE_COLORS[name], thickness)
+            features[name]["points"] = xy.tolist()
+
+    return overlay, features, fortune
+
+
+register_warmup("palm.major_lines", lambda: extract_major_lines(np.full((480, 640, 3), 160, np.uint8)))
+warm_up()
+
+
 # ==========================================
 # Flask API
 # ==========================================
@@ -88,15 +204,47 @@ def analyze():
     if file.filename == "":
         return jsonify({"error": "파일명이 비어 있습니다."}), 400
 
-    img_path = os.path.join(UPLOAD_FOLDER, file.filename)
-    file.save(img_path)
+    # ?mode=lines(기본)|skeleton, ?preset=original|balanced|fast (lines 전용, 없으면 PALM_PRESET)
+    mode = request.args.get("mode", "lines")
+    if mode not in MODES:
+        return jsonify({"error": f"알 수 없는 mode 입니다: {mode} (가능: {', '.join(MODES)})"}), 400
+    try:
+        preset, _ = get_preset(request.args.get("preset"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # 내용 해시 이름으로 저장 (같은 이름 동시 업로드도 덮어쓰지 않음) + 디코딩한 배열을 바로 분석
+    try:
+        with stage("upload"):
+            upload = store_upload(file, UPLOAD_FOLDER)
+            img = upload.image()
+    except UploadError as e:
+        return jsonify({"error": str(e)}), e.status
+
+    stem, ext = os.path.splitext(upload.filename)
+    if mode == "skeleton":
+        result_img, features, fortune = analyze_skeleton(img)
+        result_path = os.path.join(RESULT_FOLDER, f"result_{stem}_skeleton{ext}")
+        with stage("persist"):
+            cv2.imwrite(result_path, result_img)
+        return jsonify({
+            "message": "손금 분석 완료",
+            "mode": mode,
+            "lines": features,
+            "fortune": fortune,
+            "result_image": f"/result/{os.path.basename(result_path)}"
+        })
 
-    result_img = extract_major_lines(img_path)
-    result_path = os.path.join(RESULT_FOLDER, f"result_{file.filename}")
-    cv2.imwrite(result_path, result_img)
+    result_img = extract_major_lines(img, preset)
+    suffix = "" if preset == "original" else f"_{preset}"
+    result_path = os.path.join(RESULT_FOLDER, f"result_{stem}{suffix}{ext}")
+    with stage("persist"):
+        cv2.imwrite(result_path, result_img)
 
     return jsonify({
         "message": "손금 주요 선 검출 완료",
+        "mode": mode,
+        "preset": preset,
         "result_image": f"/result/{os.path.basename(result_path)}"
     })
 
@@ -0,0 +1,80 @@
+import os
+import glob
+import math
+import time
+import argparse
+
+import cv2
+import numpy as np
+
+from app import edge_map, filter_major_lines, draw_segments
+
+# 허프 선분 거르기 + 그리기: 선분마다 파이썬 루프 vs 배열 연산 + polylines 한 번
+#   python bench_lines.py --repeat 50
+# 손 사진마다 엣지는 한 번만 구하고, 기본 임계값과 낮은 임계값(선분 수천 개)으로 각각 비교
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_IMAGES = [os.path.join(BASE_DIR, "uploads", "*"), os.path.join(BASE_DIR, "static", "uploads", "*")]
+
+HOUGH_SETTINGS = {
+    "기본": dict(threshold=80, minLineLength=150, maxLineGap=50),
+    "낮은 임계값": dict(threshold=20, minLineLength=20, maxLineGap=10),
+}
+
+
+def legacy_draw(lines, shape):
+    mask = np.zeros(shape[:2], np.uint8)
+    if lines is None:
+        return mask
+    for line in lines.reshape(-1, 1, 4):
+        x1, y1, x2, y2 = line[0]
+        angle = math.degrees(math.atan2(y2 - y1, x2 - x1))
+        if 20 < abs(angle) < 80:
+            if y1 > shape[0] * 0.3 and y2 > shape[0] * 0.3:
+                cv2.line(mask, (int(x1), int(y1)), (int(x2), int(y2)), 255, 2)
+    return mask
+
+
+def vector_draw(lines, shape):
+    return draw_segments(np.zeros(shape[:2], np.uint8), filter_major_lines(lines, shape[0]))
+
+
+def bench(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="손금 선분 거르기/그리기 마이크로 벤치마크")
+    parser.add_argument("--images", nargs="*", default=DEFAULT_IMAGES)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    paths = sorted({p for pattern in args.images for p in glob.glob(pattern)})
+    images = [(os.path.basename(p), cv2.imread(p)) for p in paths]
+    images = [(name, img) for name, img in images if img is not None]
+    if not images:
+        print("벤치마크할 손 사진이 없습니다.")
+        return
+
+    for label, params in HOUGH_SETTINGS.items():
+        print(f"[{label}] {params}")
+        total_old = total_new = 0.0
+        for name, img in images:
+            lines = cv2.HoughLinesP(edge_map(img), rho=1, theta=np.pi / 180, **params)
+            n = 0 if lines is None else len(lines)
+            old_ms = bench(lambda: legacy_draw(lines, img.shape), args.repeat)
+            new_ms = bench(lambda: vector_draw(lines, img.shape), args.repeat)
+            same = np.array_equal(legacy_draw(lines, img.shape), vector_draw(lines, img.shape))
+            total_old += old_ms
+            total_new += new_ms
+            print(f"  {name:40} 선분 {n:5d}  loop {old_ms:7.2f}ms  numpy {new_ms:6.2f}ms  "
+                  f"({old_ms / new_ms:4.1f}x)  마스크 동일: {same}")
+        print(f"  합계 loop {total_old:.2f}ms → numpy {total_new:.2f}ms ({total_old / total_new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import os
+import glob
+import time
+import argparse
+
+import cv2
+import numpy as np
+
+from app import major_line_mask, CLOSE_SIZE
+from presets import PRESETS, hand_region
+
+# 손금 검출 프리셋별 지연 시간 / original 결과와의 선 겹침
+#   python bench_morphology.py --repeat 3 --tolerance 6
+# 겹침: 선을 tolerance 픽셀까지 어긋나도 같은 선으로 보고
+#   precision = 프리셋 선 중 original 선 근처인 비율, recall = original 선 중 프리셋 선 근처인 비율
+# 손 안 비율: 선 픽셀 중 피부색 손 영역 안에 있는 비율 (original 자체가 배경 무늬를 잡는 경우 참고용)
+# 7x7 닫힘 7회 vs 43x43 한 번 (결과 동일 여부 + 시간) 도 함께
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_IMAGES = [os.path.join(BASE_DIR, "uploads", "*"), os.path.join(BASE_DIR, "static", "uploads", "*")]
+
+
+def timed(fn, repeat):
+    result = fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return result, (time.perf_counter() - start) * 1000 / repeat
+
+
+def overlap(reference, mask, tolerance):
+    # (precision, recall, f1) — 둘 다 비어 있으면 1
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (2 * tolerance + 1, 2 * tolerance + 1))
+    ref, got = reference > 0, mask > 0
+    if not ref.any() and not got.any():
+        return 1.0, 1.0, 1.0
+    precision = (got & (cv2.dilate(reference, kernel) > 0)).sum() / max(1, got.sum())
+    recall = (ref & (cv2.dilate(mask, kernel) > 0)).sum() / max(1, ref.sum())
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return precision, recall, f1
+
+
+def inside_hand(img, mask):
+    region = hand_region(img)
+    if region is None or not mask.any():
+        return float("nan")
+    hand = cv2.resize(region[0], (img.shape[1], img.shape[0]), interpolation=cv2.INTER_NEAREST)
+    return (mask[hand > 0] > 0).sum() / (mask > 0).sum()
+
+
+def bench_closing(img, repeat):
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    binary = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV, 41, 7)
+    small = cv2.getStructuringElement(cv2.MORPH_RECT, (7, 7))
+    large = cv2.getStructuringElement(cv2.MORPH_RECT, (CLOSE_SIZE, CLOSE_SIZE))
+    a, t_iter = timed(lambda: cv2.morphologyEx(binary, cv2.MORPH_CLOSE, small, iterations=7), repeat)
+    b, t_single = timed(lambda: cv2.morphologyEx(binary, cv2.MORPH_CLOSE, large), repeat)
+    print(f"닫힘 {binary.shape[1]}x{binary.shape[0]}: 7x7 x7회 {t_iter:.1f}ms, "
+          f"{CLOSE_SIZE}x{CLOSE_SIZE} 1회 {t_single:.1f}ms, 결과 동일: {np.array_equal(a, b)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="손금 검출 프리셋 벤치마크")
+    parser.add_argument("--images", nargs="*", default=DEFAULT_IMAGES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tolerance", type=int, default=6, help="같은 선으로 볼 어긋남 (원본 픽셀)")
+    args = parser.parse_args()
+
+    paths = sorted({p for pattern in args.images for p in glob.glob(pattern)})
+    images = [(os.path.basename(p), cv2.imread(p)) for p in paths]
+    images = [(name, img) for name, img in images if img is not None]
+    if not images:
+        print("벤치마크할 손 사진이 없습니다.")
+        return
+
+    bench_closing(images[0][1], args.repeat)
+
+    totals = {name: [0.0, [], []] for name in PRESETS}
+    for name, img in images:
+        print(f"\n{name} {img.shape[1]}x{img.shape[0]}")
+        reference = None
+        for preset in PRESETS:
+            mask, ms = timed(lambda: major_line_mask(img, preset), args.repeat)
+            if reference is None:
+                reference = mask
+            p, r, f1 = overlap(reference, mask, args.tolerance)
+            totals[preset][0] += ms
+            totals[preset][1].append(f1)
+            totals[preset][2].append(inside_hand(img, mask))
+            print(f"  {preset:9} {ms:7.1f}ms  선 픽셀 {int((mask > 0).sum()):7d}  "
+                  f"precision {p:.2f}  recall {r:.2f}  F1 {f1:.2f}  손 안 {totals[preset][2][-1]:.2f}")
+
+    print(f"\n평균 (사진 {len(images)}장, 허용 어긋남 {args.tolerance}px)")
+    base = totals[next(iter(PRESETS))][0]
+    for preset, (ms, f1s, inside) in totals.items():
+        print(f"  {preset:9} {ms / len(images):7.1f}ms/장 ({base / ms:.1f}x)  "
+              f"F1 {np.mean(f1s):.2f}  손 안 {np.nanmean(inside):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import os
+import glob
+import time
+import argparse
+
+import cv2
+import numpy as np
+from skimage.measure import label, regionprops
+
+from utils.preprocess import preprocess_image
+from utils.detect_lines import extract_palm_lines, _to_skeleton, MIN_AREA, LINE_NAMES
+from utils.analysis import measure_length, measure_curvature
+
+# 스켈레톤 손금 추출: 예전 방식 vs 지금 방식 (같은 전처리 결과 입력)
+#   python bench_skeleton.py --repeat 3
+# 예전: skimage label/regionprops, 성분마다 labels == lab 전체 마스크, 래스터 순서 "x,y" 문자열 → 다시 파싱
+# 지금: cv2 연결성분, argsort 한 번으로 성분별 좌표, 그래프 탐색 순서 (N, 2) 배열
+# 시각화 마스크(선택된 성분) 동일 여부와 선별 길이/곡률도 함께 출력
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_IMAGES = [os.path.join(BASE_DIR, "uploads", "*"), os.path.join(BASE_DIR, "static", "uploads", "*")]
+
+
+def legacy_extract(preprocessed_img, step=4):
+    skel = _to_skeleton(preprocessed_img)
+    hand_region = cv2.dilate(skel, np.ones((5, 5), np.uint8), iterations=2)
+    lbl = label(hand_region > 0)
+    if lbl.max():
+        largest = max(regionprops(lbl), key=lambda p: p.area)
+        hand_region = (lbl == largest.label).astype(np.uint8) * 255
+    skel = cv2.bitwise_and(skel, hand_region)
+
+    num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(skel, connectivity=8)
+    comps = []
+    for lab in range(1, num_labels):
+        area = stats[lab, cv2.CC_STAT_AREA]
+        if area < MIN_AREA:
+            continue
+        comp_mask = (labels == lab).astype(np.uint8) * 255
+        ys, xs = np.where(comp_mask > 0)
+        poly = " ".join(f"{int(x)},{int(y)}" for x, y in np.stack([xs, ys], axis=1)[::step])
+        comps.append((area, poly, comp_mask))
+    comps.sort(key=lambda x: x[0], reverse=True)
+    top = comps[:len(LINE_NAMES)]
+
+    vis = np.zeros_like(preprocessed_img)
+    for _, _, mask in top:
+        vis = cv2.bitwise_or(vis, mask)
+    return vis, {name: poly for name, (_, poly, _) in zip(LINE_NAMES, top)}
+
+
+def timed(fn, repeat):
+    result = fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return result, (time.perf_counter() - start) * 1000 / repeat
+
+
+def features(lines):
+    return {name: (measure_length(p), measure_curvature(p)) for name, p in lines.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="스켈레톤 손금 추출 벤치마크")
+    parser.add_argument("--images", nargs="*", default=DEFAULT_IMAGES)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    paths = sorted({p for pattern in args.images for p in glob.glob(pattern)})
+    images = [(os.path.basename(p), cv2.imread(p)) for p in paths]
+    images = [(name, img) for name, img in images if img is not None]
+    if not images:
+        print("벤치마크할 손 사진이 없습니다.")
+        return
+
+    total_old = total_new = 0.0
+    for name, img in images:
+        binary = preprocess_image(img)
+        (old_vis, old_lines), t_old = timed(lambda: legacy_extract(binary), args.repeat)
+        (new_vis, new_lines), t_new = timed(lambda: extract_palm_lines(binary), args.repeat)
+        old_f, t_old_f = timed(lambda: features(old_lines), args.repeat)
+        new_f, t_new_f = timed(lambda: features(new_lines), args.repeat)
+        total_old += t_old + t_old_f
+        total_new += t_new + t_new_f
+        print(f"{name} {binary.shape[1]}x{binary.shape[0]}  추출 {t_old:.0f}ms → {t_new:.0f}ms, "
+              f"길이/곡률 {t_old_f:.2f}ms → {t_new_f:.2f}ms, 마스크 동일: {np.array_equal(old_vis, new_vis)}")
+        for line in new_lines:
+            (ol, oc), (nl, nc) = old_f[line], new_f[line]
+            print(f"  {line:6} 길이 {ol:7.1f} → {nl:7.1f}  곡률 {oc:.4f} → {nc:.4f}")
+
+    print(f"합계 {total_old:.0f}ms → {total_new:.0f}ms ({total_old / total_new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import os
+
+import cv2
+import numpy as np
+
+# 손금 검출 파라미터 프리셋 (?preset= 또는 PALM_PRESET)
+# - original: 원본 해상도 그대로 (기존 결과와 같음)
+# - 그 외: 손 크기를 hand_side 픽셀 정도로 맞춘 작업 해상도에서 검출 → 선분만 원본 좌표로 되돌려 그림
+# 커널/블록/허프 길이는 손 크기 REFERENCE_HAND_SIDE 기준 값 → 작업 해상도의 손 크기에 비례해 조정
+
+# 기준 값들을 맞춘 손 크기 (4000x3000 사진에 손이 꽉 찬 경우의 긴 변)
+REFERENCE_HAND_SIDE = int(os.getenv("PALM_REFERENCE_HAND_SIDE", "4000"))
+
+PRESETS = {
+    "original": {"hand_side": 0},
+    "balanced": {"hand_side": 1600},
+    "fast": {"hand_side": 1000},
+}
+DEFAULT_PRESET = os.getenv("PALM_PRESET", "original")
+
+# 손 영역 추정용 썸네일 긴 변 / 피부색 범위 (YCrCb)
+THUMB_SIDE = 256
+SKIN_LOWER = (0, 133, 77)
+SKIN_UPPER = (255, 173, 127)
+
+
+def get_preset(name=None):
+    name = name or DEFAULT_PRESET
+    if name not in PRESETS:
+        raise ValueError(f"알 수 없는 preset 입니다: {name} (가능: {', '.join(PRESETS)})")
+    return name, PRESETS[name]
+
+
+def odd(value, scale=1.0, minimum=1):
+    # 기준 크기 value 를 scale 배 한 홀수 커널 크기 (scale 1 이면 value 그대로)
+    n = max(minimum, int(round(value * scale)))
+    return n if n % 2 else n + 1
+
+
+def hand_region(img):
+    """
+    피부색 최대 영역 → (썸네일 마스크 uint8, 표본 간격 f) / 못 찾으면 None
+    외접 사각형 정도만 필요 → INTER_AREA 축소 대신 f 픽셀 간격 표본 (12MP 기준 50ms → 1ms 미만)
+    """
+    h, w = img.shape[:2]
+    f = max(1, max(h, w) // THUMB_SIDE)
+    thumb = np.ascontiguousarray(img[::f, ::f])
+    skin = cv2.inRange(cv2.cvtColor(thumb, cv2.COLOR_BGR2YCrCb), SKIN_LOWER, SKIN_UPPER)
+    n, labels, stats, _ = cv2.connectedComponentsWithStats(skin)
+    if n < 2:
+        return None
+    i = 1 + int(np.argmax(stats[1:, cv2.CC_STAT_AREA]))
+    if stats[i, cv2.CC_STAT_AREA] < skin.size * 0.05:
+        return None
+    return (labels == i).astype(np.uint8) * 255, f
+
+
+def hand_extent(img):
+    # 손 영역 외접 사각형 긴 변 (원본 픽셀) → 못 찾으면 사진 긴 변
+    h, w = img.shape[:2]
+    region = hand_region(img)
+    if region is None:
+        return max(h, w)
+    mask, f = region
+    x, y, bw, bh = cv2.boundingRect(mask)
+    return min(max(h, w), max(bw, bh) * f)
+
+
+def working_image(img, hand_side):
+    """
+    손이 hand_side 픽셀 이상 남도록 정수 배율 INTER_AREA 축소 → (작업 이미지, factor, 파라미터 배율)
+    축소할 때는 밝기(gray)만 → 검출은 Y 채널만 쓰고, 1채널 축소가 3채널보다 2~3배 빠름
+    hand_side 가 0 이면 원본 그대로, 배율 1 (기존 파라미터)
+    """
+    if not hand_side:
+        return img, 1, 1.0
+    extent = hand_extent(img)
+    factor = max(1, extent // hand_side)
+    if factor > 1:
+        h, w = img.shape[:2]
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        img = cv2.resize(gray, (max(1, w // factor), max(1, h // factor)), interpolation=cv2.INTER_AREA)
+    return img, factor, extent / factor / REFERENCE_HAND_SIDE
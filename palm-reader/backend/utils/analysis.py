@@ -1,29 +1,30 @@
 import numpy as np
 from scipy.ndimage import gaussian_filter1d
 
-def _polyline_to_xy(polyline_str):
-    # "x,y x,y ..." -> (N,2) numpy
-    if not polyline_str:
+def _polyline_to_xy(polyline):
+    # (N,2) 배열 그대로 / 예전 "x,y x,y ..." 문자열도 허용 -> (N,2) float32
+    if isinstance(polyline, str):
+        if not polyline.strip():
+            return np.zeros((0,2), dtype=np.float32)
+        return np.array(polyline.replace(',', ' ').split(), dtype=np.float32).reshape(-1, 2)
+    if polyline is None or len(polyline) == 0:
         return np.zeros((0,2), dtype=np.float32)
-    pts = []
-    for tok in polyline_str.strip().split():
-        x, y = tok.split(',')
-        pts.append((float(x), float(y)))
-    return np.array(pts, dtype=np.float32)
+    return np.asarray(polyline, dtype=np.float32).reshape(-1, 2)
 
-def measure_length(polyline_str):
-    pts = _polyline_to_xy(polyline_str)
+def measure_length(polyline):
+    pts = _polyline_to_xy(polyline)
     if len(pts) < 2:
         return 0.0
     diffs = np.diff(pts, axis=0)
     seg_len = np.sqrt((diffs**2).sum(axis=1))
     return float(seg_len.sum())
 
-def measure_curvature(polyline_str, sigma=2.0):
+def measure_curvature(polyline, sigma=2.0):
     """
     간이 곡률: x(t), y(t) 1~2차 미분 근사로 평균 절대 곡률 반환
+    polyline: 점 순서대로 정렬된 (N,2) 배열 (또는 "x,y ..." 문자열)
     """
-    pts = _polyline_to_xy(polyline_str)
+    pts = _polyline_to_xy(polyline)
     if len(pts) < 5:
         return 0.0
     x = gaussian_filter1d(pts[:,0], sigma=sigma, mode='nearest')
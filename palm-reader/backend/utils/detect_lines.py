@@ -1,7 +1,15 @@
 import cv2
 import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import breadth_first_order
 from skimage.morphology import skeletonize
-from skimage.measure import label, regionprops
+
+# 너무 짧은 선 제거 기준 (스켈레톤 픽셀 수)
+MIN_AREA = 80
+LINE_NAMES = ["life", "head", "heart", "fate"]
+
+# 8-이웃 (dy, dx)
+_OFFSETS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
 
 def _to_skeleton(binary_img):
     # 0/1 이진화 후 skeletonize
@@ -11,33 +19,79 @@ def _to_skeleton(binary_img):
 
 def _largest_hand_region(mask):
     # 가장 큰 연결성분(손 영역)만 남기기 (노이즈 억제)
-    lbl = label(mask > 0)
-    if lbl.max() == 0:
+    num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    if num_labels < 2:
         return mask
-    props = regionprops(lbl)
-    largest = max(props, key=lambda p: p.area)
-    keep = (lbl == largest.label).astype(np.uint8) * 255
-    return keep
+    largest = 1 + int(np.argmax(stats[1:, cv2.CC_STAT_AREA]))
+    return (labels == largest).astype(np.uint8) * 255
+
+def _component_coords(labels, keep):
+    """
+    labels 를 한 번만 훑어 keep 에 든 라벨별 (K, 2) [x, y] 좌표 → {라벨: 좌표}
+    라벨마다 전체 크기 마스크(labels == lab)를 만들지 않고, 0 아닌 픽셀을 라벨 순 안정 정렬 후 자름
+    """
+    flat = labels.ravel()
+    idx = np.flatnonzero(flat)
+    lab = flat[idx]
+    order = np.argsort(lab, kind="stable")
+    idx, lab = idx[order], lab[order]
+    starts = np.searchsorted(lab, keep)
+    ends = np.searchsorted(lab, keep, side="right")
+    ys, xs = np.divmod(idx, labels.shape[1])
+    coords = np.stack([xs, ys], axis=1).astype(np.int32)
+    return {int(k): coords[s:e] for k, s, e in zip(keep, starts, ends)}
+
+def _neighbor_graph(pts):
+    # 스켈레톤 픽셀 (K, 2) → 8-이웃 인접 행렬 (K x K, 희소)
+    x0, y0 = pts.min(axis=0) - 1
+    w, h = pts.max(axis=0) - (x0, y0) + 2
+    index = np.full((h, w), -1, np.int32)
+    px, py = pts[:, 0] - x0, pts[:, 1] - y0
+    index[py, px] = np.arange(len(pts), dtype=np.int32)
+    rows, cols = [], []
+    for dy, dx in _OFFSETS:
+        nb = index[py + dy, px + dx]
+        ok = nb >= 0
+        rows.append(np.flatnonzero(ok))
+        cols.append(nb[ok])
+    rows, cols = np.concatenate(rows), np.concatenate(cols)
+    return csr_matrix((np.ones(len(rows), np.int8), (rows, cols)), shape=(len(pts), len(pts)))
 
-def _polyline_from_component(component_mask, step=3):
+def _order_points(pts):
     """
-    컴포넌트의 픽셀 좌표를 간단히 다운샘플하여 폴리라인 문자열로 변환
-    예: "x1,y1 x2,y2 ..."
+    스켈레톤 성분을 그래프로 보고 가장 긴 경로(양 끝점 사이) 순서로 정렬 → (M, 2)
+    임의 점에서 BFS 로 가장 먼 점 A, A 에서 다시 BFS 로 가장 먼 점 B → A~B 경로 (곁가지는 버림)
     """
-    ys, xs = np.where(component_mask > 0)
-    if len(xs) < 2:
-        return ""
-    pts = np.stack([xs, ys], axis=1)
-    # 좌표 수가 많으면 간격 샘플링
-    pts = pts[::step]
-    return " ".join([f"{int(x)},{int(y)}" for x, y in pts])
+    if len(pts) < 3:
+        return pts
+    graph = _neighbor_graph(pts)
+    order, _ = breadth_first_order(graph, 0, directed=False, return_predecessors=True)
+    start = order[-1]
+    order, pred = breadth_first_order(graph, start, directed=False, return_predecessors=True)
+    path = [order[-1]]
+    while path[-1] != start:
+        path.append(pred[path[-1]])
+    return pts[path[::-1]]
+
+def _polyline_from_component(pts, step=3):
+    """
+    순서대로 정렬한 컴포넌트 좌표를 step 간격으로 다운샘플한 폴리라인 (N, 2) int32 [x, y]
+    끝점은 항상 포함
+    """
+    if len(pts) < 2:
+        return np.zeros((0, 2), np.int32)
+    poly = pts[::step]
+    if (len(pts) - 1) % step:
+        poly = np.vstack([poly, pts[-1:]])
+    return poly
 
 def extract_palm_lines(preprocessed_img):
     """
     1) 스켈레톤화
     2) 가장 큰 손 영역 근처만 유지
-    3) 연결성분 별로 폴리라인 후보 생성
+    3) 연결성분 별로 폴리라인 후보 생성 (좌표는 한 번에, 점 순서는 그래프 탐색)
     4) 상위 몇 개(길이 기준)를 라인으로 채택
+    반환: (시각화 마스크, {이름: (N, 2) int32 폴리라인})
     """
     # 스켈레톤
     skel = _to_skeleton(preprocessed_img)
@@ -50,33 +104,20 @@ def extract_palm_lines(preprocessed_img):
     # 스켈레톤과 hand_region 교차
     skel = cv2.bitwise_and(skel, hand_region)
 
-    # 연결성분 분석
+    # 연결성분 분석 → 길이 순 상위 3~4개를 주요 손금으로 가정 (스켈레톤이라 픽셀 수 ~ 길이 근사)
     num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(skel, connectivity=8)
-    comps = []
-    for lab in range(1, num_labels):
-        area = stats[lab, cv2.CC_STAT_AREA]
-        if area < 80:  # 너무 짧은 선 제거
-            continue
-        comp_mask = (labels == lab).astype(np.uint8) * 255
-        length = area  # 스켈레톤이라 픽셀 수 ~ 길이 근사
-        poly = _polyline_from_component(comp_mask, step=4)
-        if poly:
-            comps.append((length, poly, comp_mask))
-
-    # 길이 순으로 정렬 후 상위 3~4개를 주요 손금으로 가정
-    comps.sort(key=lambda x: x[0], reverse=True)
-    top = comps[:4]
+    areas = stats[1:, cv2.CC_STAT_AREA]
+    candidates = np.flatnonzero(areas >= MIN_AREA) + 1
+    top = candidates[np.argsort(-areas[candidates - 1], kind="stable")][:len(LINE_NAMES)]
+    coords = _component_coords(labels, np.sort(top))
 
     # 단순 매핑(길이 기준으로 임시 라벨링)
-    line_names = ["life", "head", "heart", "fate"]
     lines = {}
-    for i, item in enumerate(top):
-        _, poly, _ = item
-        lines[line_names[i]] = poly
-
-    # 시각화용 컨투어(흰 바탕에 선)
     vis = np.zeros_like(preprocessed_img)
-    for _, _, mask in top:
-        vis = cv2.bitwise_or(vis, mask)
+    for name, lab in zip(LINE_NAMES, top):
+        pts = coords[int(lab)]
+        # 시각화용 컨투어(검은 바탕에 흰 선)
+        vis[pts[:, 1], pts[:, 0]] = 255
+        lines[name] = _polyline_from_component(_order_points(pts), step=4)
 
     return vis, lines
@@ -1,62 +1,71 @@
+import os
+import sys
 import cv2
 import numpy as np
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..")))
+from common.preprocess import Pipeline, Stage, UpscaleTo, Morphology, load_image
+from common.resources import register_warmup
+
+# 피부 대략 범위 (HSV, 넓게 잡음) — 모듈 로드 시 한 번만 만들고 읽기 전용으로 공유
+SKIN_LOWER = np.array([0, 10, 40], dtype=np.uint8)
+SKIN_UPPER = np.array([35, 200, 255], dtype=np.uint8)
+SKIN_LOWER.setflags(write=False)
+SKIN_UPPER.setflags(write=False)
+
 def _illumination_correction(gray):
     # 조명 보정: 가우시안 블러를 배경으로 보고 제거
     background = cv2.GaussianBlur(gray, (41, 41), 0)
     norm = cv2.divide(gray, background, scale=255)
     return norm
 
-def preprocess_image(image_path: str):
+class LumaCorrection(Stage):
+    # Y 채널(휘도) 기준으로 대비 향상 + 조명 보정 후 BGR 로 복원
+    kind = "contrast"
+
+    def __call__(self, src, dst=None):
+        ycrcb = cv2.cvtColor(src, cv2.COLOR_BGR2YCrCb)
+        y, cr, cb = cv2.split(ycrcb)
+        y = cv2.equalizeHist(y)
+        y = _illumination_correction(y)
+        cv2.merge([y, cr, cb], dst=ycrcb)
+        return cv2.cvtColor(ycrcb, cv2.COLOR_YCrCb2BGR, dst=dst)
+
+class SkinMaskedLines(Stage):
+    # 적응형 이진화로 미세 선 강조 + 피부 마스크와 AND → 배경 잡선 억제
+    kind = "threshold"
+
+    def __call__(self, src, dst=None):
+        hsv = cv2.cvtColor(src, cv2.COLOR_BGR2HSV)
+        skin = cv2.inRange(hsv, SKIN_LOWER, SKIN_UPPER)
+        skin = cv2.GaussianBlur(skin, (7, 7), 0)
+
+        gray = cv2.cvtColor(src, cv2.COLOR_BGR2GRAY)
+        gray = cv2.GaussianBlur(gray, (5, 5), 0)
+        bin_img = cv2.adaptiveThreshold(
+            gray, 255,
+            cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+            cv2.THRESH_BINARY_INV,
+            25, 7
+        )
+        return cv2.bitwise_and(bin_img, skin, dst=dst)
+
+# 1) 고해상도 권장(최소 한 변 900~1200px). 낮으면 업샘플 약간
+# 2) 컬러 → YCbCr/HSV 혼합 보정
+# 3) 적응형 이진화(Adaptive Threshold)로 손금 대비 극대화
+# 4) Morphology로 얇은 선 보존 (가는 선 살리고 끊김 메우기)
+PIPELINE = Pipeline([
+    UpscaleTo(min_side=900, interpolation=cv2.INTER_CUBIC),
+    LumaCorrection(),
+    SkinMaskedLines(),
+    Morphology(cv2.MORPH_OPEN, (3, 3)),
+    Morphology(cv2.MORPH_CLOSE, (3, 3)),
+])
+
+def preprocess_image(image_path):
     """
-    1) 컬러 → YCbCr/HSV 혼합 보정
-    2) 노이즈 제거 + 대비 향상
-    3) 적응형 이진화(Adaptive Threshold)로 손금 대비 극대화
-    4) Morphology로 얇은 선 보존
+    경로 / 바이트 / ndarray 를 받아 손금 강조 이진 이미지 반환
     """
-    bgr = cv2.imread(image_path)
-    if bgr is None:
-        raise ValueError("이미지 로드 실패")
-
-    # 고해상도 권장(최소 한 변 900~1200px). 낮으면 업샘플 약간
-    h, w = bgr.shape[:2]
-    if max(h, w) < 900:
-        scale = 900 / max(h, w)
-        bgr = cv2.resize(bgr, (int(w*scale), int(h*scale)), interpolation=cv2.INTER_CUBIC)
-
-    # Y 채널(휘도) 기준으로 대비 향상
-    ycrcb = cv2.cvtColor(bgr, cv2.COLOR_BGR2YCrCb)
-    y, cr, cb = cv2.split(ycrcb)
-    y = cv2.equalizeHist(y)
-    y = _illumination_correction(y)
-    ycrcb = cv2.merge([y, cr, cb])
-    bgr = cv2.cvtColor(ycrcb, cv2.COLOR_YCrCb2BGR)
-
-    # HSV로 피부톤 구간 약하게 마스킹(손금 대비 ↑)
-    hsv = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV)
-    # 피부 대략 범위 (넓게 잡음)
-    lower = np.array([0, 10, 40])
-    upper = np.array([35, 200, 255])
-    skin = cv2.inRange(hsv, lower, upper)
-    skin = cv2.GaussianBlur(skin, (7, 7), 0)
-
-    gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
-    gray = cv2.GaussianBlur(gray, (5, 5), 0)
-
-    # 적응형 이진화로 미세 선 강조
-    bin_img = cv2.adaptiveThreshold(
-        gray, 255,
-        cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-        cv2.THRESH_BINARY_INV,
-        25, 7
-    )
-
-    # 피부 마스크와 AND → 배경 잡선 억제
-    bin_img = cv2.bitwise_and(bin_img, skin)
-
-    # Morphology: 가는 선 살리고 끊김 메우기
-    kernel = np.ones((3, 3), np.uint8)
-    thin = cv2.morphologyEx(bin_img, cv2.MORPH_OPEN, kernel, iterations=1)
-    close = cv2.morphologyEx(thin, cv2.MORPH_CLOSE, kernel, iterations=1)
-
-    return close
+    return PIPELINE.run(load_image(image_path))
+
+register_warmup("palm.preprocess", lambda: PIPELINE.run(np.full((480, 640, 3), 160, np.uint8)))